@@ -0,0 +1,131 @@
+"""
+Expansion of retrieved chunks with their neighbors.
+
+Indexes built with ``chunk_overlap: 0`` store disjoint chunks, so a hit near a
+chunk boundary can miss the code right before or after it. Instead of paying
+for overlapping text in every chunk, retrieval can add the ``neighbor_window``
+chunks on each side of every hit (located by the chunk's file and order) and
+merge contiguous chunks of a file back into one continuous span. With an
+overlapping text splitter the text repeated at each seam is removed, so
+stitching also works with the default ``chunk_overlap``.
+"""
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+from adalflow.core.types import Document
+
+from api.context_assembler import find_overlap
+
+logger = logging.getLogger(__name__)
+
+
+def _span_key(doc: Document) -> Tuple:
+    return (doc.meta_data or {}).get("file_path"), doc.parent_doc_id
+
+
+def _neighbors_from_list(documents: Sequence[Document], hit_indices: List[int],
+                         window: int) -> Dict[int, List[Document]]:
+    """Find neighbors by scanning an in-memory list of chunks."""
+    wanted = {_span_key(documents[index]) for index in hit_indices}
+
+    by_order = {}
+    for doc in documents:
+        key = _span_key(doc)
+        if key in wanted and doc.order is not None:
+            by_order.setdefault(key, {})[doc.order] = doc
+
+    neighbors = {}
+    for index in hit_indices:
+        hit = documents[index]
+        if hit.order is None:
+            neighbors[index] = []
+            continue
+        chunks = by_order.get(_span_key(hit), {})
+        neighbors[index] = [chunks[order] for order in range(hit.order - window, hit.order + window + 1)
+                            if order in chunks]
+    return neighbors
+
+
+def _neighbors_from_store(documents, hit_indices: List[int], window: int) -> Dict[int, List[Document]]:
+    """Find neighbors with the chunk (file, order) lookup of an index store."""
+    hit_positions = [int(documents.positions[index]) for index in hit_indices]
+    neighbor_positions = documents.store.neighbor_positions(hit_positions, window)
+    all_positions = sorted({position for positions in neighbor_positions.values() for position in positions})
+    by_position = dict(zip(all_positions, documents.store.get_documents(all_positions)))
+    return {
+        index: [by_position[position] for position in neighbor_positions[hit_position]]
+        for index, hit_position in zip(hit_indices, hit_positions)
+    }
+
+
+def _merge_span(chunks: List[Document], overlap_words: int = 0) -> Document:
+    """Merge contiguous chunks of one file into a single Document."""
+    first, last = chunks[0], chunks[-1]
+    if len(chunks) == 1:
+        return first
+    meta_data = dict(first.meta_data or {})
+    if "start_line" in meta_data:
+        # Code-aware chunks are whole, disjoint lines
+        text = "\n".join(chunk.text for chunk in chunks)
+    else:
+        # Text splitter chunks keep their separators but may repeat the end of the previous chunk
+        text = first.text
+        for previous, chunk in zip(chunks, chunks[1:]):
+            text += chunk.text[find_overlap(previous.text, chunk.text, overlap_words):]
+    if "end_line" in (last.meta_data or {}):
+        meta_data["end_line"] = last.meta_data["end_line"]
+    return Document(
+        text=text,
+        meta_data=meta_data,
+        id=first.id,
+        order=first.order,
+        parent_doc_id=first.parent_doc_id,
+    )
+
+
+def stitch_neighbors(documents: Sequence[Document], hit_indices: Sequence[int], window: int,
+                     overlap_words: int = 0) -> List[Document]:
+    """
+    Expand retrieved chunks with their neighbors and merge contiguous chunks.
+
+    Args:
+        documents: The chunks the retriever indexes, a StoredDocuments or a list
+        hit_indices: Indices of the retrieved chunks in documents, best first
+        window: Number of neighboring chunks to add on each side of a hit
+        overlap_words: The text splitter's chunk_overlap in words, if known
+
+    Returns:
+        List[Document]: One Document per contiguous span. Files are ordered by their best
+        hit and the spans of a file by their position in it
+    """
+    hit_indices = [int(index) for index in hit_indices]
+    if window <= 0 or not hit_indices:
+        return [documents[index] for index in hit_indices]
+
+    if hasattr(documents, "store"):
+        neighbors = _neighbors_from_store(documents, hit_indices, window)
+    else:
+        neighbors = _neighbors_from_list(documents, hit_indices, window)
+
+    # Collect the chunks of each file, keeping files in the order of their best hit.
+    # Chunks without an order cannot be located in their file and are kept as they are.
+    files = {}
+    for index in hit_indices:
+        for chunk in neighbors[index] or [documents[index]]:
+            files.setdefault(_span_key(chunk), {})[chunk.order if chunk.order is not None else chunk.id] = chunk
+
+    spans = []
+    for chunks_by_order in files.values():
+        if any(not isinstance(order, int) for order in chunks_by_order):
+            spans.extend(chunks_by_order.values())
+            continue
+        run = []
+        for order in sorted(chunks_by_order):
+            if run and order != run[-1].order + 1:
+                spans.append(_merge_span(run, overlap_words))
+                run = []
+            run.append(chunks_by_order[order])
+        spans.append(_merge_span(run, overlap_words))
+
+    logger.info(f"Stitched {len(hit_indices)} retrieved chunks into {len(spans)} spans")
+    return spans
@@ -0,0 +1,143 @@
+"""
+Syntax-aware splitting of code files for the indexing pipeline.
+
+Code files are chunked with python_chunking's tree-sitter chunker
+(``python_chunking.core.indexing.chunk.chunk.chunk_document``), which keeps
+functions and classes whole, collapses bodies that do not fit and needs no
+overlap between chunks. Other files, and every file when tree-sitter is not
+installed (``pip install .[code-splitting]``), go through adalflow's
+TextSplitter as before.
+"""
+import logging
+import threading
+from typing import List, Optional, Sequence
+
+from adalflow.components.data_process import TextSplitter
+from adalflow.core.component import DataComponent
+from adalflow.core.types import Document
+
+from api.concurrent_embedder import run_coroutine
+
+logger = logging.getLogger(__name__)
+
+# Default token budget of a code chunk
+DEFAULT_MAX_CHUNK_TOKENS = 512
+
+_chunk_document = None
+_chunk_document_loaded = False
+_chunk_document_lock = threading.Lock()
+_fallback_warned = False
+
+
+def load_chunk_document():
+    """
+    Import python_chunking's chunk_document, if its dependencies are installed.
+
+    Returns:
+        The chunk_document async generator function, or None if it cannot be imported
+    """
+    global _chunk_document, _chunk_document_loaded
+    with _chunk_document_lock:
+        if not _chunk_document_loaded:
+            _chunk_document_loaded = True
+            try:
+                from python_chunking.core.indexing.chunk.chunk import chunk_document
+                _chunk_document = chunk_document
+            except ImportError as e:
+                _warn_fallback(f"Code-aware splitting is unavailable ({e}), using the text splitter for code files")
+        return _chunk_document
+
+
+def _warn_fallback(message: str) -> None:
+    """Warn the first time code falls back to the text splitter; later fallbacks are logged at debug level."""
+    global _fallback_warned
+    if _fallback_warned:
+        logger.debug(message)
+        return
+    _fallback_warned = True
+    logger.warning(message)
+
+
+class CodeAwareSplitter(DataComponent):
+    """
+    Split code files along syntax boundaries and other files with a TextSplitter.
+
+    Chunks keep the metadata of their source document, with the chunk's line range
+    and, when known, the symbol it covers added to it.
+    """
+
+    def __init__(self, text_splitter: TextSplitter, max_chunk_tokens: int = DEFAULT_MAX_CHUNK_TOKENS) -> None:
+        super().__init__()
+        self.text_splitter = text_splitter
+        self.max_chunk_tokens = max_chunk_tokens
+
+    async def _chunk_code(self, chunk_document, documents: List[Document]) -> List[List[Document]]:
+        results = []
+        for doc in documents:
+            meta_data = doc.meta_data or {}
+            file_path = meta_data.get("file_path", "")
+            chunks = []
+            try:
+                async for chunk in chunk_document(file_path, doc.text, self.max_chunk_tokens,
+                                                  meta_data.get("content_hash", "")):
+                    if not chunk.content.strip():
+                        continue
+                    chunk_meta = dict(meta_data, start_line=chunk.start_line, end_line=chunk.end_line)
+                    if chunk.metadata is not None and chunk.metadata.symbol_type:
+                        chunk_meta["symbol_type"] = chunk.metadata.symbol_type
+                        chunk_meta["symbol_name"] = chunk.metadata.symbol_name
+                    chunks.append(Document(text=chunk.content, meta_data=chunk_meta,
+                                           parent_doc_id=doc.id, order=len(chunks)))
+            except Exception as e:
+                _warn_fallback(f"Code-aware splitting failed for {file_path}, using the text splitter: {e}")
+                chunks = None
+            results.append(chunks)
+        return results
+
+    def __call__(self, documents: Sequence[Document]) -> List[Document]:
+        documents = list(documents)
+        chunk_document = load_chunk_document()
+        code_documents = [doc for doc in documents if (doc.meta_data or {}).get("is_code")]
+        if chunk_document is None or not code_documents:
+            return self.text_splitter(documents)
+
+        code_chunks = dict(zip(
+            (id(doc) for doc in code_documents),
+            run_coroutine(self._chunk_code(chunk_document, code_documents)),
+        ))
+
+        # Split the remaining documents in one call, then reassemble in input order
+        text_documents = [doc for doc in documents if code_chunks.get(id(doc)) is None]
+        text_chunks = {}
+        for chunk in self.text_splitter(text_documents) if text_documents else []:
+            text_chunks.setdefault(chunk.parent_doc_id, []).append(chunk)
+
+        output = []
+        for doc in documents:
+            chunks = code_chunks.get(id(doc))
+            output.extend(chunks if chunks is not None else text_chunks.get(doc.id, []))
+        return output
+
+    def _extra_repr(self) -> str:
+        return f"max_chunk_tokens={self.max_chunk_tokens}"
+
+
+def create_splitter(text_splitter_config: dict, code_splitter_config: Optional[dict] = None) -> DataComponent:
+    """
+    Create the splitter configured for the indexing pipeline.
+
+    Args:
+        text_splitter_config: Keyword arguments of the TextSplitter
+        code_splitter_config: The "code_splitter" configuration, if any
+
+    Returns:
+        DataComponent: A CodeAwareSplitter if code splitting is enabled, otherwise a TextSplitter
+    """
+    text_splitter = TextSplitter(**text_splitter_config)
+    code_splitter_config = code_splitter_config or {}
+    if not code_splitter_config.get("enabled", False):
+        return text_splitter
+    return CodeAwareSplitter(
+        text_splitter,
+        max_chunk_tokens=code_splitter_config.get("max_chunk_tokens", DEFAULT_MAX_CHUNK_TOKENS),
+    )
@@ -0,0 +1,206 @@
+"""
+Concurrent, rate-limited batch embedding.
+
+ConcurrentEmbeddingProcessor replaces adalflow's ToEmbeddings, which sends one
+batch at a time, for embedders with an async client (OpenAI and Google). Batches
+are sent through the embedder's acall with a bounded number in flight, each
+request first taking a token from the provider's TokenBucket, and the results
+are reassembled in input order.
+
+The coroutines run on a single long-lived background event loop. This works
+whether or not the caller is already inside a running loop (the FastAPI
+handlers are), and keeps the async HTTP clients bound to one loop for their
+whole lifetime.
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence
+
+import adalflow as adal
+from adalflow.core.component import DataComponent
+from adalflow.core.types import Document
+
+logger = logging.getLogger(__name__)
+
+# Delay before the first retry of a failed batch, doubled on every attempt
+RETRY_BASE_DELAY = 1.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the request rate to a provider.
+
+    The bucket holds up to `capacity` tokens and refills at `requests_per_minute`.
+    Tokens are reserved under a lock and waited for outside of it, so a bucket can
+    be shared by coroutines on any event loop and by plain threads.
+    """
+
+    def __init__(self, requests_per_minute: float, capacity: Optional[float] = None):
+        if requests_per_minute <= 0:
+            raise ValueError(f"requests_per_minute must be positive, got {requests_per_minute}")
+        self.rate = requests_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, going into debt if it does not hold enough.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            float: Seconds to wait before the reserved tokens may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until tokens are available and take them."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, requests_per_minute: float) -> TokenBucket:
+    """
+    Get the token bucket shared by all embedding requests to a provider.
+
+    Args:
+        provider: Provider name, e.g. the embedder type
+        requests_per_minute: Allowed request rate
+
+    Returns:
+        TokenBucket: The provider's bucket, recreated if the rate changed
+    """
+    with _rate_limiters_lock:
+        bucket = _rate_limiters.get(provider)
+        if bucket is None or bucket.rate != requests_per_minute / 60.0:
+            bucket = TokenBucket(requests_per_minute)
+            _rate_limiters[provider] = bucket
+        return bucket
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="embedding-loop", daemon=True).start()
+        return _loop
+
+
+def run_coroutine(coro):
+    """
+    Run a coroutine to completion on the background embedding loop.
+
+    Args:
+        coro: The coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
+
+class ConcurrentEmbeddingProcessor(DataComponent):
+    """
+    Embed documents in batches with several requests in flight at once.
+
+    Like ToEmbeddings, it does not modify its input. Documents of batches that still
+    fail after retrying are returned without a vector and are dropped later by the
+    embedding validation.
+    """
+
+    def __init__(self, embedder: adal.Embedder, provider: str, batch_size: int = 100,
+                 concurrency: int = 4, requests_per_minute: float = 600, max_retries: int = 3) -> None:
+        super().__init__()
+        if batch_size < 1 or concurrency < 1:
+            raise ValueError("batch_size and concurrency must be at least 1")
+        self.embedder = embedder
+        self.provider = provider
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+
+    async def _embed_batch(self, texts: List[str], semaphore: asyncio.Semaphore,
+                           bucket: TokenBucket) -> Optional[List[List[float]]]:
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await bucket.acquire()
+                error = None
+                try:
+                    result = await self.embedder.acall(input=texts)
+                    error = result.error
+                    if not error and result.data and len(result.data) == len(texts):
+                        return [embedding.embedding for embedding in result.data]
+                    error = error or f"expected {len(texts)} embeddings, got {len(result.data or [])}"
+                except Exception as e:
+                    error = str(e)
+
+                if attempt < self.max_retries:
+                    delay = RETRY_BASE_DELAY * (2 ** attempt)
+                    logger.warning(f"Embedding batch failed ({error}), retrying in {delay:.0f}s")
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error(f"Embedding batch of {len(texts)} documents failed after "
+                                 f"{self.max_retries + 1} attempts: {error}")
+        return None
+
+    async def _embed_all(self, batches: List[List[str]]) -> List[Optional[List[List[float]]]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        bucket = get_rate_limiter(self.provider, self.requests_per_minute)
+        # gather keeps the results in batch order
+        return await asyncio.gather(*(self._embed_batch(batch, semaphore, bucket) for batch in batches))
+
+    def __call__(self, documents: Sequence[Document]) -> Sequence[Document]:
+        documents = list(documents)
+        if not documents:
+            return []
+
+        batches = [
+            [doc.text for doc in documents[start:start + self.batch_size]]
+            for start in range(0, len(documents), self.batch_size)
+        ]
+        logger.info(f"Embedding {len(documents)} documents in {len(batches)} batches "
+                    f"with up to {self.concurrency} concurrent requests")
+        start_time = time.perf_counter()
+        results = run_coroutine(self._embed_all(batches))
+
+        output = []
+        failed = 0
+        for batch_idx, vectors in enumerate(results):
+            batch_docs = documents[batch_idx * self.batch_size:(batch_idx + 1) * self.batch_size]
+            if vectors is None:
+                failed += len(batch_docs)
+                output.extend(replace(doc, vector=[]) for doc in batch_docs)
+            else:
+                output.extend(replace(doc, vector=vector) for doc, vector in zip(batch_docs, vectors))
+
+        logger.info(f"Embedded {len(documents) - failed}/{len(documents)} documents "
+                    f"in {time.perf_counter() - start_time:.1f}s")
+        return output
+
+    def _extra_repr(self) -> str:
+        return (f"provider={self.provider}, batch_size={self.batch_size}, "
+                f"concurrency={self.concurrency}, requests_per_minute={self.requests_per_minute}")
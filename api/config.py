@@ -313,16 +313,17 @@ lang_config = load_lang_config()
 if generator_config:
     configs["default_provider"] = generator_config.get("default_provider", "google")
     configs["providers"] = generator_config.get("providers", {})
+    configs["prompt_budget"] = generator_config.get("prompt_budget", {})
 
 # Update embedder configuration
 if embedder_config:
-    for key in ["embedder", "embedder_ollama", "embedder_google", "retriever", "text_splitter"]:
+    for key in ["embedder", "embedder_ollama", "embedder_google", "retriever", "retriever_cache", "query_embedding_cache", "embedding_cache", "index_store", "code_splitter", "text_splitter"]:
         if key in embedder_config:
             configs[key] = embedder_config[key]
 
 # Update repository configuration
 if repo_config:
-    for key in ["file_filters", "repository"]:
+    for key in ["file_filters", "repository", "file_content", "indexing", "request_executor"]:
         if key in repo_config:
             configs[key] = repo_config[key]
 
@@ -0,0 +1,143 @@
+"""
+Assembly of retrieved chunks into the context of a chat prompt.
+
+The text splitter overlaps consecutive chunks of a file, so the top hits of a
+query often repeat the same words several times. The assembler groups the
+retrieved chunks by file, puts them in file order, drops the text a chunk
+shares with the previous one and merges consecutive chunks into one span.
+"""
+import logging
+from typing import Dict, List, Optional
+
+from adalflow.core.types import Document
+
+from api.config import configs
+
+logger = logging.getLogger(__name__)
+
+# Separator between the files of the context, kept identical to the previous inline formatting
+CONTEXT_PREFIX = "\n\n" + "-" * 10
+
+
+def _word_units_suffix(previous: str, num_words: int) -> str:
+    """The last num_words units of a chunk split on spaces by the word text splitter."""
+    boundaries = [0] + [i + 1 for i, char in enumerate(previous[:-1]) if char == " "]
+    if num_words > len(boundaries):
+        return ""
+    return previous[boundaries[-num_words]:]
+
+
+def find_overlap(previous: str, text: str, overlap_words: int = 0) -> int:
+    """
+    Find how many leading characters of a chunk repeat the end of the previous chunk.
+
+    When the chunks come from the word splitter with a known overlap, the repeated text
+    is exactly its last overlap_words units. Otherwise the longest suffix of previous
+    that text starts with is used, counting only suffixes that start at a word boundary
+    and contain more than whitespace, so chunks that merely share a character or
+    indentation are not cut.
+
+    Args:
+        previous: Text of the earlier chunk
+        text: Text of the following chunk
+        overlap_words: The text splitter's chunk_overlap in words, if known
+
+    Returns:
+        int: Number of leading characters of text that repeat the end of previous
+    """
+    if overlap_words > 0:
+        suffix = _word_units_suffix(previous, overlap_words)
+        if suffix and text.startswith(suffix):
+            return len(suffix)
+
+    for size in range(min(len(previous), len(text)), 0, -1):
+        start = len(previous) - size
+        if ((start == 0 or previous[start - 1].isspace()) and not previous[start].isspace()
+                and previous.endswith(text[:size])):
+            return size
+    return 0
+
+
+def get_word_overlap() -> int:
+    """The configured chunk overlap of the word text splitter, 0 for other splitters."""
+    text_splitter = configs.get("text_splitter", {})
+    if text_splitter.get("split_by") != "word":
+        return 0
+    return text_splitter.get("chunk_overlap", 0)
+
+
+def _position(doc: Document) -> Optional[int]:
+    return doc.order if isinstance(doc.order, int) else None
+
+
+def merge_file_chunks(docs: List[Document], overlap_words: int = 0) -> List[str]:
+    """
+    Merge the retrieved chunks of one file into non-overlapping spans.
+
+    Args:
+        docs: Chunks of one file, in retrieval order
+        overlap_words: The text splitter's chunk_overlap in words, if known
+
+    Returns:
+        List[str]: Span texts in file order, followed by chunks whose position is unknown
+    """
+    seen = set()
+    unique = []
+    for doc in docs:
+        if doc.id not in seen:
+            seen.add(doc.id)
+            unique.append(doc)
+
+    ordered = sorted(
+        (doc for doc in unique if _position(doc) is not None),
+        key=lambda doc: (str(doc.parent_doc_id), doc.order),
+    )
+    spans = []
+    previous = None
+    for doc in ordered:
+        adjacent = (previous is not None and previous.parent_doc_id == doc.parent_doc_id
+                    and doc.order == previous.order + 1)
+        if adjacent:
+            if "start_line" in (doc.meta_data or {}):
+                # Code-aware chunks end and start on whole lines and never overlap
+                spans[-1] += "\n" + doc.text
+            else:
+                spans[-1] += doc.text[find_overlap(previous.text, doc.text, overlap_words):]
+        else:
+            spans.append(doc.text)
+        previous = doc
+
+    spans.extend(doc.text for doc in unique if _position(doc) is None)
+    return spans
+
+
+def assemble_context(documents: List[Document]) -> str:
+    """
+    Format retrieved documents as the context of a chat prompt.
+
+    Files appear in the order of their best hit, each under a "## File Path:" header.
+
+    Args:
+        documents: Retrieved documents, best first
+
+    Returns:
+        str: The context text, or an empty string if there are no documents
+    """
+    docs_by_file: Dict[str, List[Document]] = {}
+    for doc in documents:
+        file_path = (doc.meta_data or {}).get('file_path', 'unknown')
+        docs_by_file.setdefault(file_path, []).append(doc)
+
+    overlap_words = get_word_overlap()
+    context_parts = []
+    num_spans = 0
+    for file_path, docs in docs_by_file.items():
+        spans = merge_file_chunks(docs, overlap_words)
+        num_spans += len(spans)
+        header = f"## File Path: {file_path}\n\n"
+        context_parts.append(header + "\n\n".join(spans))
+
+    if not context_parts:
+        return ""
+    logger.info(f"Assembled {len(documents)} documents from {len(docs_by_file)} files into {num_spans} spans")
+    return CONTEXT_PREFIX + "\n\n".join(context_parts)
@@ -0,0 +1,287 @@
+"""
+Content-addressed on-disk cache of chunk embeddings.
+
+Embeddings are keyed on the embedder (client, model and dimensions) and the
+SHA-256 of the chunk text, so identical chunks are embedded only once across
+repositories, forks and rebuilds. Vectors are stored as float32 blobs in a
+single SQLite file under ~/.adalflow/embedding_cache and evicted least
+recently used first once the cache grows beyond its size budget. The size of
+the cache is tracked as a running total, and access times are only written
+when they are older than ACCESS_TIME_RESOLUTION, so lookups rarely write.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import adalflow as adal
+from adalflow.core.component import DataComponent
+from adalflow.core.types import Document
+from adalflow.utils import get_adalflow_default_root_path
+
+from api.config import configs
+
+logger = logging.getLogger(__name__)
+
+# Default size budget of the cache file
+DEFAULT_MAX_SIZE_MB = 1024
+
+# Last access times are refreshed at most this often, in seconds
+ACCESS_TIME_RESOLUTION = 3600
+
+# SQLite limits the number of parameters per statement
+_QUERY_BATCH_SIZE = 500
+
+
+def hash_text(text: str) -> str:
+    """
+    Hash a chunk text for use as a cache key.
+
+    Args:
+        text: The chunk text
+
+    Returns:
+        str: Hex-encoded SHA-256 digest
+    """
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def get_embedder_namespace(embedder: adal.Embedder) -> str:
+    """
+    Build the cache namespace identifying an embedder configuration.
+
+    Every model kwarg is part of the namespace, since options such as dimensions,
+    task_type or encoding_format change the vectors the same model returns.
+
+    Args:
+        embedder: The embedder whose vectors are cached
+
+    Returns:
+        str: "{client}:{model}:{other model kwargs as sorted JSON}"
+    """
+    model_kwargs = dict(getattr(embedder, "model_kwargs", None) or {})
+    client_name = type(getattr(embedder, "model_client", None)).__name__
+    model = model_kwargs.pop("model", None)
+    return f"{client_name}:{model}:{json.dumps(model_kwargs, sort_keys=True, default=str)}"
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed LRU cache of embeddings bounded by a size budget.
+    """
+
+    def __init__(self, path: str, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        self.path = path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._conn = None
+        # Bytes of all stored vectors, loaded when the cache is opened
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    namespace TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, text_hash)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)")
+            conn.commit()
+            self._conn = conn
+            self._total_bytes = self._sum_bytes(conn)
+        return self._conn
+
+    def get_many(self, namespace: str, text_hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            namespace: Embedder namespace from get_embedder_namespace
+            text_hashes: Hashes of the chunk texts
+
+        Returns:
+            Dict[str, List[float]]: Embeddings of the hashes found in the cache
+        """
+        found = {}
+        stale = []
+        now = time.time()
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(unique_hashes), _QUERY_BATCH_SIZE):
+                batch = unique_hashes[start:start + _QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    "SELECT text_hash, vector, last_access FROM embeddings "
+                    f"WHERE namespace = ? AND text_hash IN ({placeholders})",
+                    [namespace, *batch],
+                ).fetchall()
+                for text_hash, blob, last_access in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+                    if now - last_access >= ACCESS_TIME_RESOLUTION:
+                        stale.append((now, namespace, text_hash))
+
+            # The LRU order only needs to be coarse, so recent access times are left as they are
+            if stale:
+                conn.executemany("UPDATE embeddings SET last_access = ? WHERE namespace = ? AND text_hash = ?", stale)
+                conn.commit()
+        return found
+
+    def put_many(self, namespace: str, embeddings: Dict[str, Sequence[float]]) -> None:
+        """
+        Store embeddings and evict the least recently used ones beyond the size budget.
+
+        Args:
+            namespace: Embedder namespace from get_embedder_namespace
+            embeddings: Embeddings by chunk text hash
+        """
+        if not embeddings:
+            return
+        now = time.time()
+        rows = [
+            (namespace, text_hash, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text_hash, vector in embeddings.items()
+        ]
+        with self._lock:
+            conn = self._connect()
+            replaced_bytes = 0
+            hashes = list(embeddings)
+            for start in range(0, len(hashes), _QUERY_BATCH_SIZE):
+                batch = hashes[start:start + _QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                replaced_bytes += conn.execute(
+                    "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                    f"WHERE namespace = ? AND text_hash IN ({placeholders})",
+                    [namespace, *batch],
+                ).fetchone()[0]
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (namespace, text_hash, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            self._total_bytes += sum(len(row[2]) for row in rows) - replaced_bytes
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+
+    @staticmethod
+    def _sum_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        excess = self._total_bytes - self.max_bytes
+        evicted = []
+        for namespace, text_hash, size in conn.execute(
+            "SELECT namespace, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_access"
+        ):
+            if excess <= 0:
+                break
+            evicted.append((namespace, text_hash))
+            excess -= size
+            self._total_bytes -= size
+        conn.executemany("DELETE FROM embeddings WHERE namespace = ? AND text_hash = ?", evicted)
+        conn.commit()
+        logger.info(f"Evicted {len(evicted)} embeddings from the cache to stay within "
+                    f"{self.max_bytes // (1024 * 1024)} MB")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Get the process-wide embedding cache.
+
+    Returns:
+        Optional[EmbeddingCache]: The cache, or None if it is disabled in the configuration
+    """
+    global _embedding_cache
+    cache_config = configs.get("embedding_cache", {})
+    if not cache_config.get("enabled", True):
+        return None
+
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            path = cache_config.get("path") or os.path.join(
+                get_adalflow_default_root_path(), "embedding_cache", "embeddings.sqlite3"
+            )
+            _embedding_cache = EmbeddingCache(path, cache_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB))
+    return _embedding_cache
+
+
+class CachedEmbeddingProcessor(DataComponent):
+    """
+    Wrap an embedding transformer so that chunks with cached embeddings skip the provider call.
+
+    Only documents missing from the cache are passed to the wrapped transformer. Its
+    results are stored in the cache and merged back with the cached ones by document id,
+    in input order.
+    """
+
+    def __init__(self, embedder_transformer: DataComponent, namespace: str) -> None:
+        super().__init__()
+        self.embedder_transformer = embedder_transformer
+        self.namespace = namespace
+
+    def __call__(self, documents: Sequence[Document]) -> Sequence[Document]:
+        cache = get_embedding_cache()
+        if cache is None:
+            return self.embedder_transformer(documents)
+
+        text_hashes = [hash_text(doc.text) for doc in documents]
+        try:
+            cached = cache.get_many(self.namespace, text_hashes)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache lookup failed, embedding all documents: {e}")
+            return self.embedder_transformer(documents)
+
+        misses = [doc for doc, text_hash in zip(documents, text_hashes) if text_hash not in cached]
+        logger.info(f"Embedding cache: {len(documents) - len(misses)} hits, {len(misses)} misses")
+
+        embedded_by_id = {}
+        if misses:
+            embedded = self.embedder_transformer(misses)
+            new_embeddings = {}
+            for doc in embedded:
+                embedded_by_id[doc.id] = doc
+                if doc.vector is not None and len(doc.vector) > 0:
+                    new_embeddings[hash_text(doc.text)] = doc.vector
+            try:
+                cache.put_many(self.namespace, new_embeddings)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not store embeddings in the cache: {e}")
+
+        output = []
+        for doc, text_hash in zip(documents, text_hashes):
+            if text_hash in cached:
+                # Like the wrapped transformers, leave the input documents unmodified
+                output.append(replace(doc, vector=cached[text_hash]))
+            elif doc.id in embedded_by_id:
+                output.append(embedded_by_id[doc.id])
+        return output
+
+    def _extra_repr(self) -> str:
+        return f"namespace={self.namespace}"
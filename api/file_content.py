@@ -0,0 +1,206 @@
+"""
+Content of repository files for chat requests with a filePath.
+
+Files are read from the local clone under ~/.adalflow/repos first, through an
+in-memory LRU cache validated against each file's modification time and size.
+The provider REST APIs are only a fallback. They are called through one pooled
+requests.Session, and responses are revalidated with ETag conditional requests,
+so an unchanged file costs a 304 that does not count against most rate limits.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api.config import configs
+
+logger = logging.getLogger(__name__)
+
+# Default memory budget of the local file content cache
+DEFAULT_CACHE_MAX_SIZE_MB = 64
+# Default number of remote responses kept for ETag revalidation
+DEFAULT_ETAG_CACHE_ENTRIES = 256
+# Default number of pooled connections per host
+DEFAULT_HTTP_POOL_SIZE = 16
+# Default timeout of remote requests, in seconds
+DEFAULT_HTTP_TIMEOUT = 30
+
+
+def normalize_repo_file_path(file_path: str) -> str:
+    """
+    Normalize a file path sent by a client to a path relative to the repository root.
+
+    Args:
+        file_path: The requested path, e.g. "src/main.py" or "/src/main.py"
+
+    Returns:
+        str: The relative path with forward slashes
+
+    Raises:
+        ValueError: If the path is empty, contains ".." segments or points into .git
+    """
+    parts = [part for part in file_path.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or "\0" in file_path:
+        raise ValueError(f"Invalid file path: {file_path!r}")
+    if ".." in parts:
+        raise ValueError(f"File path {file_path!r} is outside of the repository")
+    if ".git" in parts:
+        raise ValueError(f"File path {file_path!r} points into the .git directory")
+    return "/".join(parts)
+
+
+def resolve_repo_file(repo_dir: str, file_path: str) -> str:
+    """
+    Resolve a requested file path inside a repository directory.
+
+    Args:
+        repo_dir: Root of the local clone
+        file_path: Path of the file relative to the repository root, as sent by the client
+
+    Returns:
+        str: The absolute path of the file
+
+    Raises:
+        ValueError: If the path is invalid (see normalize_repo_file_path) or a symlink
+            leads out of the repository
+    """
+    root = os.path.realpath(repo_dir)
+    resolved = os.path.realpath(os.path.join(root, normalize_repo_file_path(file_path)))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"File path {file_path!r} is outside of the repository")
+    return resolved
+
+
+class FileContentCache:
+    """
+    LRU cache of file contents bounded by a memory budget.
+
+    Entries are keyed on the absolute path and revalidated on every read against
+    the file's modification time and size.
+    """
+
+    def __init__(self, max_size_mb: float = DEFAULT_CACHE_MAX_SIZE_MB):
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self._entries: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def read(self, path: str) -> str:
+        """
+        Read a text file through the cache.
+
+        Args:
+            path: Absolute path of the file
+
+        Returns:
+            str: The file content, undecodable bytes replaced
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._entries.move_to_end(path)
+                return entry[2]
+
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            content = f.read()
+
+        size = len(content)
+        with self._lock:
+            self._remove(path)
+            if size <= self.max_bytes:
+                self._entries[path] = (stat.st_mtime_ns, stat.st_size, content)
+                self._total_bytes += size
+                while self._total_bytes > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+        return content
+
+    def _remove(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total_bytes -= len(entry[2])
+
+    def clear(self) -> None:
+        """Drop all cached contents."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ConditionalHTTPClient:
+    """
+    Pooled HTTP client that revalidates cached responses with ETags.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_ETAG_CACHE_ENTRIES, pool_size: int = DEFAULT_HTTP_POOL_SIZE,
+                 timeout: float = DEFAULT_HTTP_TIMEOUT):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._responses: "OrderedDict[Hashable, requests.Response]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(url: str, headers: Dict[str, str]) -> Tuple[str, str]:
+        # Responses are only shared between requests made with the same credentials
+        credentials = "\n".join(f"{name}:{value}" for name, value in sorted(headers.items()))
+        return url, hashlib.sha256(credentials.encode("utf-8")).hexdigest()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        GET a URL, answering from the cached response when the server replies 304 Not Modified.
+
+        Args:
+            url: The URL
+            headers: Request headers
+
+        Returns:
+            requests.Response: The fresh or the revalidated cached response
+        """
+        headers = dict(headers or {})
+        key = self._cache_key(url, headers)
+        with self._lock:
+            cached = self._responses.get(key)
+        if cached is not None:
+            headers["If-None-Match"] = cached.headers["ETag"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached is not None:
+            logger.info(f"Not modified since the last request: {url}")
+            with self._lock:
+                if key in self._responses:
+                    self._responses.move_to_end(key)
+            return cached
+
+        if response.status_code == 200 and response.headers.get("ETag"):
+            with self._lock:
+                self._responses[key] = response
+                self._responses.move_to_end(key)
+                while len(self._responses) > self.max_entries:
+                    self._responses.popitem(last=False)
+        return response
+
+
+_file_content_config = configs.get("file_content", {})
+file_content_cache = FileContentCache(
+    max_size_mb=_file_content_config.get("cache_max_size_mb", DEFAULT_CACHE_MAX_SIZE_MB),
+)
+http_client = ConditionalHTTPClient(
+    max_entries=_file_content_config.get("etag_cache_entries", DEFAULT_ETAG_CACHE_ENTRIES),
+    pool_size=_file_content_config.get("http_pool_size", DEFAULT_HTTP_POOL_SIZE),
+    timeout=_file_content_config.get("http_timeout", DEFAULT_HTTP_TIMEOUT),
+)
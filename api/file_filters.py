@@ -0,0 +1,173 @@
+"""
+Compiled include/exclude matching for repository files.
+
+Filter lists are normalized and compiled once into a FileFilter, which then
+answers per-directory and per-file questions with set lookups and a single
+combined regular expression. This module has no dependencies on the rest of
+the api package so the python_chunking and python_kb tools can share it.
+
+Directory entries ("./node_modules/", ".git", "packages/app") match a
+directory by name when they are a single path component, or by relative path
+prefix otherwise. File entries are glob patterns ("*.min.js", ".env.*")
+matched against the file name, or against the relative path (and its parent
+directories) when they contain a "/". Included file entries additionally
+match any file name ending with them, e.g. "config.py" or ".md".
+"""
+import fnmatch
+import os
+import re
+from typing import Iterable, List, Optional, Pattern, Set, Tuple
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+def normalize_path_entry(entry: str) -> str:
+    """
+    Normalize a directory or file filter entry to a relative, "/"-separated path.
+
+    Args:
+        entry (str): A filter entry such as "./.venv/" or "src\\api\\"
+
+    Returns:
+        str: The normalized entry, e.g. ".venv" or "src/api"
+    """
+    entry = entry.strip().replace("\\", "/")
+    while entry.startswith("./"):
+        entry = entry[2:]
+    return entry.strip("/")
+
+
+def _compile_globs(patterns: Iterable[str], allow_descendants: bool = False) -> Optional[Pattern]:
+    """Combine glob patterns into one regex, or return None if there are none."""
+    regexes = []
+    for pattern in patterns:
+        regex = fnmatch.translate(pattern)
+        if allow_descendants and regex.endswith(r"\Z"):
+            # Let "packages/*/dist" also match "packages/app/dist/index.js"
+            regex = regex[:-2] + r"(?:/.*)?\Z"
+        regexes.append(regex)
+    if not regexes:
+        return None
+    return re.compile("|".join(f"(?:{regex})" for regex in regexes))
+
+
+def _split_dir_entries(entries: Iterable[str]) -> Tuple[Set[str], Tuple[str, ...]]:
+    """Split directory entries into single names and multi-component path prefixes."""
+    names = set()
+    prefixes = []
+    for entry in entries:
+        normalized = normalize_path_entry(entry)
+        if not normalized or normalized == ".":
+            continue
+        if "/" in normalized:
+            prefixes.append(normalized)
+        else:
+            names.add(normalized)
+    return names, tuple(prefixes)
+
+
+def _has_prefix(rel_path: str, prefixes: Tuple[str, ...]) -> bool:
+    return any(rel_path == prefix or rel_path.startswith(prefix + "/") for prefix in prefixes)
+
+
+class FileFilter:
+    """
+    Include/exclude rules for repository files, compiled once and applied to many paths.
+
+    When any included directories or files are given, the filter is in inclusion mode
+    and a file is kept only if it is in an included directory or matches an included
+    file entry. Otherwise a file is kept unless it is in an excluded directory or matches
+    an excluded file pattern. Paths are relative to the repository root.
+    """
+
+    def __init__(self, excluded_dirs: List[str] = None, excluded_files: List[str] = None,
+                 included_dirs: List[str] = None, included_files: List[str] = None):
+        self.use_inclusion = bool(included_dirs) or bool(included_files)
+
+        self._excluded_dir_names, self._excluded_dir_prefixes = _split_dir_entries(excluded_dirs or [])
+        self._included_dir_names, self._included_dir_prefixes = _split_dir_entries(included_dirs or [])
+
+        name_patterns, path_patterns = [], []
+        for pattern in excluded_files or []:
+            normalized = normalize_path_entry(pattern)
+            if normalized:
+                (path_patterns if "/" in normalized else name_patterns).append(normalized)
+        self._excluded_name_regex = _compile_globs(name_patterns)
+        self._excluded_path_regex = _compile_globs(path_patterns, allow_descendants=True)
+
+        suffixes, glob_patterns = [], []
+        for pattern in included_files or []:
+            normalized = normalize_path_entry(pattern)
+            if not normalized:
+                continue
+            if _GLOB_CHARS.search(normalized):
+                glob_patterns.append(normalized)
+            else:
+                suffixes.append(normalized)
+        self._included_suffixes = tuple(suffixes)
+        self._included_name_regex = _compile_globs(p for p in glob_patterns if "/" not in p)
+        self._included_path_regex = _compile_globs((p for p in glob_patterns if "/" in p), allow_descendants=True)
+
+    @property
+    def excluded_dir_names(self) -> Set[str]:
+        """Directory names that are excluded wherever they appear."""
+        return self._excluded_dir_names
+
+    def should_descend(self, rel_dir: str) -> bool:
+        """
+        Whether a walker should descend into a directory.
+
+        Args:
+            rel_dir (str): Directory path relative to the repository root
+
+        Returns:
+            bool: False if no file below the directory can be kept
+        """
+        if self.use_inclusion:
+            # Included files may live anywhere
+            return True
+        rel_dir = rel_dir.replace(os.sep, "/")
+        if os.path.basename(rel_dir) in self._excluded_dir_names:
+            return False
+        if self._excluded_dir_prefixes and _has_prefix(rel_dir, self._excluded_dir_prefixes):
+            return False
+        if self._excluded_path_regex is not None and self._excluded_path_regex.match(rel_dir):
+            return False
+        return True
+
+    def matches(self, rel_path: str) -> bool:
+        """
+        Whether a file should be processed.
+
+        Args:
+            rel_path (str): File path relative to the repository root
+
+        Returns:
+            bool: True if the file passes the include/exclude rules
+        """
+        rel_path = rel_path.replace(os.sep, "/")
+        dir_path, file_name = os.path.split(rel_path)
+        dir_parts = dir_path.split("/") if dir_path else []
+
+        if self.use_inclusion:
+            if self._included_dir_names and any(part in self._included_dir_names for part in dir_parts):
+                return True
+            if self._included_dir_prefixes and _has_prefix(dir_path, self._included_dir_prefixes):
+                return True
+            if self._included_suffixes and file_name.endswith(self._included_suffixes):
+                return True
+            if self._included_name_regex is not None and self._included_name_regex.match(file_name):
+                return True
+            if self._included_path_regex is not None and self._included_path_regex.match(rel_path):
+                return True
+            return False
+
+        if self._excluded_dir_names and any(part in self._excluded_dir_names for part in dir_parts):
+            return False
+        if self._excluded_dir_prefixes and _has_prefix(dir_path, self._excluded_dir_prefixes):
+            return False
+        if self._excluded_name_regex is not None and self._excluded_name_regex.match(file_name):
+            return False
+        if self._excluded_path_regex is not None and self._excluded_path_regex.match(rel_path):
+            return False
+        return True
@@ -0,0 +1,224 @@
+"""
+Retrieval scoped to one file of a repository.
+
+When a chat request names a file, the candidates are that file's chunks,
+fetched through the file_path index of the index store, plus the chunks of the
+repository files it imports. They are ranked against the user's actual query
+instead of searching the whole repository for "Contexts related to {file_path}".
+"""
+import logging
+import posixpath
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+import numpy as np
+
+from api.vector_index import score_documents
+
+logger = logging.getLogger(__name__)
+
+# Default number of imported files whose chunks are ranked along with the file
+DEFAULT_MAX_IMPORT_FILES = 10
+
+_PYTHON_EXTENSIONS = (".py", ".pyi")
+_JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".vue", ".svelte")
+_C_EXTENSIONS = (".c", ".h", ".cc", ".cpp", ".cxx", ".hpp", ".hh")
+_JVM_EXTENSIONS = (".java", ".kt", ".scala")
+
+_PYTHON_IMPORT_RE = re.compile(r"^\s*(?:from\s+([.\w]+)\s+import|import\s+([\w.]+(?:\s*,\s*[\w.]+)*))", re.MULTILINE)
+_JS_IMPORT_RE = re.compile(
+    r"""(?:\bfrom\s+|\bimport\s+|\brequire\(\s*|\bimport\(\s*)['"]([^'"\n]+)['"]""")
+_C_INCLUDE_RE = re.compile(r'^\s*#\s*include\s+"([^"\n]+)"', re.MULTILINE)
+_JVM_IMPORT_RE = re.compile(r"^\s*import\s+(?:static\s+)?([\w.]+)", re.MULTILINE)
+
+
+def normalize_file_path(file_path: str) -> str:
+    """Normalize a requested file path to the relative form stored in chunk metadata."""
+    return posixpath.normpath(file_path.replace("\\", "/")).lstrip("/")
+
+
+def extract_imports(text: str, file_path: str) -> List[str]:
+    """
+    Find the module specifiers a file imports.
+
+    Args:
+        text: Content of the file
+        file_path: Path of the file, whose extension selects the import syntax
+
+    Returns:
+        List[str]: Specifiers in order of first appearance
+    """
+    extension = posixpath.splitext(file_path)[1].lower()
+    if extension in _PYTHON_EXTENSIONS:
+        specifiers = []
+        for from_module, modules in _PYTHON_IMPORT_RE.findall(text):
+            specifiers.extend([from_module] if from_module else [m.strip() for m in modules.split(",")])
+    elif extension in _JS_EXTENSIONS:
+        specifiers = _JS_IMPORT_RE.findall(text)
+    elif extension in _C_EXTENSIONS:
+        specifiers = _C_INCLUDE_RE.findall(text)
+    elif extension in _JVM_EXTENSIONS:
+        specifiers = _JVM_IMPORT_RE.findall(text)
+    else:
+        specifiers = []
+    return list(dict.fromkeys(specifiers))
+
+
+@lru_cache(maxsize=16)
+def _paths_by_basename(known_paths: FrozenSet[str]) -> Dict[str, List[str]]:
+    by_basename = {}
+    for path in known_paths:
+        by_basename.setdefault(posixpath.basename(path), []).append(path)
+    return by_basename
+
+
+def _match_path(candidate: str, known_paths: FrozenSet[str]) -> List[str]:
+    """Find known paths equal to candidate or ending with it, e.g. below src/."""
+    candidate = posixpath.normpath(candidate)
+    if candidate in known_paths:
+        return [candidate]
+    if candidate.startswith(".."):
+        return []
+    return sorted(path for path in _paths_by_basename(known_paths).get(posixpath.basename(candidate), [])
+                  if path.endswith("/" + candidate))
+
+
+def _candidate_paths(specifier: str, file_path: str) -> List[str]:
+    """Spell out the files a specifier may refer to."""
+    extension = posixpath.splitext(file_path)[1].lower()
+    directory = posixpath.dirname(file_path)
+    if extension in _PYTHON_EXTENSIONS:
+        module = specifier.lstrip(".")
+        dots = len(specifier) - len(module)
+        base = directory
+        for _ in range(max(dots - 1, 0)):
+            base = posixpath.dirname(base)
+        stem = module.replace(".", "/")
+        if dots:
+            stem = posixpath.join(base, stem) if stem else base
+            if not module:
+                return [posixpath.join(stem, "__init__.py")]
+        return [f"{stem}.py", f"{stem}.pyi", f"{stem}/__init__.py"]
+    if extension in _JS_EXTENSIONS:
+        if specifier.startswith("."):
+            stem = posixpath.join(directory, specifier)
+        else:
+            # Path aliases such as "@/components/Foo"; bare packages match no repository file
+            stem = re.sub(r"^[@~]/", "", specifier)
+        return [stem] + [stem + ext for ext in _JS_EXTENSIONS] + [f"{stem}/index{ext}" for ext in _JS_EXTENSIONS]
+    if extension in _C_EXTENSIONS:
+        return [posixpath.join(directory, specifier), specifier]
+    if extension in _JVM_EXTENSIONS:
+        stem = specifier.replace(".", "/")
+        return [stem + ext for ext in _JVM_EXTENSIONS]
+    return []
+
+
+def resolve_imports(specifiers: Sequence[str], file_path: str, known_paths: FrozenSet[str],
+                    max_files: int = DEFAULT_MAX_IMPORT_FILES) -> List[str]:
+    """
+    Map import specifiers to files of the repository.
+
+    Args:
+        specifiers: Specifiers found by extract_imports
+        file_path: Path of the importing file
+        known_paths: Paths of the repository's indexed files
+        max_files: Maximum number of files to return
+
+    Returns:
+        List[str]: Imported repository files in import order, without the file itself
+    """
+    resolved = []
+    for specifier in specifiers:
+        for candidate in _candidate_paths(specifier, file_path):
+            matches = [path for path in _match_path(candidate, known_paths) if path != file_path]
+            if matches:
+                # Several files may end with a short candidate; prefer the one nearest to the importer
+                best = min(matches, key=lambda path: len(posixpath.relpath(path, posixpath.dirname(file_path) or ".")))
+                if best not in resolved:
+                    resolved.append(best)
+                break
+        if len(resolved) >= max_files:
+            break
+    return resolved
+
+
+def _list_file_indices(documents: Sequence, file_paths: Sequence[str]) -> Dict[str, List[int]]:
+    wanted = set(file_paths)
+    indices = {}
+    for index, doc in enumerate(documents):
+        file_path = (doc.meta_data or {}).get("file_path")
+        if file_path in wanted:
+            indices.setdefault(file_path, []).append(index)
+    return indices
+
+
+def _file_indices(documents: Sequence, file_paths: Sequence[str]) -> Dict[str, List[int]]:
+    """Indices into documents of the chunks of some files."""
+    if not hasattr(documents, "store"):
+        return _list_file_indices(documents, file_paths)
+    indices = {}
+    for file_path, positions in documents.store.file_positions(file_paths).items():
+        found = documents.indices_of(positions)
+        if (found >= 0).any():
+            indices[file_path] = found[found >= 0].tolist()
+    return indices
+
+
+def file_scope_indices(documents: Sequence, file_path: str, include_imports: bool = True,
+                       max_import_files: int = DEFAULT_MAX_IMPORT_FILES) -> Tuple[List[int], List[str]]:
+    """
+    Collect the chunks of a file and of the repository files it imports.
+
+    Args:
+        documents: The retriever's documents, StoredDocuments or a list
+        file_path: Path of the file, relative to the repository root
+        include_imports: Also collect the chunks of imported files
+        max_import_files: Maximum number of imported files
+
+    Returns:
+        Tuple[List[int], List[str]]: Indices into documents, and the imported files used;
+        no indices if the file has no indexed chunks
+    """
+    file_path = normalize_file_path(file_path)
+    own = _file_indices(documents, [file_path]).get(file_path, [])
+    if not own or not include_imports:
+        return own, []
+
+    own_chunks = documents.take(own) if hasattr(documents, "take") else [documents[index] for index in own]
+    text = "\n".join(chunk.text or "" for chunk in own_chunks)
+    if hasattr(documents, "store"):
+        known_paths = documents.store.file_paths()
+    else:
+        known_paths = frozenset((doc.meta_data or {}).get("file_path") for doc in documents) - {None}
+    imported = resolve_imports(extract_imports(text, file_path), file_path, known_paths, max_import_files)
+
+    indices = list(own)
+    by_file = _file_indices(documents, imported)
+    for imported_path in imported:
+        indices.extend(by_file.get(imported_path, []))
+    return indices, [path for path in imported if path in by_file]
+
+
+def rank_by_similarity(documents: Sequence, indices: Sequence[int], query_embedding: Sequence[float],
+                       top_k: int, metric: str = "prob") -> Tuple[List[int], List[float]]:
+    """
+    Rank candidate documents by similarity to a query embedding.
+
+    Args:
+        documents: The retriever's documents
+        indices: Candidate indices into documents
+        query_embedding: Embedding of the user's query
+        top_k: Number of documents to return
+        metric: Retriever metric, which sets the scale of the scores (see score_documents)
+
+    Returns:
+        Tuple[List[int], List[float]]: The best indices and their scores, best first
+    """
+    if not len(indices):
+        return [], []
+    indices = np.asarray(indices, dtype=np.int64)
+    scores = score_documents(documents, indices, query_embedding, metric)
+    order = np.argsort(scores if metric == "euclidean" else -scores, kind="stable")[:top_k]
+    return indices[order].tolist(), scores[order].tolist()
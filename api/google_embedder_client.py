@@ -1,5 +1,6 @@
 """Google AI Embeddings ModelClient integration."""
 
+import asyncio
 import os
 import logging
 import backoff
@@ -225,7 +226,6 @@ class GoogleEmbedderClient(ModelClient):
         """Async call to Google AI embedding API.
         
         Note: Google AI Python client doesn't have async support yet,
-        so this falls back to synchronous call.
+        so the synchronous call runs in a worker thread to keep the event loop free.
         """
-        # Google AI client doesn't have async support yet
-        return self.call(api_kwargs, model_type)
\ No newline at end of file
+        return await asyncio.to_thread(self.call, api_kwargs, model_type)
\ No newline at end of file
@@ -0,0 +1,772 @@
+"""
+On-disk storage of a repository index.
+
+An index is stored as two files next to each other in ~/.adalflow/databases:
+
+- ``{repo}.db``: a SQLite database with the chunk texts and metadata, a
+  full-text index of the chunks for keyword search (see api.sparse_index), the
+  metadata of the source files and a small key/value table describing the
+  vectors file.
+- ``{repo}.{generation}.vectors``: the chunk embeddings as one contiguous,
+  row-major float32 (or float16) array without a header, which is
+  memory-mapped read-only when the index is opened.
+
+Every write creates a new vectors file and replaces the SQLite file
+atomically, so readers that still have the previous generation open keep a
+consistent view. Documents are materialized lazily, one chunk at a time,
+through StoredDocuments. Databases pickled by adalflow's LocalDB are migrated
+with migrate_pickle_database.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from adalflow.core.types import Document
+
+from api.config import configs
+from api.sparse_index import tokenize_code
+from api.vector_index import valid_vector_mask
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+INDEX_STORE_SUFFIX = ".db"
+VECTORS_SUFFIX = ".vectors"
+# Suffix appended to a pickled database once it has been migrated
+MIGRATED_SUFFIX = ".migrated"
+SUPPORTED_VECTOR_DTYPES = ("float32", "float16")
+
+# Rows fetched per query when iterating over many chunks
+_FETCH_BATCH_SIZE = 512
+
+_SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE chunks (
+    position INTEGER PRIMARY KEY,
+    id TEXT,
+    file_path TEXT,
+    text TEXT NOT NULL,
+    meta_data TEXT,
+    parent_doc_id TEXT,
+    chunk_order INTEGER,
+    estimated_num_tokens INTEGER,
+    has_vector INTEGER NOT NULL
+);
+CREATE INDEX chunks_file_path ON chunks (file_path);
+CREATE VIRTUAL TABLE chunk_terms USING fts5(
+    terms,
+    content='',
+    tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE TABLE sources (
+    position INTEGER PRIMARY KEY,
+    id TEXT,
+    file_path TEXT,
+    meta_data TEXT
+);
+"""
+
+
+def get_index_store_path(db_path: str) -> str:
+    """
+    Get the path of the index store for a database path.
+
+    Args:
+        db_path (str): Path of the database, e.g. ~/.adalflow/databases/owner_repo.pkl
+
+    Returns:
+        str: Path of the SQLite file, e.g. ~/.adalflow/databases/owner_repo.db
+    """
+    return os.path.splitext(db_path)[0] + INDEX_STORE_SUFFIX
+
+
+def get_vector_dtype() -> str:
+    """Get the configured storage type of the vectors."""
+    vector_dtype = configs.get("index_store", {}).get("vector_dtype", "float32")
+    if vector_dtype not in SUPPORTED_VECTOR_DTYPES:
+        raise ValueError(f"Unsupported index_store.vector_dtype: {vector_dtype}. "
+                         f"Expected one of {SUPPORTED_VECTOR_DTYPES}")
+    return vector_dtype
+
+
+def _dump_meta_data(meta_data: Optional[dict]) -> Optional[str]:
+    if meta_data is None:
+        return None
+    return json.dumps(meta_data, ensure_ascii=False, default=str)
+
+
+def _vector_size(vector) -> int:
+    if vector is None:
+        return 0
+    try:
+        return len(vector)
+    except TypeError:
+        return 0
+
+
+def _majority_dimension(chunks: List[Document]) -> Optional[int]:
+    """Most common non-zero embedding size, as used by the embedding validation."""
+    counts: Dict[int, int] = {}
+    for chunk in chunks:
+        size = _vector_size(chunk.vector)
+        if size:
+            counts[size] = counts.get(size, 0) + 1
+    if not counts:
+        return None
+    return max(counts, key=counts.get)
+
+
+class IndexStoreWriter:
+    """
+    Write a new generation of an index store.
+
+    Chunks are appended as they are added, so the writer holds no more than one
+    batch in memory. Nothing is visible to readers until commit() atomically
+    replaces the SQLite file. Chunks whose vector is missing, all zero, not finite or
+    of another size than the store's dimension are stored with a zero vector and
+    has_vector = 0.
+
+    The generation is staged in ``{path}.tmp``. checkpoint() makes everything added
+    so far durable, and a writer created with the same checkpoint_key and
+    resume=True continues from the last checkpoint of an interrupted build.
+    """
+
+    def __init__(self, path: str, dimension: Optional[int] = None, vector_dtype: str = "float32",
+                 checkpoint_key: str = None, resume: bool = False):
+        if vector_dtype not in SUPPORTED_VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {vector_dtype}")
+        self.path = path
+        self.dimension = dimension
+        self.vector_dtype = np.dtype(vector_dtype)
+        self.checkpoint_key = checkpoint_key
+        self.count = 0
+        self.num_sources = 0
+        self.num_valid = 0
+        # Chunks without a usable vector seen before the dimension is known
+        self._pending_zero_rows = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._tmp_path = f"{path}.tmp"
+        self.resumed = resume and checkpoint_key is not None and self._resume_from_checkpoint()
+        if not self.resumed:
+            self._discard_staging()
+            stem = os.path.splitext(path)[0]
+            self.vectors_path = f"{stem}.{uuid.uuid4().hex[:12]}{VECTORS_SUFFIX}"
+            self._conn = sqlite3.connect(self._tmp_path)
+            self._conn.executescript(_SCHEMA)
+            self._vectors_file = open(self.vectors_path, "wb")
+
+    def _read_staging_meta(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+
+    def _discard_staging(self) -> None:
+        """Remove the staged files of an earlier, unfinished generation."""
+        if not os.path.exists(self._tmp_path):
+            return
+        try:
+            conn = sqlite3.connect(self._tmp_path)
+            try:
+                vectors_file = self._read_staging_meta(conn).get("vectors_file")
+            finally:
+                conn.close()
+            if vectors_file:
+                vectors_path = os.path.join(os.path.dirname(os.path.abspath(self.path)), vectors_file)
+                if os.path.exists(vectors_path):
+                    os.remove(vectors_path)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read staged index {self._tmp_path}: {e}")
+        os.remove(self._tmp_path)
+
+    def _resume_from_checkpoint(self) -> bool:
+        if not os.path.exists(self._tmp_path):
+            return False
+        conn = None
+        try:
+            conn = sqlite3.connect(self._tmp_path)
+            meta = self._read_staging_meta(conn)
+            # Staged before the keyword index existed
+            conn.execute("SELECT 1 FROM chunk_terms LIMIT 1")
+            if meta.get("checkpoint_key") != self.checkpoint_key or meta.get("vector_dtype") != self.vector_dtype.name:
+                logger.info(f"Staged index {self._tmp_path} was built with different settings, starting over")
+                conn.close()
+                return False
+
+            count = int(meta["count"])
+            num_sources = int(meta["num_sources"])
+            num_valid = int(meta["num_valid"])
+            pending_zero_rows = int(meta["pending_zero_rows"])
+            dimension = int(meta["dimension"]) or None
+            vectors_path = os.path.join(os.path.dirname(os.path.abspath(self.path)), meta["vectors_file"])
+            vector_bytes = (count - pending_zero_rows) * (dimension or 0) * self.vector_dtype.itemsize
+            if os.path.getsize(vectors_path) < vector_bytes:
+                raise ValueError("vectors file is shorter than its checkpoint")
+
+            # Drop anything written after the last checkpoint. Such rows are never committed,
+            # which also keeps chunk_terms (whose rows cannot be deleted by rowid) consistent
+            conn.execute("DELETE FROM chunks WHERE position >= ?", (count,))
+            conn.execute("DELETE FROM sources WHERE position >= ?", (num_sources,))
+            conn.commit()
+            vectors_file = open(vectors_path, "r+b")
+            vectors_file.truncate(vector_bytes)
+            vectors_file.seek(vector_bytes)
+        except (sqlite3.Error, OSError, KeyError, ValueError) as e:
+            logger.warning(f"Cannot resume from staged index {self._tmp_path}: {e}")
+            if conn is not None:
+                conn.close()
+            return False
+
+        self._conn = conn
+        self._vectors_file = vectors_file
+        self.vectors_path = vectors_path
+        self.count = count
+        self.num_sources = num_sources
+        self.num_valid = num_valid
+        self._pending_zero_rows = pending_zero_rows
+        self.dimension = dimension
+        logger.info(f"Resuming index build from checkpoint with {num_sources} files and {count} chunks")
+        return True
+
+    def completed_sources(self) -> Dict[str, Optional[str]]:
+        """
+        Get the source files already written to this generation.
+
+        Returns:
+            Dict[str, Optional[str]]: Content hash of each written file by file path
+        """
+        completed = {}
+        for file_path, meta_data in self._conn.execute("SELECT file_path, meta_data FROM sources"):
+            completed[file_path] = (json.loads(meta_data) if meta_data else {}).get("content_hash")
+        return completed
+
+    def add_sources(self, documents: Iterable[Document]) -> None:
+        """
+        Record the source documents the chunks were split from.
+
+        Only their metadata is kept; the chunk texts hold the content.
+
+        Args:
+            documents: Source documents in file order
+        """
+        rows = []
+        for doc in documents:
+            meta_data = doc.meta_data or {}
+            rows.append((self.num_sources, doc.id, meta_data.get("file_path"), _dump_meta_data(doc.meta_data)))
+            self.num_sources += 1
+        self._conn.executemany("INSERT INTO sources VALUES (?, ?, ?, ?)", rows)
+
+    def _write_zero_rows(self, count: int) -> None:
+        if count and self.dimension:
+            self._vectors_file.write(np.zeros((count, self.dimension), dtype=self.vector_dtype).tobytes())
+
+    def add_chunks(self, chunks: Iterable[Document]) -> None:
+        """
+        Append embedded chunks.
+
+        Vectors are validated here, once, in a single pass over the batch, and the
+        result is persisted as has_vector so loading the store needs no validation.
+        The keyword terms of each chunk and its file path are indexed as well.
+
+        Args:
+            chunks: Chunks with their vectors, in index order
+        """
+        chunks = list(chunks)
+        sizes = [_vector_size(chunk.vector) for chunk in chunks]
+        if self.dimension is None:
+            self.dimension = next((size for size in sizes if size), None)
+            if self.dimension is not None:
+                self._write_zero_rows(self._pending_zero_rows)
+                self._pending_zero_rows = 0
+
+        if self.dimension is None:
+            self._pending_zero_rows += len(chunks)
+            valid = np.zeros(len(chunks), dtype=bool)
+        else:
+            matched = np.flatnonzero(np.asarray(sizes, dtype=np.int64) == self.dimension)
+            matrix = np.zeros((len(chunks), self.dimension), dtype=self.vector_dtype)
+            if len(matched):
+                matrix[matched] = np.asarray([chunks[i].vector for i in matched], dtype=np.float32)
+            valid = np.zeros(len(chunks), dtype=bool)
+            valid[matched] = valid_vector_mask(matrix[matched])
+            matrix[~valid] = 0
+            self._vectors_file.write(matrix.tobytes())
+
+        rows = []
+        term_rows = []
+        for chunk, has_vector in zip(chunks, valid.tolist()):
+            meta_data = chunk.meta_data or {}
+            rows.append((
+                self.count, chunk.id, meta_data.get("file_path"), chunk.text or "",
+                _dump_meta_data(chunk.meta_data), chunk.parent_doc_id, chunk.order,
+                chunk.estimated_num_tokens, int(has_vector),
+            ))
+            term_rows.append((self.count, " ".join(tokenize_code(f"{meta_data.get('file_path') or ''}\n{chunk.text or ''}"))))
+            self.count += 1
+        self.num_valid += int(valid.sum())
+        self._conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._conn.executemany("INSERT INTO chunk_terms (rowid, terms) VALUES (?, ?)", term_rows)
+
+    def copy_chunks(self, store: "IndexStore", positions: Sequence[int]) -> None:
+        """
+        Append chunks of another generation without materializing them as Documents.
+
+        Rows are copied in batches and vectors as blocks of the other store's vectors
+        file, so an incremental update keeps unchanged chunks at constant memory.
+
+        Args:
+            store: The store to copy from
+            positions: Positions of the chunks in store, in the order to append them
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if self.dimension is None and store.dimension:
+            self.dimension = store.dimension
+            self._write_zero_rows(self._pending_zero_rows)
+            self._pending_zero_rows = 0
+        # Vectors of another size than this generation's cannot be kept
+        same_dimension = self.dimension is not None and store.dimension == self.dimension
+
+        for start in range(0, len(positions), _FETCH_BATCH_SIZE):
+            batch = positions[start:start + _FETCH_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            by_position = {row[0]: row for row in store._query(
+                f"SELECT * FROM chunks WHERE position IN ({placeholders})", batch.tolist())}
+            if len(by_position) != len(batch):
+                raise IndexError(f"Chunk positions of the copied files are missing from {store.path}")
+
+            rows = []
+            term_rows = []
+            for position in batch.tolist():
+                _, doc_id, file_path, text, meta_data, parent_doc_id, order, estimated_num_tokens, has_vector = \
+                    by_position[position]
+                has_vector = int(bool(has_vector) and same_dimension)
+                rows.append((self.count, doc_id, file_path, text, meta_data, parent_doc_id, order,
+                             estimated_num_tokens, has_vector))
+                term_rows.append((self.count, " ".join(tokenize_code(f"{file_path or ''}\n{text}"))))
+                self.num_valid += has_vector
+                self.count += 1
+
+            if same_dimension:
+                self._vectors_file.write(np.ascontiguousarray(store.vectors[batch], dtype=self.vector_dtype).tobytes())
+            elif self.dimension is None:
+                self._pending_zero_rows += len(batch)
+            else:
+                self._write_zero_rows(len(batch))
+            self._conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.executemany("INSERT INTO chunk_terms (rowid, terms) VALUES (?, ?)", term_rows)
+
+    def _write_meta(self, meta: Dict) -> None:
+        self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+
+    def _layout_meta(self) -> Dict:
+        return {
+            "count": self.count,
+            "num_sources": self.num_sources,
+            "num_valid": self.num_valid,
+            "dimension": self.dimension or 0,
+            "vector_dtype": self.vector_dtype.name,
+            "vectors_file": os.path.basename(self.vectors_path),
+        }
+
+    def checkpoint(self) -> None:
+        """Make all sources and chunks added so far durable."""
+        self._vectors_file.flush()
+        os.fsync(self._vectors_file.fileno())
+        self._write_meta({
+            **self._layout_meta(),
+            "checkpoint_key": self.checkpoint_key or "",
+            "pending_zero_rows": self._pending_zero_rows,
+        })
+        self._conn.commit()
+
+    def commit(self) -> "IndexStore":
+        """
+        Publish the written generation and remove older vectors files.
+
+        Returns:
+            IndexStore: The store opened on the new generation
+        """
+        self._vectors_file.close()
+        self._write_meta({"format_version": FORMAT_VERSION, **self._layout_meta()})
+        self._conn.execute("DELETE FROM meta WHERE key IN ('checkpoint_key', 'pending_zero_rows')")
+        self._conn.commit()
+        self._conn.close()
+        os.replace(self._tmp_path, self.path)
+        _remove_stale_vectors_files(self.path, keep=self.vectors_path)
+        logger.info(f"Saved index store with {self.count} chunks of dimension {self.dimension or 0} to {self.path}")
+        return IndexStore(self.path)
+
+    def close(self) -> None:
+        """Close the staged files, keeping them up to the last checkpoint for a later resume."""
+        self._vectors_file.close()
+        self._conn.close()
+
+    def abort(self) -> None:
+        """Discard the written generation."""
+        self._vectors_file.close()
+        self._conn.close()
+        for path in (self._tmp_path, self.vectors_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _remove_stale_vectors_files(path: str, keep: str) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    stem = os.path.basename(os.path.splitext(path)[0])
+    # Match only this store's generations: another repository's stem may extend this one (owner_next.js)
+    pattern = re.compile(re.escape(stem) + r"\.[0-9a-f]{12}" + re.escape(VECTORS_SUFFIX))
+    for name in os.listdir(directory):
+        if pattern.fullmatch(name) and name != os.path.basename(keep):
+            # Readers that still map the old generation keep it alive until they close it
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError as e:
+                logger.warning(f"Could not remove stale vectors file {name}: {e}")
+
+
+def write_index_store(path: str, source_documents: List[Document], chunks: List[Document],
+                      vector_dtype: str = None) -> "IndexStore":
+    """
+    Write a complete index store.
+
+    Args:
+        path: Path of the SQLite file
+        source_documents: The source documents of the repository
+        chunks: The embedded chunks
+        vector_dtype: "float32" or "float16"; defaults to index_store.vector_dtype
+
+    Returns:
+        IndexStore: The written store
+    """
+    chunks = list(chunks)
+    writer = IndexStoreWriter(path, _majority_dimension(chunks), vector_dtype or get_vector_dtype())
+    try:
+        writer.add_sources(source_documents)
+        writer.add_chunks(chunks)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.commit()
+
+
+class IndexStore:
+    """
+    Read-only view of one generation of an index store.
+
+    Chunk rows are read from SQLite on demand and vectors come from the memory-mapped
+    vectors file, so opening a store costs the same for any repository size.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+        if int(meta.get("format_version", 0)) != FORMAT_VERSION:
+            self._conn.close()
+            raise ValueError(f"Unsupported index store format {meta.get('format_version')} in {path}")
+
+        self.count = int(meta["count"])
+        self.num_sources = int(meta.get("num_sources", 0))
+        # Number of chunks with a valid vector, unknown for stores written before it was recorded
+        self.num_valid = int(meta["num_valid"]) if "num_valid" in meta else None
+        self._valid_positions = None
+        self._file_paths = None
+        self.dimension = int(meta["dimension"])
+        self.vector_dtype = np.dtype(meta["vector_dtype"])
+        self.vectors_path = os.path.join(os.path.dirname(os.path.abspath(path)), meta["vectors_file"])
+
+        expected_bytes = self.count * self.dimension * self.vector_dtype.itemsize
+        actual_bytes = os.path.getsize(self.vectors_path)
+        if actual_bytes != expected_bytes:
+            self._conn.close()
+            raise ValueError(f"Vectors file {self.vectors_path} has {actual_bytes} bytes, expected {expected_bytes}")
+        if expected_bytes:
+            self.vectors = np.memmap(self.vectors_path, dtype=self.vector_dtype, mode="r",
+                                     shape=(self.count, self.dimension))
+        else:
+            self.vectors = np.zeros((self.count, self.dimension), dtype=self.vector_dtype)
+        # Stores written before keyword search was added have no terms table
+        self.has_terms = bool(self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chunk_terms'").fetchone())
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def valid_positions(self) -> np.ndarray:
+        """Positions of the chunks stored with a valid vector, as validated when they were written."""
+        if self._valid_positions is None:
+            if self.num_valid == self.count:
+                self._valid_positions = np.arange(self.count, dtype=np.int64)
+            else:
+                rows = self._query("SELECT position FROM chunks WHERE has_vector = 1 ORDER BY position")
+                self._valid_positions = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        return self._valid_positions
+
+    def get_vectors(self, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Get vectors as a float32 matrix.
+
+        Args:
+            positions: Chunk positions, or None for all chunks
+
+        Returns:
+            np.ndarray: Matrix of shape (len(positions), dimension)
+        """
+        vectors = self.vectors if positions is None else self.vectors[positions]
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _row_to_document(self, row) -> Document:
+        position, doc_id, _, text, meta_data, parent_doc_id, order, estimated_num_tokens, has_vector = row
+        return Document(
+            text=text,
+            meta_data=json.loads(meta_data) if meta_data is not None else None,
+            vector=self.vectors[position].astype(np.float32).tolist() if has_vector else [],
+            id=doc_id,
+            order=order,
+            parent_doc_id=parent_doc_id,
+            estimated_num_tokens=estimated_num_tokens,
+        )
+
+    def get_documents(self, positions: Sequence) -> List[Document]:
+        """
+        Materialize chunks as Documents.
+
+        Args:
+            positions: Chunk positions
+
+        Returns:
+            List[Document]: The chunks, in the order of positions
+        """
+        positions = [int(position) for position in positions]
+        by_position = {}
+        for start in range(0, len(positions), _FETCH_BATCH_SIZE):
+            batch = positions[start:start + _FETCH_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            for row in self._query(f"SELECT * FROM chunks WHERE position IN ({placeholders})", batch):
+                by_position[row[0]] = self._row_to_document(row)
+        missing = [position for position in positions if position not in by_position]
+        if missing:
+            raise IndexError(f"Chunk positions {missing[:5]} are not in {self.path}")
+        return [by_position[position] for position in positions]
+
+    def neighbor_positions(self, positions: Sequence, window: int) -> Dict[int, List[int]]:
+        """
+        Find the chunks next to the given chunks in their source file.
+
+        Args:
+            positions: Chunk positions
+            window: Number of chunks to include on each side
+
+        Returns:
+            Dict[int, List[int]]: For each position, the positions of the chunks of the same
+            file whose order is within window of it, in file order
+        """
+        positions = [int(position) for position in positions]
+        neighbors = {position: [] for position in positions}
+        for start in range(0, len(positions), _FETCH_BATCH_SIZE):
+            batch = positions[start:start + _FETCH_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._query(
+                "SELECT hit.position, chunk.position FROM chunks AS hit JOIN chunks AS chunk"
+                " ON chunk.file_path = hit.file_path AND chunk.parent_doc_id IS hit.parent_doc_id"
+                " AND chunk.chunk_order BETWEEN hit.chunk_order - ? AND hit.chunk_order + ?"
+                f" WHERE hit.position IN ({placeholders}) ORDER BY hit.position, chunk.chunk_order",
+                [window, window] + batch,
+            )
+            for hit_position, position in rows:
+                neighbors[hit_position].append(position)
+        return neighbors
+
+    def file_paths(self) -> frozenset:
+        """Paths of the files that have chunks in the store."""
+        if self._file_paths is None:
+            rows = self._query("SELECT DISTINCT file_path FROM chunks WHERE file_path IS NOT NULL")
+            self._file_paths = frozenset(row[0] for row in rows)
+        return self._file_paths
+
+    def file_positions(self, file_paths: Sequence[str]) -> Dict[str, List[int]]:
+        """
+        Find the chunks of files through the file_path index.
+
+        Args:
+            file_paths: File paths relative to the repository root
+
+        Returns:
+            Dict[str, List[int]]: Chunk positions of each file that has chunks, in file order
+        """
+        file_paths = list(dict.fromkeys(file_paths))
+        positions = {}
+        for start in range(0, len(file_paths), _FETCH_BATCH_SIZE):
+            batch = file_paths[start:start + _FETCH_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._query(f"SELECT file_path, position FROM chunks WHERE file_path IN ({placeholders})"
+                               " ORDER BY file_path, parent_doc_id, chunk_order, position", batch)
+            for file_path, position in rows:
+                positions.setdefault(file_path, []).append(position)
+        return positions
+
+    def search_terms(self, match_query: str, limit: int) -> List[int]:
+        """
+        Rank chunks by BM25 against a full-text query.
+
+        Args:
+            match_query: An FTS5 MATCH expression over code-aware terms (see api.sparse_index)
+            limit: Maximum number of chunks to return
+
+        Returns:
+            List[int]: Chunk positions, best first
+        """
+        if not self.has_terms or limit <= 0:
+            return []
+        rows = self._query("SELECT rowid FROM chunk_terms WHERE chunk_terms MATCH ? ORDER BY bm25(chunk_terms) LIMIT ?",
+                           (match_query, limit))
+        return [row[0] for row in rows]
+
+    def iter_chunks(self) -> Iterator[Document]:
+        """Iterate over all chunks in index order, fetching them in batches."""
+        for start in range(0, self.count, _FETCH_BATCH_SIZE):
+            rows = self._query("SELECT * FROM chunks WHERE position >= ? AND position < ? ORDER BY position",
+                               (start, start + _FETCH_BATCH_SIZE))
+            for row in rows:
+                yield self._row_to_document(row)
+
+    def documents(self, positions: Optional[np.ndarray] = None) -> "StoredDocuments":
+        """
+        Get a lazy sequence of chunks.
+
+        Args:
+            positions: Chunk positions to expose, or None for all chunks
+
+        Returns:
+            StoredDocuments: The chunks, materialized on access
+        """
+        if positions is None:
+            positions = np.arange(self.count, dtype=np.int64)
+        return StoredDocuments(self, positions)
+
+    def source_documents(self) -> List[Document]:
+        """
+        Get the metadata of the source documents, in file order.
+
+        Returns:
+            List[Document]: Source documents with empty text
+        """
+        rows = self._query("SELECT id, meta_data FROM sources ORDER BY position")
+        return [
+            Document(text="", id=doc_id, meta_data=json.loads(meta_data) if meta_data is not None else {})
+            for doc_id, meta_data in rows
+        ]
+
+    def close(self) -> None:
+        """Close the SQLite connection; mapped vectors stay readable until released."""
+        with self._lock:
+            self._conn.close()
+
+
+class StoredDocuments(Sequence):
+    """
+    Lazy, read-only sequence of chunks backed by an IndexStore.
+
+    Items are materialized as Documents on access. Vectors can be read in bulk with
+    vectors() without materializing any Document.
+    """
+
+    def __init__(self, store: IndexStore, positions: np.ndarray):
+        self.store = store
+        self.positions = positions
+        self._sorter = None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return StoredDocuments(self.store, self.positions[index])
+        return self.store.get_documents([self.positions[index]])[0]
+
+    def __iter__(self) -> Iterator[Document]:
+        for start in range(0, len(self.positions), _FETCH_BATCH_SIZE):
+            yield from self.store.get_documents(self.positions[start:start + _FETCH_BATCH_SIZE])
+
+    def take(self, indices: Sequence[int]) -> List[Document]:
+        """Materialize the chunks at some indices of this sequence with batched queries."""
+        return self.store.get_documents(self.positions[np.asarray(indices, dtype=np.int64)])
+
+    def vectors(self) -> np.ndarray:
+        """Vectors of the chunks as a float32 matrix."""
+        return self.store.get_vectors(self.positions)
+
+    def vectors_at(self, indices: np.ndarray) -> np.ndarray:
+        """Vectors of the chunks at some indices of this sequence as a float32 matrix."""
+        return self.store.get_vectors(self.positions[np.asarray(indices, dtype=np.int64)])
+
+    def indices_of(self, positions: Sequence) -> np.ndarray:
+        """
+        Find chunk positions in this sequence.
+
+        Args:
+            positions: Chunk positions
+
+        Returns:
+            np.ndarray: Index of each position in this sequence, -1 where it is absent
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(self.positions) == 0 or len(positions) == 0:
+            return np.full(len(positions), -1, dtype=np.int64)
+        if self._sorter is None:
+            self._sorter = np.argsort(self.positions, kind="stable")
+        found = np.searchsorted(self.positions, positions, sorter=self._sorter)
+        found = self._sorter[np.minimum(found, len(self.positions) - 1)]
+        return np.where(self.positions[found] == positions, found, -1)
+
+    def with_valid_vectors(self) -> "StoredDocuments":
+        """The chunks that were stored with a valid vector."""
+        if self.store.num_valid == self.store.count:
+            return self
+        valid = self.store.valid_positions()
+        positions = self.positions[np.isin(self.positions, valid, assume_unique=True)]
+        if len(positions) < len(self.positions):
+            logger.warning(f"{len(self.positions) - len(positions)} chunks have no valid embedding, skipping them")
+        return StoredDocuments(self.store, positions)
+
+    def memory_bytes(self) -> int:
+        """Memory held outside of the page cache."""
+        # Positions plus the sort order indices_of builds on the first keyword search
+        return 2 * self.positions.nbytes
+
+
+def migrate_pickle_database(pickle_path: str, path: str) -> "IndexStore":
+    """
+    Convert a database pickled by adalflow's LocalDB into an index store.
+
+    Once the store has been written the pickle is renamed to *.pkl.migrated,
+    so it stays available for a rollback but is not migrated again.
+
+    Args:
+        pickle_path: Path of the LocalDB pickle
+        path: Path of the index store to write
+
+    Returns:
+        IndexStore: The migrated store
+    """
+    from adalflow.core.db import LocalDB
+
+    logger.info(f"Migrating pickled database {pickle_path} to {path}")
+    db = LocalDB.load_state(pickle_path)
+    store = write_index_store(path, db.items, db.get_transformed_data(key="split_and_embed") or [])
+    os.replace(pickle_path, pickle_path + MIGRATED_SUFFIX)
+    return store
@@ -1,5 +1,6 @@
-from typing import Sequence, List
-from copy import deepcopy
+from typing import Sequence, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from tqdm import tqdm
 import logging
 import adalflow as adal
@@ -18,24 +19,44 @@ class OllamaModelNotFoundError(Exception):
     """Custom exception for when Ollama model is not found"""
     pass
 
+def _get_ollama_base_url(ollama_host: str) -> str:
+    """Strip a trailing /api (and slash) from an Ollama host URL."""
+    ollama_host = ollama_host.rstrip('/')
+    if ollama_host.endswith('/api'):
+        ollama_host = ollama_host[:-4]
+    return ollama_host
+
+def get_ollama_host(embedder_config: dict = None) -> str:
+    """
+    Get the Ollama host URL the embedder is configured with.
+
+    Args:
+        embedder_config: Ollama embedder configuration; its initialize_kwargs host,
+            if any, is passed to OllamaClient as well
+
+    Returns:
+        str: The configured host, else OLLAMA_HOST, else localhost:11434
+    """
+    host = ((embedder_config or {}).get("initialize_kwargs") or {}).get("host")
+    return host or os.getenv("OLLAMA_HOST", "http://localhost:11434")
+
 def check_ollama_model_exists(model_name: str, ollama_host: str = None) -> bool:
     """
     Check if an Ollama model exists before attempting to use it.
     
     Args:
         model_name: Name of the model to check
-        ollama_host: Ollama host URL, defaults to localhost:11434
+        ollama_host: Ollama host URL, defaults to OLLAMA_HOST or localhost:11434
         
     Returns:
         bool: True if model exists, False otherwise
     """
     if ollama_host is None:
-        ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+        ollama_host = get_ollama_host()
     
     try:
         # Remove /api prefix if present and add it back
-        if ollama_host.endswith('/api'):
-            ollama_host = ollama_host[:-4]
+        ollama_host = _get_ollama_base_url(ollama_host)
         
         response = requests.get(f"{ollama_host}/api/tags", timeout=5)
         if response.status_code == 200:
@@ -61,45 +82,126 @@ def check_ollama_model_exists(model_name: str, ollama_host: str = None) -> bool:
 
 class OllamaDocumentProcessor(DataComponent):
     """
-    Process documents for Ollama embeddings by processing one document at a time.
-    Adalflow Ollama Client does not support batch embedding, so we need to process each document individually.
+    Process documents for Ollama embeddings in batches with several requests in flight.
+
+    Documents are sent in batches to Ollama's multi-input /api/embed endpoint. Servers
+    that predate it (404) are handled by falling back to the single-input
+    /api/embeddings endpoint. A batch that fails is retried one document at a time so
+    that a single bad chunk only drops itself. Embeddings whose size differs from the
+    first one are skipped, and only successfully embedded documents are returned, in
+    input order.
     """
-    def __init__(self, embedder: adal.Embedder) -> None:
+    def __init__(self, embedder: adal.Embedder, batch_size: int = 32, concurrency: int = 4,
+                 ollama_host: str = None, timeout: float = 120) -> None:
         super().__init__()
         self.embedder = embedder
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.ollama_host = ollama_host
+        self.timeout = timeout
+
+    def _get_request_settings(self):
+        host = self.ollama_host or get_ollama_host()
+        model_kwargs = dict(self.embedder.model_kwargs or {})
+        model_name = model_kwargs.pop('model', None)
+        if not model_name:
+            raise ValueError("Ollama embedder model_kwargs must specify a model")
+        return _get_ollama_base_url(host), model_name, model_kwargs
+
+    def _embed_batch(self, session: requests.Session, base_url: str, model_name: str,
+                     extra_kwargs: dict, texts: List[str]) -> List[List[float]]:
+        response = session.post(
+            f"{base_url}/api/embed",
+            json={**extra_kwargs, "model": model_name, "input": texts},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        embeddings = response.json().get('embeddings') or []
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        return embeddings
+
+    def _embed_single_legacy(self, session: requests.Session, base_url: str, model_name: str,
+                             extra_kwargs: dict, text: str) -> List[float]:
+        response = session.post(
+            f"{base_url}/api/embeddings",
+            json={**extra_kwargs, "model": model_name, "prompt": text},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json().get('embedding') or []
 
     def __call__(self, documents: Sequence[Document]) -> Sequence[Document]:
-        output = deepcopy(documents)
-        logger.info(f"Processing {len(output)} documents individually for Ollama embeddings")
+        documents = list(documents)
+        logger.info(f"Processing {len(documents)} documents for Ollama embeddings "
+                    f"in batches of {self.batch_size} with up to {self.concurrency} requests in flight")
+        if not documents:
+            return []
 
-        successful_docs = []
-        expected_embedding_size = None
+        base_url, model_name, extra_kwargs = self._get_request_settings()
+        batches = [documents[i:i + self.batch_size] for i in range(0, len(documents), self.batch_size)]
+        # Set to False once the server reports that /api/embed does not exist
+        use_batch_endpoint = [True]
 
-        for i, doc in enumerate(tqdm(output, desc="Processing documents for Ollama embeddings")):
+        def embed_one(session: requests.Session, doc: Document) -> Optional[List[float]]:
             try:
-                # Get embedding for a single document
-                result = self.embedder(input=doc.text)
-                if result.data and len(result.data) > 0:
-                    embedding = result.data[0].embedding
-
-                    # Validate embedding size consistency
-                    if expected_embedding_size is None:
-                        expected_embedding_size = len(embedding)
-                        logger.info(f"Expected embedding size set to: {expected_embedding_size}")
-                    elif len(embedding) != expected_embedding_size:
-                        file_path = getattr(doc, 'meta_data', {}).get('file_path', f'document_{i}')
-                        logger.warning(f"Document '{file_path}' has inconsistent embedding size {len(embedding)} != {expected_embedding_size}, skipping")
-                        continue
-
-                    # Assign the embedding to the document
-                    output[i].vector = embedding
-                    successful_docs.append(output[i])
-                else:
-                    file_path = getattr(doc, 'meta_data', {}).get('file_path', f'document_{i}')
-                    logger.warning(f"Failed to get embedding for document '{file_path}', skipping")
+                if use_batch_endpoint[0]:
+                    return self._embed_batch(session, base_url, model_name, extra_kwargs, [doc.text])[0]
+                return self._embed_single_legacy(session, base_url, model_name, extra_kwargs, doc.text)
             except Exception as e:
-                file_path = getattr(doc, 'meta_data', {}).get('file_path', f'document_{i}')
+                file_path = (doc.meta_data or {}).get('file_path', 'unknown')
                 logger.error(f"Error processing document '{file_path}': {e}, skipping")
+                return None
+
+        def embed_batch(session: requests.Session, batch: List[Document]) -> List[Optional[List[float]]]:
+            if use_batch_endpoint[0]:
+                try:
+                    return self._embed_batch(session, base_url, model_name, extra_kwargs, [doc.text for doc in batch])
+                except requests.exceptions.HTTPError as e:
+                    if e.response is not None and e.response.status_code == 404:
+                        if use_batch_endpoint[0]:
+                            logger.info("Ollama server has no /api/embed endpoint, using /api/embeddings")
+                        use_batch_endpoint[0] = False
+                    else:
+                        logger.warning(f"Ollama batch embedding failed ({e}), embedding documents individually")
+                except Exception as e:
+                    logger.warning(f"Ollama batch embedding failed ({e}), embedding documents individually")
+            return [embed_one(session, doc) for doc in batch]
+
+        with requests.Session() as session:
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                # executor.map yields the batch results in input order
+                results = list(tqdm(
+                    executor.map(lambda batch: embed_batch(session, batch), batches),
+                    total=len(batches),
+                    desc="Processing document batches for Ollama embeddings",
+                ))
+
+        successful_docs = []
+        expected_embedding_size = None
+        for batch, embeddings in zip(batches, results):
+            for doc, embedding in zip(batch, embeddings):
+                file_path = (doc.meta_data or {}).get('file_path', 'unknown')
+                if not embedding:
+                    logger.warning(f"Failed to get embedding for document '{file_path}', skipping")
+                    continue
+
+                # Validate embedding size consistency
+                if expected_embedding_size is None:
+                    expected_embedding_size = len(embedding)
+                    logger.info(f"Expected embedding size set to: {expected_embedding_size}")
+                elif len(embedding) != expected_embedding_size:
+                    logger.warning(f"Document '{file_path}' has inconsistent embedding size {len(embedding)} != {expected_embedding_size}, skipping")
+                    continue
+
+                # Leave the input documents unmodified
+                successful_docs.append(replace(doc, vector=embedding))
+
+        logger.info(f"Successfully processed {len(successful_docs)}/{len(documents)} documents with consistent embeddings")
+        return successful_docs
 
-        logger.info(f"Successfully processed {len(successful_docs)}/{len(output)} documents with consistent embeddings")
-        return successful_docs
\ No newline at end of file
+    def _extra_repr(self) -> str:
+        return f"batch_size={self.batch_size}, concurrency={self.concurrency}"
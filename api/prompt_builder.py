@@ -0,0 +1,201 @@
+"""
+Token-budgeted prompt construction for the chat handlers.
+
+The prompt of a chat request is packed to fit the context window of the
+selected model (``context_windows`` in generator.json) before it is sent,
+instead of retrying without retrieved context after the provider rejects it.
+Every part is tokenized once and added in priority order: the system prompt
+and the query, the content of the requested file (truncated to its share of
+the budget), the conversation history from the newest turn back, and finally
+the retrieved documents by rank.
+"""
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from adalflow.core.types import Document
+
+from api import token_counter
+from api.config import configs
+from api.context_assembler import assemble_context
+
+logger = logging.getLogger(__name__)
+
+# Context window of models without a configured one
+DEFAULT_CONTEXT_WINDOW = 8192
+# Tokens kept free for the answer, capped at a quarter of the context window
+DEFAULT_OUTPUT_RESERVE_TOKENS = 8192
+# Share of the window kept free because providers tokenize differently than tiktoken
+DEFAULT_SAFETY_MARGIN = 0.1
+# Share of the prompt budget the requested file may use, so history and documents still fit
+DEFAULT_FILE_CONTENT_SHARE = 0.5
+# Prompt tokens are estimated with the cl100k encoding for every provider
+PROMPT_TOKENIZER = "openai"
+
+CONTEXT_START = "<START_OF_CONTEXT>"
+CONTEXT_END = "<END_OF_CONTEXT>"
+TRUNCATION_NOTE = "\n... (truncated to fit the model's context window)"
+NO_CONTEXT_NOTE = "<note>Answering without retrieval augmentation.</note>\n\n"
+
+
+def count_prompt_tokens(text: str) -> int:
+    """Estimate the number of tokens of a prompt part."""
+    return token_counter.count_tokens(text, PROMPT_TOKENIZER)
+
+
+def get_context_window(provider: str, model: Optional[str] = None) -> int:
+    """
+    Get the context window of a model.
+
+    Args:
+        provider: Model provider
+        model: Model name, or None for the provider's default model
+
+    Returns:
+        int: The configured context window, the Ollama num_ctx option, the provider's
+        default_context_window or DEFAULT_CONTEXT_WINDOW, in that order
+    """
+    provider_config = configs.get("providers", {}).get(provider, {})
+    model = model or provider_config.get("default_model")
+    context_windows = provider_config.get("context_windows", {})
+    if model in context_windows:
+        return context_windows[model]
+    # Custom models run with the default model's parameters, as in get_model_config
+    models = provider_config.get("models", {})
+    model_params = models.get(model, models.get(provider_config.get("default_model"), {}))
+    num_ctx = model_params.get("options", model_params).get("num_ctx")
+    if num_ctx:
+        return num_ctx
+    return provider_config.get("default_context_window", DEFAULT_CONTEXT_WINDOW)
+
+
+def get_prompt_budget(provider: str, model: Optional[str] = None) -> int:
+    """
+    Get the number of tokens a prompt may use.
+
+    Args:
+        provider: Model provider
+        model: Model name, or None for the provider's default model
+
+    Returns:
+        int: The context window minus the output reserve and the safety margin
+    """
+    budget_config = configs.get("prompt_budget", {})
+    context_window = get_context_window(provider, model)
+    output_reserve = min(budget_config.get("output_reserve_tokens", DEFAULT_OUTPUT_RESERVE_TOKENS),
+                         context_window // 4)
+    margin = int(context_window * budget_config.get("safety_margin", DEFAULT_SAFETY_MARGIN))
+    return context_window - output_reserve - margin
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut a text to at most max_tokens tokens.
+
+    Args:
+        text: The text
+        max_tokens: Maximum number of tokens to keep
+
+    Returns:
+        str: The start of the text
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = token_counter.get_encoding(PROMPT_TOKENIZER)
+    return encoding.decode(encoding.encode_ordinary(text)[:max_tokens])
+
+
+def format_turn(user_query: str, assistant_response: str) -> str:
+    """Format one dialog turn of the conversation history."""
+    return f"<turn>\n<user>{user_query}</user>\n<assistant>{assistant_response}</assistant>\n</turn>\n"
+
+
+def _select_documents(documents: Sequence[Document], budget: int) -> Tuple[List[Document], int]:
+    """Take documents in rank order while they fit in budget, counting file headers once."""
+    selected = []
+    used = count_prompt_tokens(f"{CONTEXT_START}\n\n{CONTEXT_END}\n\n")
+    files = set()
+    for doc in documents:
+        file_path = (doc.meta_data or {}).get('file_path', 'unknown')
+        tokens = count_prompt_tokens(doc.text) + 2
+        if file_path not in files:
+            tokens += count_prompt_tokens(f"\n\n## File Path: {file_path}\n\n")
+        if used + tokens > budget:
+            continue
+        selected.append(doc)
+        files.add(file_path)
+        used += tokens
+    return selected, used if selected else 0
+
+
+def build_chat_prompt(system_prompt: str, query: str, provider: str, model: Optional[str] = None,
+                      conversation_turns: Sequence[Tuple[str, str]] = (), file_path: Optional[str] = None,
+                      file_content: str = "", documents: Sequence[Document] = ()) -> str:
+    """
+    Build the prompt of a chat request within the model's context window.
+
+    Args:
+        system_prompt: The system prompt
+        query: The user's query
+        provider: Model provider
+        model: Model name, or None for the provider's default model
+        conversation_turns: Earlier (user query, assistant response) pairs, oldest first
+        file_path: Path of the file the user asks about, if any
+        file_content: Content of that file
+        documents: Retrieved documents, best first
+
+    Returns:
+        str: The prompt
+    """
+    budget = get_prompt_budget(provider, model)
+    head = f"/no_think {system_prompt}\n\n"
+    tail = f"<query>\n{query}\n</query>\n\nAssistant: "
+    # The note replacing an empty context is reserved up front
+    used = count_prompt_tokens(head) + count_prompt_tokens(tail) + count_prompt_tokens(NO_CONTEXT_NOTE)
+    if used > budget:
+        logger.warning(f"System prompt and query use {used} tokens, more than the prompt budget of {budget}")
+
+    file_section = ""
+    if file_content:
+        wrapper = f"<currentFileContent path=\"{file_path}\">\n\n</currentFileContent>\n\n"
+        file_share = configs.get("prompt_budget", {}).get("file_content_share", DEFAULT_FILE_CONTENT_SHARE)
+        remaining = min(budget - used, int(budget * file_share)) - count_prompt_tokens(wrapper)
+        file_tokens = count_prompt_tokens(file_content)
+        if file_tokens > remaining:
+            logger.warning(f"Truncating {file_path} from {file_tokens} to {max(remaining, 0)} tokens")
+            file_content = truncate_to_tokens(file_content, remaining - count_prompt_tokens(TRUNCATION_NOTE))
+            file_content += TRUNCATION_NOTE if file_content else ""
+            file_tokens = count_prompt_tokens(file_content)
+        if file_content:
+            file_section = f"<currentFileContent path=\"{file_path}\">\n{file_content}\n</currentFileContent>\n\n"
+            used += file_tokens + count_prompt_tokens(wrapper)
+
+    # Keep the most recent turns that fit
+    history_turns = []
+    history_used = count_prompt_tokens("<conversation_history>\n</conversation_history>\n\n")
+    for user_query, assistant_response in reversed(conversation_turns):
+        turn = format_turn(user_query, assistant_response)
+        tokens = count_prompt_tokens(turn)
+        if used + history_used + tokens > budget:
+            break
+        history_turns.insert(0, turn)
+        history_used += tokens
+    history_section = ""
+    if history_turns:
+        history_section = f"<conversation_history>\n{''.join(history_turns)}</conversation_history>\n\n"
+        used += history_used
+    if len(history_turns) < len(conversation_turns):
+        logger.info(f"Dropped {len(conversation_turns) - len(history_turns)} old turns to fit the prompt budget")
+
+    selected, context_used = _select_documents(documents, budget - used)
+    context_text = assemble_context(selected)
+    if len(selected) < len(documents):
+        logger.info(f"Kept {len(selected)} of {len(documents)} retrieved documents within the prompt budget")
+    if context_text.strip():
+        context_section = f"{CONTEXT_START}\n{context_text}\n{CONTEXT_END}\n\n"
+        used += context_used - count_prompt_tokens(NO_CONTEXT_NOTE)
+    else:
+        logger.info("No context available from RAG")
+        context_section = NO_CONTEXT_NOTE
+
+    logger.info(f"Built prompt of about {used} tokens for {provider}/{model or 'default'} (budget {budget})")
+    return head + history_section + file_section + context_section + tail
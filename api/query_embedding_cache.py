@@ -0,0 +1,129 @@
+"""
+Process-wide cache of query embeddings.
+
+Every chat turn embeds its query through the embedding provider. Repeated
+questions, and the "Contexts related to {file_path}" queries sent for the same
+file by many users, are answered from an in-memory LRU cache keyed on the
+embedder and the normalized query. Concurrent requests for the same key share a
+single provider call.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from api.config import configs
+
+logger = logging.getLogger(__name__)
+
+# Default number of cached query embeddings
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def normalize_query(query: str) -> str:
+    """Collapse runs of whitespace and strip the query, which do not change its meaning."""
+    return " ".join(query.split())
+
+
+class QueryEmbeddingCache:
+    """
+    Thread-safe LRU cache of query embeddings with single-flight computation.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(namespace: str, query: str) -> Tuple[str, str]:
+        """Build the cache key of a query for an embedder namespace (see get_embedder_namespace)."""
+        return namespace, normalize_query(query)
+
+    def get_or_compute(self, namespace: str, query: str, compute: Callable[[str], Sequence[float]]) -> np.ndarray:
+        """
+        Return the embedding of a query, computing it at most once across concurrent callers.
+
+        Only the cache key is normalized. On a miss the query is embedded as given, so
+        indentation in code snippets reaches the embedder unchanged.
+
+        Args:
+            namespace: Embedder namespace
+            query: The query
+            compute: Function embedding the query
+
+        Returns:
+            np.ndarray: The read-only float32 embedding
+
+        Raises:
+            Exception: Whatever compute raised; failures are not cached
+        """
+        key = self.make_key(namespace, query)
+        if not self.enabled:
+            return self._to_vector(compute(query))
+
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self.misses += 1
+
+        if not owner:
+            logger.debug(f"Waiting for in-flight embedding of query in {namespace}")
+            return future.result()
+
+        try:
+            vector = self._to_vector(compute(query))
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            self._entries[key] = vector
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        future.set_result(vector)
+        return vector
+
+    @staticmethod
+    def _to_vector(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector.flags.writeable = False
+        return vector
+
+    def get(self, namespace: str, query: str) -> Optional[np.ndarray]:
+        """Return the cached embedding of a query, or None."""
+        with self._lock:
+            return self._entries.get(self.make_key(namespace, query))
+
+    def clear(self) -> None:
+        """Drop all cached embeddings."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache_config = configs.get("query_embedding_cache", {})
+query_embedding_cache = QueryEmbeddingCache(
+    max_entries=_cache_config.get("max_entries", DEFAULT_MAX_ENTRIES),
+    enabled=_cache_config.get("enabled", True),
+)
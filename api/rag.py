@@ -2,10 +2,11 @@ import logging
 import weakref
 import re
 from dataclasses import dataclass
-from typing import Any, List, Tuple, Dict
+from typing import Any, List, Sequence, Tuple, Dict
 from uuid import uuid4
 
 import adalflow as adal
+from adalflow.core.types import RetrieverOutput
 
 from api.tools.embedder import get_embedder
 from api.prompts import RAG_SYSTEM_PROMPT as system_prompt, RAG_TEMPLATE
@@ -38,9 +39,23 @@ class CustomConversation:
         self.dialog_turns.append(dialog_turn)
 
 # Import other adalflow components
-from adalflow.components.retriever.faiss_retriever import FAISSRetriever
+from api.chunk_stitching import stitch_neighbors
 from api.config import configs
-from api.data_pipeline import DatabaseManager
+from api.context_assembler import get_word_overlap
+from api.data_pipeline import DatabaseManager, get_repo_db_name
+from api.embedding_cache import get_embedder_namespace
+from api.file_scope import DEFAULT_MAX_IMPORT_FILES, file_scope_indices, rank_by_similarity
+from api.query_embedding_cache import query_embedding_cache
+from api.request_executor import repository_builds, run_blocking
+from api.retriever_cache import retriever_cache
+from api.sparse_index import DEFAULT_RRF_K, reciprocal_rank_fusion, submit_sparse_search
+from api.vector_index import (
+    create_faiss_retriever,
+    filter_valid_embeddings,
+    get_index_config,
+    load_or_build_faiss_index,
+    score_documents,
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -177,13 +192,13 @@ class RAG(adal.Component):
 
         # Check if Ollama model exists before proceeding
         if self.is_ollama_embedder:
-            from api.ollama_patch import check_ollama_model_exists
+            from api.ollama_patch import check_ollama_model_exists, get_ollama_host
             from api.config import get_embedder_config
             
             embedder_config = get_embedder_config()
             if embedder_config and embedder_config.get("model_kwargs", {}).get("model"):
                 model_name = embedder_config["model_kwargs"]["model"]
-                if not check_ollama_model_exists(model_name):
+                if not check_ollama_model_exists(model_name, get_ollama_host(embedder_config)):
                     raise Exception(f"Ollama model '{model_name}' not found. Please run 'ollama pull {model_name}' to install it.")
 
         # Initialize components
@@ -258,93 +273,23 @@ IMPORTANT FORMATTING RULES:
         Returns:
             List of documents with valid embeddings of consistent size
         """
-        if not documents:
-            logger.warning("No documents provided for embedding validation")
-            return []
-
-        valid_documents = []
-        embedding_sizes = {}
-
-        # First pass: collect all embedding sizes and count occurrences
-        for i, doc in enumerate(documents):
-            if not hasattr(doc, 'vector') or doc.vector is None:
-                logger.warning(f"Document {i} has no embedding vector, skipping")
-                continue
-
-            try:
-                if isinstance(doc.vector, list):
-                    embedding_size = len(doc.vector)
-                elif hasattr(doc.vector, 'shape'):
-                    embedding_size = doc.vector.shape[0] if len(doc.vector.shape) == 1 else doc.vector.shape[-1]
-                elif hasattr(doc.vector, '__len__'):
-                    embedding_size = len(doc.vector)
-                else:
-                    logger.warning(f"Document {i} has invalid embedding vector type: {type(doc.vector)}, skipping")
-                    continue
-
-                if embedding_size == 0:
-                    logger.warning(f"Document {i} has empty embedding vector, skipping")
-                    continue
-
-                embedding_sizes[embedding_size] = embedding_sizes.get(embedding_size, 0) + 1
-
-            except Exception as e:
-                logger.warning(f"Error checking embedding size for document {i}: {str(e)}, skipping")
-                continue
-
-        if not embedding_sizes:
-            logger.error("No valid embeddings found in any documents")
-            return []
-
-        # Find the most common embedding size (this should be the correct one)
-        target_size = max(embedding_sizes.keys(), key=lambda k: embedding_sizes[k])
-        logger.info(f"Target embedding size: {target_size} (found in {embedding_sizes[target_size]} documents)")
-
-        # Log all embedding sizes found
-        for size, count in embedding_sizes.items():
-            if size != target_size:
-                logger.warning(f"Found {count} documents with incorrect embedding size {size}, will be filtered out")
-
-        # Second pass: filter documents with the target embedding size
-        for i, doc in enumerate(documents):
-            if not hasattr(doc, 'vector') or doc.vector is None:
-                continue
-
-            try:
-                if isinstance(doc.vector, list):
-                    embedding_size = len(doc.vector)
-                elif hasattr(doc.vector, 'shape'):
-                    embedding_size = doc.vector.shape[0] if len(doc.vector.shape) == 1 else doc.vector.shape[-1]
-                elif hasattr(doc.vector, '__len__'):
-                    embedding_size = len(doc.vector)
-                else:
-                    continue
-
-                if embedding_size == target_size:
-                    valid_documents.append(doc)
-                else:
-                    # Log which document is being filtered out
-                    file_path = getattr(doc, 'meta_data', {}).get('file_path', f'document_{i}')
-                    logger.warning(f"Filtering out document '{file_path}' due to embedding size mismatch: {embedding_size} != {target_size}")
-
-            except Exception as e:
-                file_path = getattr(doc, 'meta_data', {}).get('file_path', f'document_{i}')
-                logger.warning(f"Error validating embedding for document '{file_path}': {str(e)}, skipping")
-                continue
-
-        logger.info(f"Embedding validation complete: {len(valid_documents)}/{len(documents)} documents have valid embeddings")
-
-        if len(valid_documents) == 0:
-            logger.error("No documents with valid embeddings remain after filtering")
-        elif len(valid_documents) < len(documents):
-            filtered_count = len(documents) - len(valid_documents)
-            logger.warning(f"Filtered out {filtered_count} documents due to embedding issues")
-
-        return valid_documents
+        return filter_valid_embeddings(documents)
+
+    def _retriever_cache_key(self, repo_url_or_path: str, type: str, excluded_dirs: List[str] = None,
+                             excluded_files: List[str] = None, included_dirs: List[str] = None,
+                             included_files: List[str] = None) -> Tuple:
+        """Key of the retriever prepared for a repository with some file filters."""
+        from api.config import get_embedder_config
+        embedder_model = get_embedder_config().get("model_kwargs", {}).get("model")
+        return retriever_cache.make_key(
+            repo_url_or_path, type, self.embedder_type, embedder_model,
+            excluded_dirs, excluded_files, included_dirs, included_files
+        )
 
     def prepare_retriever(self, repo_url_or_path: str, type: str = "github", access_token: str = None,
                       excluded_dirs: List[str] = None, excluded_files: List[str] = None,
-                      included_dirs: List[str] = None, included_files: List[str] = None):
+                      included_dirs: List[str] = None, included_files: List[str] = None,
+                      refresh: bool = False):
         """
         Prepare the retriever for a repository.
         Will load database from local storage if available.
@@ -356,9 +301,21 @@ IMPORTANT FORMATTING RULES:
             excluded_files: Optional list of file patterns to exclude from processing
             included_dirs: Optional list of directories to include exclusively
             included_files: Optional list of file patterns to include exclusively
+            refresh: Re-index files that changed since the database was built
         """
         self.initialize_db_manager()
         self.repo_url_or_path = repo_url_or_path
+
+        # Reuse a retriever prepared by an earlier request if the database has not changed
+        cache_key = self._retriever_cache_key(repo_url_or_path, type, excluded_dirs, excluded_files,
+                                              included_dirs, included_files)
+        cached = None if refresh else retriever_cache.get(cache_key)
+        if cached is not None:
+            self.transformed_docs = cached.documents
+            self.retriever = cached.retriever
+            logger.info(f"Reusing cached retriever with {len(self.transformed_docs)} documents for {repo_url_or_path}")
+            return
+
         self.transformed_docs = self.db_manager.prepare_database(
             repo_url_or_path,
             type,
@@ -367,7 +324,8 @@ IMPORTANT FORMATTING RULES:
             excluded_dirs=excluded_dirs,
             excluded_files=excluded_files,
             included_dirs=included_dirs,
-            included_files=included_files
+            included_files=included_files,
+            refresh=refresh
         )
         logger.info(f"Loaded {len(self.transformed_docs)} documents for retrieval")
 
@@ -380,15 +338,23 @@ IMPORTANT FORMATTING RULES:
         logger.info(f"Using {len(self.transformed_docs)} documents with valid embeddings for retrieval")
 
         try:
-            # Use the appropriate embedder for retrieval
-            retrieve_embedder = self.query_embedder if self.is_ollama_embedder else self.embedder
-            self.retriever = FAISSRetriever(
-                **configs["retriever"],
-                embedder=retrieve_embedder,
-                documents=self.transformed_docs,
-                document_map_func=lambda doc: doc.vector,
+            # The retriever is shared through the process-wide cache, so it must not hold
+            # a reference to this request's embedder. Queries are embedded in call() instead.
+            retriever_config = configs["retriever"]
+            metric = retriever_config.get("metric", "prob")
+            index = load_or_build_faiss_index(
+                self.db_manager.repo_paths["save_db_file"], self.transformed_docs, metric=metric,
+                index_config=retriever_config.get("index"),
+            )
+            self.retriever = create_faiss_retriever(
+                index,
+                self.transformed_docs,
+                top_k=retriever_config.get("top_k", 20),
+                metric=metric,
+                rescore_factor=get_index_config(retriever_config.get("index"))["rescore_factor"],
             )
             logger.info("FAISS retriever created successfully")
+            retriever_cache.put(cache_key, self.transformed_docs, self.retriever, self.db_manager.repo_paths["save_db_file"])
         except Exception as e:
             logger.error(f"Error creating FAISS retriever: {str(e)}")
             # Try to provide more specific error information
@@ -413,24 +379,159 @@ IMPORTANT FORMATTING RULES:
                 logger.error(f"Sample embedding sizes: {', '.join(sizes)}")
             raise
 
-    def call(self, query: str, language: str = "en") -> Tuple[List]:
+    async def prepare_retriever_async(self, repo_url_or_path: str, type: str = "github", access_token: str = None,
+                                      excluded_dirs: List[str] = None, excluded_files: List[str] = None,
+                                      included_dirs: List[str] = None, included_files: List[str] = None,
+                                      refresh: bool = False):
+        """
+        Prepare the retriever in the request executor, without blocking the event loop.
+
+        Preparations of the same repository never run concurrently, as they clone into
+        the same directory and write the same database. A request arriving while another
+        one prepares the repository waits for that build and adopts its retriever. Only
+        if the build used other file filters does it then prepare its own retriever,
+        once, from the database that build left behind.
+
+        Args:
+            The arguments of prepare_retriever
+        """
+        filters = (excluded_dirs, excluded_files, included_dirs, included_files)
+        cache_key = self._retriever_cache_key(repo_url_or_path, type, *filters)
+
+        def build() -> Tuple:
+            self.prepare_retriever(repo_url_or_path, type, access_token, *filters, refresh=refresh)
+            return cache_key, self.transformed_docs, self.retriever
+
+        (built_key, transformed_docs, retriever), owner = await repository_builds.run(
+            (type, get_repo_db_name(repo_url_or_path, type)), build)
+        if owner:
+            return
+        self.repo_url_or_path = repo_url_or_path
+        if built_key == cache_key:
+            logger.info(f"Sharing the retriever prepared by a concurrent request for {repo_url_or_path}")
+            self.transformed_docs, self.retriever = transformed_docs, retriever
+            return
+        # The repository is cloned and indexed by now, so this only loads the database
+        await run_blocking(self.prepare_retriever, repo_url_or_path, type, access_token, *filters)
+
+    def _embed_query(self, query: str) -> Sequence[float]:
+        """
+        Embed a query string with this instance's embedder.
+
+        Embeddings are shared through the process-wide query embedding cache, so a
+        repeated query costs no provider call.
+
+        Args:
+            query: The query to embed
+
+        Returns:
+            Sequence[float]: The query embedding, a read-only float32 array
+        """
+        def compute(query: str) -> List[float]:
+            output = self.query_embedder([query])
+            if output.error or not output.data:
+                raise ValueError(f"Failed to embed query: {output.error}")
+            return output.data[0].embedding
+
+        return query_embedding_cache.get_or_compute(get_embedder_namespace(self.embedder), query, compute)
+
+    def _retrieve_for_file(self, query: str, file_path: str) -> List[RetrieverOutput]:
+        """
+        Rank the chunks of a file and of the files it imports against a query.
+
+        Args:
+            query: The user's query
+            file_path: Path of the file the user asks about
+
+        Returns:
+            List[RetrieverOutput]: The ranked chunks, or an empty list if the file has no
+            indexed chunks
+        """
+        scope_config = configs["retriever"].get("file_scope", {})
+        indices, imported = file_scope_indices(
+            self.transformed_docs, file_path,
+            include_imports=scope_config.get("include_imports", True),
+            max_import_files=scope_config.get("max_import_files", DEFAULT_MAX_IMPORT_FILES),
+        )
+        if not indices:
+            logger.info(f"No indexed chunks for {file_path}, searching the whole repository")
+            return []
+        doc_indices, doc_scores = rank_by_similarity(
+            self.transformed_docs, indices, self._embed_query(query), self.retriever.top_k, self.retriever.metric)
+        logger.info(f"Ranked {len(indices)} chunks of {file_path} and {len(imported)} imported files")
+        return [RetrieverOutput(doc_indices=doc_indices, doc_scores=doc_scores, query=query)]
+
+    def _retrieve(self, query: str) -> List[RetrieverOutput]:
+        """
+        Search the whole repository, fusing keyword hits into the dense results when configured.
+
+        Args:
+            query: The user's query
+
+        Returns:
+            List[RetrieverOutput]: The retrieved chunks
+        """
+        hybrid_config = configs["retriever"].get("hybrid", {})
+        # Keyword search runs while the query is embedded and searched
+        sparse_future = None
+        if hybrid_config.get("enabled", False):
+            sparse_future = submit_sparse_search(
+                self.transformed_docs, query, hybrid_config.get("sparse_top_k", self.retriever.top_k))
+
+        query_embedding = self._embed_query(query)
+        retrieved_documents = self.retriever([query_embedding])
+
+        if sparse_future is not None:
+            try:
+                sparse_indices = sparse_future.result()
+            except Exception as e:
+                logger.warning(f"Keyword search failed, using dense results only: {e}")
+                sparse_indices = []
+            if sparse_indices:
+                fused = reciprocal_rank_fusion(
+                    [retrieved_documents[0].doc_indices, sparse_indices],
+                    hybrid_config.get("rrf_k", DEFAULT_RRF_K),
+                )[:self.retriever.top_k]
+                retrieved_documents[0].doc_indices = [index for index, _ in fused]
+                # Report the dense similarity of each hit, not its fusion score, so doc_scores
+                # means the same whichever path answered
+                retrieved_documents[0].doc_scores = score_documents(
+                    self.transformed_docs, retrieved_documents[0].doc_indices, query_embedding,
+                    self.retriever.metric).tolist()
+        return retrieved_documents
+
+    def call(self, query: str, language: str = "en", file_path: str = None) -> Tuple[List]:
         """
         Process a query using RAG.
 
         Args:
             query: The user's query
+            file_path: Path of a file the query is about; its chunks and those of the files
+                it imports are ranked when retriever.file_scope is enabled, otherwise the
+                repository is searched for "Contexts related to {file_path}"
 
         Returns:
             Tuple of (RAGAnswer, retrieved_documents)
         """
         try:
-            retrieved_documents = self.retriever(query)
-
-            # Fill in the documents
-            retrieved_documents[0].documents = [
-                self.transformed_docs[doc_index]
-                for doc_index in retrieved_documents[0].doc_indices
-            ]
+            retriever_config = configs["retriever"]
+            retrieved_documents = []
+            if file_path and retriever_config.get("file_scope", {}).get("enabled", False):
+                retrieved_documents = self._retrieve_for_file(query, file_path)
+            elif file_path:
+                # Without file scoping, search the whole repository for context about the file
+                query = f"Contexts related to {file_path}"
+                logger.info(f"Modified RAG query to focus on file: {file_path}")
+            if not retrieved_documents:
+                retrieved_documents = self._retrieve(query)
+
+            # Fill in the documents, expanded with their neighbors when configured
+            retrieved_documents[0].documents = stitch_neighbors(
+                self.transformed_docs,
+                retrieved_documents[0].doc_indices,
+                retriever_config.get("neighbor_window", 0),
+                overlap_words=get_word_overlap(),
+            )
 
             return retrieved_documents
 
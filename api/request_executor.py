@@ -0,0 +1,99 @@
+"""
+Blocking stages of chat requests, run off the asyncio event loop.
+
+The chat handlers are coroutines, but preparing a request clones repositories,
+reads and embeds files, builds indexes and counts tokens synchronously. Those
+stages run in a dedicated thread pool instead, so one repository being indexed
+does not stall every other connection served by the event loop. Index builds
+are also single-flight per repository: concurrent requests for the same
+repository wait for one build instead of racing to write the same database.
+"""
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from api.config import configs
+
+logger = logging.getLogger(__name__)
+
+# Default number of threads running blocking request stages
+DEFAULT_MAX_WORKERS = 16
+
+
+class SingleFlight:
+    """
+    Runs a function at most once at a time per key, sharing its outcome with
+    every caller that asks for the same key while it runs.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor):
+        self.executor = executor
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    async def run(self, key: Hashable, func: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run func in the executor unless a call for the same key is already running.
+
+        Args:
+            key: Identifies the work, e.g. the repository being indexed
+            func: Blocking function
+            *args: Positional arguments of func
+            **kwargs: Keyword arguments of func
+
+        Returns:
+            Tuple[Any, bool]: The result, and whether this caller ran func itself
+            (False if it waited for another caller's run)
+
+        Raises:
+            Exception: Whatever func raised, in the running caller and in every waiter
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self.executor.submit(functools.partial(func, *args, **kwargs))
+                self._in_flight[key] = future
+                # Later callers start a new run, so failures are not cached
+                future.add_done_callback(functools.partial(self._forget, key))
+
+        if not owner:
+            logger.info(f"Waiting for the in-flight run of {key}")
+        # shield: a cancelled request must not cancel the run other requests wait for
+        result = await asyncio.shield(asyncio.wrap_future(future))
+        return result, owner
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking function in the request executor and await its result.
+
+    Args:
+        func: Blocking function
+        *args: Positional arguments of func
+        **kwargs: Keyword arguments of func
+
+    Returns:
+        Any: The result of func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request_executor, functools.partial(func, *args, **kwargs))
+
+
+_executor_config = configs.get("request_executor", {})
+request_executor = ThreadPoolExecutor(
+    max_workers=_executor_config.get("max_workers", DEFAULT_MAX_WORKERS),
+    thread_name_prefix="request",
+)
+repository_builds = SingleFlight(request_executor)
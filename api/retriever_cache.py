@@ -0,0 +1,216 @@
+"""
+Process-wide cache of prepared retrievers.
+
+Building a retriever means opening the repository index store, validating the
+embeddings and constructing a FAISS index. This module keeps the result around so
+follow-up questions about the same repository reuse the already built index.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, List, Optional, Tuple
+
+import faiss
+
+from api.config import configs
+from api.vector_index import estimate_index_bytes
+
+logger = logging.getLogger(__name__)
+
+# Default memory budget for all cached retrievers together
+DEFAULT_MAX_MEMORY_MB = 2048
+
+
+@dataclass
+class CachedRetriever:
+    """A prepared retriever together with the documents it indexes."""
+    documents: List[Any]
+    retriever: Any
+    db_file: str
+    db_mtime_ns: int
+    size_bytes: int
+
+
+def estimate_retriever_bytes(documents: List[Any], retriever: Any = None) -> int:
+    """
+    Roughly estimate the memory held by a cached retriever entry.
+
+    Args:
+        documents: The documents indexed by the retriever
+        retriever: The retriever holding the vector index
+
+    Returns:
+        int: Estimated size in bytes
+    """
+    size = 0
+    if hasattr(documents, "memory_bytes"):
+        # Documents backed by an index store are read from disk on demand
+        size += documents.memory_bytes()
+        documents = []
+    for doc in documents:
+        size += len(getattr(doc, "text", "") or "")
+        vector = getattr(doc, "vector", None)
+        if vector is not None:
+            # Python floats in a list cost ~32 bytes each (object + pointer)
+            size += len(vector) * (32 if isinstance(vector, list) else 4)
+
+    xb = getattr(retriever, "xb", None)
+    if xb is not None and hasattr(xb, "nbytes"):
+        size += xb.nbytes
+    index = getattr(retriever, "index", None)
+    if isinstance(index, faiss.Index):
+        size += estimate_index_bytes(index)
+    elif index is not None and hasattr(index, "ntotal") and hasattr(index, "d"):
+        size += index.ntotal * index.d * 4
+    return size
+
+
+class RetrieverCache:
+    """
+    LRU cache of prepared retrievers bounded by a memory budget.
+
+    Entries are invalidated automatically when the modification time of the
+    database file they were built from changes.
+    """
+
+    def __init__(self, max_memory_mb: float = DEFAULT_MAX_MEMORY_MB, enabled: bool = True):
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, CachedRetriever]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(repo_url_or_path: str, repo_type: str, embedder_type: str, embedder_model: str = None,
+                 excluded_dirs: List[str] = None, excluded_files: List[str] = None,
+                 included_dirs: List[str] = None, included_files: List[str] = None) -> Tuple:
+        """Build a hashable cache key from the parameters that shape a retriever."""
+        def normalize(values):
+            return tuple(sorted(values)) if values else ()
+
+        return (
+            repo_url_or_path.rstrip("/"),
+            repo_type,
+            embedder_type,
+            embedder_model,
+            normalize(excluded_dirs),
+            normalize(excluded_files),
+            normalize(included_dirs),
+            normalize(included_files),
+        )
+
+    @staticmethod
+    def _get_mtime_ns(db_file: str) -> Optional[int]:
+        try:
+            return os.stat(db_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, key: Hashable) -> Optional[CachedRetriever]:
+        """
+        Return the cached entry for a key, or None if missing or stale.
+
+        Args:
+            key: Cache key built with make_key
+
+        Returns:
+            Optional[CachedRetriever]: The cached entry
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            current_mtime = self._get_mtime_ns(entry.db_file)
+            if current_mtime != entry.db_mtime_ns:
+                logger.info(f"Database {entry.db_file} changed on disk, invalidating cached retriever")
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, documents: List[Any], retriever: Any, db_file: str) -> Optional[CachedRetriever]:
+        """
+        Store a prepared retriever, evicting least recently used entries to stay within budget.
+
+        Args:
+            key: Cache key built with make_key
+            documents: The documents indexed by the retriever
+            retriever: The prepared retriever
+            db_file: The database file the retriever was built from
+
+        Returns:
+            Optional[CachedRetriever]: The stored entry, or None if it was not cached
+        """
+        if not self.enabled:
+            return None
+
+        db_mtime_ns = self._get_mtime_ns(db_file)
+        if db_mtime_ns is None:
+            logger.warning(f"Database file {db_file} not found, not caching retriever")
+            return None
+
+        size_bytes = estimate_retriever_bytes(documents, retriever)
+        if size_bytes > self.max_bytes:
+            logger.warning(f"Retriever for {db_file} needs ~{size_bytes // (1024 * 1024)} MB, "
+                           f"which exceeds the cache budget of {self.max_bytes // (1024 * 1024)} MB; not caching")
+            return None
+
+        entry = CachedRetriever(
+            documents=documents,
+            retriever=retriever,
+            db_file=db_file,
+            db_mtime_ns=db_mtime_ns,
+            size_bytes=size_bytes,
+        )
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._total_bytes += size_bytes
+
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, evicted = next(iter(self._entries.items()))
+                logger.info(f"Evicting cached retriever for {evicted.db_file} (~{evicted.size_bytes // (1024 * 1024)} MB)")
+                self._remove(evicted_key)
+
+        logger.info(f"Cached retriever for {db_file} (~{size_bytes // (1024 * 1024)} MB, "
+                    f"{len(self._entries)} entries, ~{self._total_bytes // (1024 * 1024)} MB total)")
+        return entry
+
+    def invalidate(self, db_file: str = None) -> None:
+        """
+        Drop cached entries built from a database file, or all entries if none is given.
+
+        Args:
+            db_file: The database file whose entries should be dropped
+        """
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if db_file is None or entry.db_file == db_file]
+            for key in keys:
+                self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+
+_cache_config = configs.get("retriever_cache", {})
+retriever_cache = RetrieverCache(
+    max_memory_mb=_cache_config.get("max_memory_mb", DEFAULT_MAX_MEMORY_MB),
+    enabled=_cache_config.get("enabled", True),
+)
@@ -0,0 +1,120 @@
+"""
+Keyword (BM25) search over an index store, fused with the dense retriever.
+
+Dense retrieval ranks chunks by meaning and often misses exact identifiers, e.g.
+"where is prepare_db_index called". The index store therefore also holds an
+inverted index of every chunk (an SQLite FTS5 table written by
+IndexStoreWriter.add_chunks), built from code-aware tokens: identifiers are kept
+whole and also split at underscores and camelCase boundaries. At query time the
+keyword search runs next to the dense search and both rankings are combined
+with reciprocal rank fusion.
+"""
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constant of reciprocal rank fusion, damping the weight of the first ranks
+DEFAULT_RRF_K = 60
+# Terms of a query beyond this are ignored
+MAX_QUERY_TERMS = 32
+
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[0-9]+")
+_WORD_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+_STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "the", "this", "that", "to", "what", "where", "which", "who", "why", "with",
+})
+
+# Keyword searches run here while the query is embedded
+_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sparse-search")
+
+
+def tokenize_code(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Identifiers produce the whole identifier followed by its parts, so
+    ``prepareDbIndex`` and ``prepare_db_index`` both yield ``prepare``, ``db`` and
+    ``index`` and exact identifiers still match as a single term.
+
+    Args:
+        text: Code or prose
+
+    Returns:
+        List[str]: Terms in text order, with repetitions
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(text):
+        lower = token.lower()
+        parts = [part.lower() for piece in token.split("_") for part in _WORD_PART_RE.findall(piece)]
+        if lower not in _STOP_WORDS and len(lower) > 1:
+            terms.append(lower)
+        if len(parts) > 1:
+            terms.extend(part for part in parts if len(part) > 1 and part not in _STOP_WORDS)
+    return terms
+
+
+def build_match_query(query: str) -> str:
+    """
+    Build an FTS5 MATCH expression matching any term of a query.
+
+    Args:
+        query: The user's query
+
+    Returns:
+        str: The expression, empty if the query has no terms
+    """
+    terms = list(dict.fromkeys(tokenize_code(query)))[:MAX_QUERY_TERMS]
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def sparse_search(documents: Sequence, query: str, top_k: int) -> List[int]:
+    """
+    Rank documents by BM25 against a query.
+
+    Args:
+        documents: StoredDocuments of an index store
+        query: The user's query
+        top_k: Number of documents to return
+
+    Returns:
+        List[int]: Indices into documents, best first; empty if the documents are not
+        backed by an index store with keyword terms
+    """
+    store = getattr(documents, "store", None)
+    if store is None or not store.has_terms:
+        return []
+    match_query = build_match_query(query)
+    if not match_query:
+        return []
+    # Chunks without a valid vector are not in documents, so ask for a few more
+    positions = store.search_terms(match_query, top_k + (store.count - len(documents)))
+    indices = documents.indices_of(positions)
+    return [int(index) for index in indices[indices >= 0][:top_k]]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], rrf_k: int = DEFAULT_RRF_K) -> List[Tuple[int, float]]:
+    """
+    Combine rankings by summing 1 / (rrf_k + rank) over the rankings of each item.
+
+    Args:
+        rankings: Item ids per ranking, best first
+        rrf_k: Fusion constant
+
+    Returns:
+        List[Tuple[int, float]]: Items and fused scores, best first; ties keep the order
+        in which the items were first seen
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def submit_sparse_search(documents: Sequence, query: str, top_k: int):
+    """Start sparse_search in the background and return its future."""
+    return _search_executor.submit(sparse_search, documents, query, top_k)
@@ -0,0 +1,155 @@
+"""
+Token counting with cached tiktoken encoders.
+
+Encoders are looked up once per embedder type instead of on every call.
+check_token_limit adds a cheap first tier based on the UTF-8 byte length of
+the text: every BPE token covers at least one byte, so a text with no more
+bytes than the limit is always within it, and a text far above the limit in
+bytes is treated as over it without being encoded. Only texts in between are
+tokenized exactly; check_token_limits encodes those of many texts as one batch.
+"""
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Source files average 3-5 bytes per cl100k token and rarely exceed 8; only
+# degenerate content such as long runs of whitespace compresses further.
+MAX_BYTES_PER_TOKEN = 16
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def _resolve_embedder_type(embedder_type: str = None) -> str:
+    if embedder_type is None:
+        from api.config import get_embedder_type
+        embedder_type = get_embedder_type()
+    return embedder_type
+
+
+def get_encoding(embedder_type: str = None) -> tiktoken.Encoding:
+    """
+    Get the (cached) tiktoken encoding used to count tokens for an embedder type.
+
+    Args:
+        embedder_type (str, optional): The embedder type ('openai', 'google', 'ollama').
+                                       If None, will be determined from configuration.
+
+    Returns:
+        tiktoken.Encoding: The encoding
+    """
+    embedder_type = _resolve_embedder_type(embedder_type)
+    encoding = _encodings.get(embedder_type)
+    if encoding is not None:
+        return encoding
+
+    with _encodings_lock:
+        encoding = _encodings.get(embedder_type)
+        if encoding is None:
+            if embedder_type in ('ollama', 'google'):
+                # Ollama and Google use similar tokenization to GPT models for rough estimation
+                encoding = tiktoken.get_encoding("cl100k_base")
+            else:  # OpenAI or default
+                encoding = tiktoken.encoding_for_model("text-embedding-3-small")
+            _encodings[embedder_type] = encoding
+    return encoding
+
+
+def count_tokens(text: str, embedder_type: str = None) -> int:
+    """
+    Count the exact number of tokens in a text.
+
+    Args:
+        text (str): The text to count tokens for
+        embedder_type (str, optional): The embedder type ('openai', 'google', 'ollama')
+
+    Returns:
+        int: The number of tokens, or an approximation if tiktoken is unavailable
+    """
+    try:
+        return len(get_encoding(embedder_type).encode_ordinary(text))
+    except Exception as e:
+        # Fallback to a simple approximation if tiktoken fails
+        logger.warning(f"Error counting tokens with tiktoken: {e}")
+        # Rough approximation: 4 characters per token
+        return len(text) // 4
+
+
+def count_tokens_batch(texts: List[str], embedder_type: str = None, num_threads: int = 8) -> List[int]:
+    """
+    Count the exact number of tokens in many texts at once.
+
+    Args:
+        texts (List[str]): The texts to count tokens for
+        embedder_type (str, optional): The embedder type ('openai', 'google', 'ollama')
+        num_threads (int): Threads tiktoken may use to encode the batch
+
+    Returns:
+        List[int]: The number of tokens of each text
+    """
+    try:
+        encoded = get_encoding(embedder_type).encode_ordinary_batch(texts, num_threads=num_threads)
+        return [len(tokens) for tokens in encoded]
+    except Exception as e:
+        logger.warning(f"Error counting tokens with tiktoken: {e}")
+        return [len(text) // 4 for text in texts]
+
+
+def _check_byte_length(text: str, limit: int) -> Optional[bool]:
+    """Settle a limit check from the UTF-8 byte length alone, or return None if it is inconclusive."""
+    num_bytes = len(text.encode("utf-8", errors="surrogatepass"))
+    if num_bytes <= limit:
+        return True
+    if num_bytes > limit * MAX_BYTES_PER_TOKEN:
+        return False
+    return None
+
+
+def check_token_limit(text: str, limit: int, embedder_type: str = None) -> Tuple[bool, Optional[int]]:
+    """
+    Check whether a text fits in a token limit, tokenizing it only when the byte length is inconclusive.
+
+    Args:
+        text (str): The text to check
+        limit (int): The maximum number of tokens
+        embedder_type (str, optional): The embedder type ('openai', 'google', 'ollama')
+
+    Returns:
+        Tuple[bool, Optional[int]]: Whether the text is within the limit, and its exact
+        token count if it had to be computed (None otherwise)
+    """
+    within_limit = _check_byte_length(text, limit)
+    if within_limit is not None:
+        return within_limit, None
+
+    token_count = count_tokens(text, embedder_type)
+    return token_count <= limit, token_count
+
+
+def check_token_limits(texts: List[str], limits: List[int], embedder_type: str = None,
+                       num_threads: int = 8) -> List[Tuple[bool, Optional[int]]]:
+    """
+    Batch variant of check_token_limit: the texts whose byte length is inconclusive
+    are tokenized together with count_tokens_batch.
+
+    Args:
+        texts (List[str]): The texts to check
+        limits (List[int]): The maximum number of tokens of each text
+        embedder_type (str, optional): The embedder type ('openai', 'google', 'ollama')
+        num_threads (int): Threads tiktoken may use to encode the batch
+
+    Returns:
+        List[Tuple[bool, Optional[int]]]: For each text, whether it is within its limit
+        and its exact token count if it had to be computed (None otherwise)
+    """
+    results = [(_check_byte_length(text, limit), None) for text, limit in zip(texts, limits)]
+    borderline = [i for i, (within_limit, _) in enumerate(results) if within_limit is None]
+    if borderline:
+        counts = count_tokens_batch([texts[i] for i in borderline], embedder_type, num_threads)
+        for i, token_count in zip(borderline, counts):
+            results[i] = (token_count <= limits[i], token_count)
+    return results
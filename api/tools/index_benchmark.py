@@ -0,0 +1,229 @@
+"""
+Recall-versus-latency report for the FAISS index types.
+
+Builds each configured index type over the vectors of an index store (or a
+synthetic corpus), searches it with perturbed copies of stored vectors and
+compares the hits with an exact flat index. Use it to pick ``retriever.index``
+settings for large repositories:
+
+    python -m api.tools.index_benchmark --db ~/.adalflow/databases/owner_repo.db
+    python -m api.tools.index_benchmark --synthetic 500000 --dim 256 --types hnsw,ivfpq --ef-search 64,128,256
+    python -m api.tools.index_benchmark --synthetic 100000 --types flat,hnsw --quantization none,float16,int8
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Sequence
+
+import faiss
+import numpy as np
+
+from api.vector_index import (
+    INDEX_TYPES,
+    QUANTIZATION_TYPES,
+    RescoringFAISSRetriever,
+    configure_search,
+    create_empty_index,
+    estimate_index_bytes,
+    get_index_config,
+    get_index_quantization,
+    is_lossy_index,
+    sample_training_vectors,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def make_queries(vectors: np.ndarray, num_queries: int, noise: float = 0.05, seed: int = 0) -> np.ndarray:
+    """
+    Sample stored vectors and perturb them, so queries resemble but do not equal indexed vectors.
+
+    Args:
+        vectors: The indexed vectors
+        num_queries: Number of queries
+        noise: Standard deviation of the added noise, relative to the vectors' mean norm
+        seed: Random seed
+
+    Returns:
+        np.ndarray: Query matrix
+    """
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), min(num_queries, len(vectors)), replace=False)
+    scale = noise * float(np.linalg.norm(vectors[picks], axis=1).mean()) / np.sqrt(vectors.shape[1])
+    return (vectors[picks] + rng.normal(scale=scale, size=(len(picks), vectors.shape[1]))).astype(np.float32)
+
+
+def _build(vectors: np.ndarray, metric: str, index_config: dict) -> faiss.Index:
+    index = create_empty_index(vectors.shape[1], len(vectors), metric, index_config)
+    if not index.is_trained:
+        index.train(sample_training_vectors(vectors, index_config["train_sample_size"]))
+    index.add(vectors)
+    return index
+
+
+def evaluate_index(index: faiss.Index, queries: np.ndarray, exact_ids: np.ndarray, top_k: int,
+                   rescorer: Optional[RescoringFAISSRetriever] = None) -> Dict[str, float]:
+    """
+    Measure recall@k and per-query latency of an index.
+
+    Queries are searched one at a time, as the chat handlers do.
+
+    Args:
+        index: The index to evaluate
+        queries: Query matrix
+        exact_ids: Ids returned by the exact index for the queries
+        top_k: Number of results per query
+        rescorer: Retriever re-scoring the candidates of a lossy index, if any
+
+    Returns:
+        Dict[str, float]: recall, mean_ms and p95_ms
+    """
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, exact_ids):
+        start = time.perf_counter()
+        if rescorer is not None:
+            _, candidates = index.search(query[None, :], top_k * rescorer.rescore_factor)
+            _, ids = rescorer.rescore(query[None, :], candidates, top_k)
+        else:
+            _, ids = index.search(query[None, :], top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(np.intersect1d(ids[0], expected))
+    return {
+        "recall": hits / exact_ids.size,
+        "mean_ms": float(np.mean(latencies)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def benchmark_index_types(vectors: np.ndarray, metric: str = "prob", index_types: Sequence[str] = INDEX_TYPES,
+                          index_config: Optional[dict] = None, num_queries: int = 200, top_k: int = 20,
+                          ef_search_values: Sequence[int] = (), nprobe_values: Sequence[int] = (),
+                          quantizations: Sequence[str] = ()) -> List[Dict]:
+    """
+    Compare index types against the exact flat index.
+
+    Args:
+        vectors: Vectors to index
+        metric: Retriever metric
+        index_types: Index types to build
+        index_config: Base "index" configuration
+        num_queries: Number of queries
+        top_k: Number of results per query
+        ef_search_values: HNSW efSearch values to try, defaults to the configured one
+        nprobe_values: IVF nprobe values to try, defaults to the configured one
+        quantizations: Scalar quantizations to try, defaults to the configured one; lossy
+            indexes are measured with and without re-scoring when rescore_factor is set
+
+    Returns:
+        List[Dict]: One row per index type, quantization and search setting
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if metric in ("cosine", "prob"):
+        faiss.normalize_L2(vectors)
+    base_config = get_index_config(index_config)
+    queries = make_queries(vectors, num_queries)
+
+    exact = _build(vectors, metric, {**base_config, "type": "flat"})
+    _, exact_ids = exact.search(queries, top_k)
+
+    rescorer = None
+    if base_config["rescore_factor"] > 1:
+        rescorer = RescoringFAISSRetriever(metric=metric, rescore_factor=base_config["rescore_factor"])
+        rescorer.documents = vectors
+
+    rows = []
+    built = set()
+    for index_type in index_types:
+        for quantization in quantizations or [base_config["quantization"]]:
+            config = {**base_config, "type": index_type, "quantization": quantization}
+            start = time.perf_counter()
+            index = _build(vectors, metric, config)
+            build_seconds = time.perf_counter() - start
+            # ivfpq ignores the scalar quantization
+            if (index_type, get_index_quantization(index)) in built:
+                continue
+            built.add((index_type, get_index_quantization(index)))
+
+            if index_type == "hnsw":
+                settings = [("hnsw_ef_search", value) for value in ef_search_values or [config["hnsw_ef_search"]]]
+            elif index_type in ("ivf", "ivfpq"):
+                settings = [("ivf_nprobe", value) for value in nprobe_values or [config["ivf_nprobe"]]]
+            else:
+                settings = [(None, None)]
+
+            for key, value in settings:
+                if key is not None:
+                    configure_search(index, {**config, key: value})
+                for index_rescorer in [None, rescorer] if rescorer and is_lossy_index(index) else [None]:
+                    rows.append({
+                        "type": index_type,
+                        "quantization": get_index_quantization(index),
+                        "setting": f"{key}={value}" if key else "",
+                        "rescored": index_rescorer is not None,
+                        "build_s": build_seconds,
+                        "memory_mb": estimate_index_bytes(index) / (1024 * 1024),
+                        **evaluate_index(index, queries, exact_ids, top_k, index_rescorer),
+                    })
+    return rows
+
+
+def format_report(rows: List[Dict], top_k: int) -> str:
+    """Format benchmark rows as a text table."""
+    lines = [f"{'type':<7} {'quant':<8} {'setting':<20} {'rescore':<8} {f'recall@{top_k}':>10} "
+             f"{'mean ms':>9} {'p95 ms':>9} {'build s':>9} {'MB':>9}"]
+    for row in rows:
+        lines.append(f"{row['type']:<7} {row['quantization']:<8} {row['setting']:<20} "
+                     f"{'yes' if row['rescored'] else 'no':<8} {row['recall']:>10.3f} {row['mean_ms']:>9.3f} "
+                     f"{row['p95_ms']:>9.3f} {row['build_s']:>9.2f} {row['memory_mb']:>9.1f}")
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare FAISS index types by recall and latency")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", help="Index store (.db) whose vectors to index")
+    source.add_argument("--synthetic", type=int, help="Number of random vectors to index instead")
+    parser.add_argument("--dim", type=int, default=256, help="Dimension of synthetic vectors")
+    parser.add_argument("--metric", default="prob", choices=["prob", "cosine", "euclidean"])
+    parser.add_argument("--types", default=",".join(INDEX_TYPES), help="Comma-separated index types")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--ef-search", type=_int_list, default=[], help="HNSW efSearch values to try")
+    parser.add_argument("--nprobe", type=_int_list, default=[], help="IVF nprobe values to try")
+    parser.add_argument("--quantization", default="", help="Comma-separated scalar quantizations to try")
+    parser.add_argument("--config", type=json.loads, default={},
+                        help=f"JSON overrides of the index configuration, e.g. {json.dumps({'hnsw_m': 16})}")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        from api.index_store import IndexStore
+        store = IndexStore(args.db)
+        vectors = store.get_vectors(store.valid_positions())
+    else:
+        vectors = np.random.default_rng(0).normal(size=(args.synthetic, args.dim)).astype(np.float32)
+
+    index_types = [index_type for index_type in args.types.split(",") if index_type]
+    unknown = set(index_types) - set(INDEX_TYPES)
+    if unknown:
+        parser.error(f"Unknown index types {sorted(unknown)}, expected {INDEX_TYPES}")
+    quantizations = [quantization for quantization in args.quantization.split(",") if quantization]
+    unknown = set(quantizations) - set(QUANTIZATION_TYPES)
+    if unknown:
+        parser.error(f"Unknown quantizations {sorted(unknown)}, expected {tuple(QUANTIZATION_TYPES)}")
+
+    build_config = {key: value for key, value in get_index_config(args.config).items() if key != "type"}
+    print(f"{len(vectors)} vectors of dimension {vectors.shape[1]}, {args.queries} queries, "
+          f"index parameters {json.dumps(build_config)}")
+    rows = benchmark_index_types(vectors, args.metric, index_types, args.config, args.queries, args.top_k,
+                                 args.ef_search, args.nprobe, quantizations)
+    print(format_report(rows, args.top_k))
+
+
+if __name__ == "__main__":
+    main()
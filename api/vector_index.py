@@ -0,0 +1,683 @@
+"""
+FAISS vector index helpers.
+
+The vector index of a repository is persisted as a sidecar file next to its
+database (``~/.adalflow/databases/{repo}.faiss``) so that loading a repository
+only has to open that file instead of rebuilding the index from every vector.
+The sidecar is memory-mapped read-only, which lets several worker processes
+share the same page-cache copy: flat and HNSW indexes use their codes in place
+in the mapping, IVF indexes map their inverted lists.
+
+Vectors in the index can be scalar-quantized to float16 or to int8 with a
+per-dimension range, which makes the sidecar and the cached retrievers two to
+four times smaller. The top candidates of a quantized search are then re-scored
+exactly against the vectors of the index store.
+"""
+import logging
+import os
+from typing import Any, List, Optional, Sequence
+
+import faiss
+import numpy as np
+from adalflow.components.retriever.faiss_retriever import FAISSRetriever
+
+logger = logging.getLogger(__name__)
+
+FAISS_INDEX_SUFFIX = ".faiss"
+
+INDEX_TYPES = ("flat", "hnsw", "ivf", "ivfpq")
+
+# Scalar quantizers of the "quantization" index parameter
+QUANTIZATION_TYPES = {
+    "none": None,
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# Parameters of the "index" section of the retriever configuration
+DEFAULT_INDEX_CONFIG = {
+    # "auto", or one of INDEX_TYPES
+    "type": "flat",
+    # With "auto": HNSW from this many vectors, IVF-PQ from auto_ivfpq_threshold
+    "auto_hnsw_threshold": 100000,
+    "auto_ivfpq_threshold": 2000000,
+    "hnsw_m": 32,
+    "hnsw_ef_construction": 200,
+    "hnsw_ef_search": 128,
+    # 0 picks 4 * sqrt(number of vectors)
+    "ivf_nlist": 0,
+    "ivf_nprobe": 16,
+    # 0 picks a divisor of the dimension close to dimension / 4
+    "pq_m": 0,
+    "pq_nbits": 8,
+    "train_sample_size": 100000,
+    # "none", "float16" or "int8" (trained per-dimension range); ivfpq is compressed already
+    "quantization": "none",
+    # Re-score this many times top_k candidates of lossy indexes exactly, 0 to disable
+    "rescore_factor": 4,
+}
+
+
+def get_faiss_index_path(db_path: str) -> str:
+    """
+    Get the path of the FAISS sidecar file for a database file.
+
+    Args:
+        db_path (str): Path of the database file (e.g. ~/.adalflow/databases/owner_repo.db)
+
+    Returns:
+        str: Path of the FAISS index file (e.g. ~/.adalflow/databases/owner_repo.faiss)
+    """
+    return os.path.splitext(db_path)[0] + FAISS_INDEX_SUFFIX
+
+
+def get_embedding_size(vector: Any) -> Optional[int]:
+    """
+    Get the size of an embedding vector.
+
+    Args:
+        vector: A list, numpy array or other sized sequence
+
+    Returns:
+        Optional[int]: The embedding size, or None if it cannot be determined
+    """
+    if isinstance(vector, list):
+        return len(vector)
+    if hasattr(vector, 'shape'):
+        return vector.shape[0] if len(vector.shape) == 1 else vector.shape[-1]
+    if hasattr(vector, '__len__'):
+        return len(vector)
+    return None
+
+
+def _safe_embedding_size(doc: Any) -> int:
+    vector = getattr(doc, 'vector', None)
+    if vector is None:
+        return 0
+    try:
+        return get_embedding_size(vector) or 0
+    except Exception:
+        return 0
+
+
+def valid_vector_mask(matrix: np.ndarray) -> np.ndarray:
+    """
+    Check the rows of a vector matrix in one pass.
+
+    Args:
+        matrix: A (n, dimension) matrix of embeddings
+
+    Returns:
+        np.ndarray: Boolean mask of the rows that are finite and not all zero
+    """
+    return np.isfinite(matrix).all(axis=1) & (matrix != 0).any(axis=1)
+
+
+def embedding_validity_mask(documents: List) -> np.ndarray:
+    """
+    Find the documents whose embedding has the most common size.
+
+    Sizes are collected in one pass and compared as an array. Zero and non-finite
+    vectors are rejected when chunks are written to an index store (see
+    valid_vector_mask); stacking every vector here would cost more than it saves.
+
+    Args:
+        documents: List of documents with embeddings
+
+    Returns:
+        np.ndarray: Boolean mask over documents
+    """
+    sizes = np.fromiter((_safe_embedding_size(doc) for doc in documents), dtype=np.int64, count=len(documents))
+    present = sizes[sizes > 0]
+    if len(present) == 0:
+        logger.error("No valid embeddings found in any documents")
+        return np.zeros(len(documents), dtype=bool)
+
+    values, counts = np.unique(present, return_counts=True)
+    target_size = int(values[np.argmax(counts)])
+    logger.info(f"Target embedding size: {target_size} (found in {counts.max()} documents)")
+    for size, count in zip(values, counts):
+        if size != target_size:
+            logger.warning(f"Found {count} documents with incorrect embedding size {size}, will be filtered out")
+    missing = len(documents) - len(present)
+    if missing:
+        logger.warning(f"{missing} documents have no embedding vector, skipping them")
+    return sizes == target_size
+
+
+def filter_valid_embeddings(documents: List) -> List:
+    """
+    Validate embeddings and filter out documents with invalid or mismatched embedding sizes.
+
+    Args:
+        documents: List of documents with embeddings
+
+    Returns:
+        List of documents with valid embeddings of consistent size
+    """
+    if not documents:
+        logger.warning("No documents provided for embedding validation")
+        return []
+
+    # Documents read from an index store were validated when they were written
+    if hasattr(documents, "with_valid_vectors"):
+        return documents.with_valid_vectors()
+
+    mask = embedding_validity_mask(documents)
+    valid_documents = [doc for doc, valid in zip(documents, mask) if valid]
+
+    logger.info(f"Embedding validation complete: {len(valid_documents)}/{len(documents)} documents have valid embeddings")
+
+    if len(valid_documents) == 0:
+        logger.error("No documents with valid embeddings remain after filtering")
+    elif len(valid_documents) < len(documents):
+        filtered_count = len(documents) - len(valid_documents)
+        logger.warning(f"Filtered out {filtered_count} documents due to embedding issues")
+
+    return valid_documents
+
+
+def get_vector_matrix(documents: List) -> np.ndarray:
+    """
+    Stack document vectors into a float32 matrix.
+
+    Args:
+        documents: Documents with embeddings of consistent size, or StoredDocuments
+
+    Returns:
+        np.ndarray: A (new) matrix with one row per document
+    """
+    if hasattr(documents, "vectors"):
+        # Read straight from the index store without materializing documents
+        return np.array(documents.vectors(), dtype=np.float32)
+    return np.asarray([doc.vector for doc in documents], dtype=np.float32)
+
+
+def get_index_config(index_config: Optional[dict] = None) -> dict:
+    """
+    Complete an index configuration with the defaults.
+
+    Args:
+        index_config: The "index" section of the retriever configuration, if any
+
+    Returns:
+        dict: The configuration with every parameter set
+    """
+    return {**DEFAULT_INDEX_CONFIG, **(index_config or {})}
+
+
+def select_index_type(num_vectors: int, index_config: Optional[dict] = None) -> str:
+    """
+    Resolve the index type for a corpus size.
+
+    Args:
+        num_vectors: Number of vectors to index
+        index_config: The "index" section of the retriever configuration, if any
+
+    Returns:
+        str: One of INDEX_TYPES
+    """
+    index_config = get_index_config(index_config)
+    index_type = index_config["type"]
+    if index_type == "auto":
+        if num_vectors >= index_config["auto_ivfpq_threshold"]:
+            return "ivfpq"
+        if num_vectors >= index_config["auto_hnsw_threshold"]:
+            return "hnsw"
+        return "flat"
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Invalid index type: {index_type}. Expected 'auto' or one of {INDEX_TYPES}")
+    return index_type
+
+
+def get_index_type(index: faiss.Index) -> str:
+    """Get the INDEX_TYPES name of a built index."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+def select_quantization(index_type: str, index_config: Optional[dict] = None) -> str:
+    """
+    Resolve the scalar quantization of an index type.
+
+    Args:
+        index_type: One of INDEX_TYPES
+        index_config: The "index" section of the retriever configuration, if any
+
+    Returns:
+        str: A QUANTIZATION_TYPES name
+    """
+    quantization = get_index_config(index_config)["quantization"]
+    if quantization not in QUANTIZATION_TYPES:
+        raise ValueError(f"Invalid quantization: {quantization}. Expected one of {tuple(QUANTIZATION_TYPES)}")
+    # Product quantization codes are not quantized again
+    return "none" if index_type == "ivfpq" else quantization
+
+
+def get_index_quantization(index: faiss.Index) -> str:
+    """Get the QUANTIZATION_TYPES name of a built index."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    sq = getattr(index, "sq", None)
+    if sq is None:
+        return "none"
+    return next((name for name, qtype in QUANTIZATION_TYPES.items() if qtype == sq.qtype), "none")
+
+
+def is_lossy_index(index: faiss.Index) -> bool:
+    """Whether the scores of an index are computed from compressed vectors."""
+    return get_index_type(index) == "ivfpq" or get_index_quantization(index) != "none"
+
+
+def estimate_index_bytes(index: faiss.Index) -> int:
+    """
+    Roughly estimate the memory held by an index.
+
+    Args:
+        index: A FAISS index
+
+    Returns:
+        int: Estimated size in bytes
+    """
+    index_type = get_index_type(index)
+    index = faiss.downcast_index(index)
+    if index_type == "hnsw":
+        # Vector codes plus about 2 * M neighbor ids per vector on the base level
+        code_size = faiss.downcast_index(index.storage).code_size
+        return index.ntotal * (code_size + index.hnsw.nb_neighbors(0) * 4)
+    if index_type in ("ivf", "ivfpq"):
+        # Codes and ids in the inverted lists, plus the coarse centroids
+        return index.ntotal * (index.code_size + 8) + index.nlist * index.d * 4
+    return index.ntotal * getattr(index, "code_size", index.d * 4)
+
+
+def _ivf_nlist(num_vectors: int, index_config: dict) -> int:
+    nlist = index_config["ivf_nlist"] or int(4 * np.sqrt(num_vectors))
+    # k-means needs a few points per centroid
+    return max(1, min(nlist, num_vectors // 39))
+
+
+def _pq_m(dimension: int, index_config: dict) -> int:
+    if index_config["pq_m"]:
+        if dimension % index_config["pq_m"]:
+            raise ValueError(f"pq_m {index_config['pq_m']} must divide the embedding dimension {dimension}")
+        return index_config["pq_m"]
+    # Four dimensions per sub-quantizer, e.g. 64 bytes per 256-dimensional vector
+    return max(m for m in range(1, max(dimension // 4, 1) + 1) if dimension % m == 0)
+
+
+def configure_search(index: faiss.Index, index_config: Optional[dict] = None) -> faiss.Index:
+    """
+    Apply the search-time parameters of the configuration to an index.
+
+    Args:
+        index: A built or loaded index
+        index_config: The "index" section of the retriever configuration, if any
+
+    Returns:
+        faiss.Index: The same index
+    """
+    index_config = get_index_config(index_config)
+    index_type = get_index_type(index)
+    if index_type == "hnsw":
+        faiss.downcast_index(index).hnsw.efSearch = index_config["hnsw_ef_search"]
+    elif index_type in ("ivf", "ivfpq"):
+        faiss.extract_index_ivf(index).nprobe = index_config["ivf_nprobe"]
+    return index
+
+
+def create_empty_index(dimension: int, num_vectors: int, metric: str = "prob",
+                       index_config: Optional[dict] = None) -> faiss.Index:
+    """
+    Create an (untrained) index of the configured type.
+
+    Args:
+        dimension: Embedding dimension
+        num_vectors: Number of vectors the index will hold, used by "auto" and IVF sizing
+        metric: "cosine" or "prob" (inner product over normalized vectors) or "euclidean"
+        index_config: The "index" section of the retriever configuration, if any
+
+    Returns:
+        faiss.Index: The index
+    """
+    if metric in ("cosine", "prob"):
+        faiss_metric = faiss.METRIC_INNER_PRODUCT
+    elif metric == "euclidean":
+        faiss_metric = faiss.METRIC_L2
+    else:
+        raise ValueError(f"Invalid metric: {metric}")
+
+    index_config = get_index_config(index_config)
+    index_type = select_index_type(num_vectors, index_config)
+    qtype = QUANTIZATION_TYPES[select_quantization(index_type, index_config)]
+    if index_type == "flat":
+        if qtype is not None:
+            return faiss.IndexScalarQuantizer(dimension, qtype, faiss_metric)
+        return faiss.IndexFlatIP(dimension) if faiss_metric == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(dimension)
+    if index_type == "hnsw":
+        if qtype is not None:
+            index = faiss.IndexHNSWSQ(dimension, qtype, index_config["hnsw_m"], faiss_metric)
+        else:
+            index = faiss.IndexHNSWFlat(dimension, index_config["hnsw_m"], faiss_metric)
+        index.hnsw.efConstruction = index_config["hnsw_ef_construction"]
+        return index
+
+    nlist = _ivf_nlist(num_vectors, index_config)
+    quantizer = faiss.IndexFlatIP(dimension) if faiss_metric == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(dimension)
+    if index_type == "ivf":
+        if qtype is not None:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dimension, nlist, qtype, faiss_metric)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss_metric)
+    else:
+        # Fewer centroids per sub-quantizer when there is too little data to train 2^8
+        nbits = max(1, min(index_config["pq_nbits"], int(np.log2(max(num_vectors // 39, 2)))))
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, _pq_m(dimension, index_config), nbits, faiss_metric)
+    return index
+
+
+def sample_training_vectors(vectors: np.ndarray, sample_size: int, seed: int = 0) -> np.ndarray:
+    """
+    Pick the vectors an IVF or quantized index is trained on.
+
+    The rows are drawn uniformly at random, since leading rows come from the first
+    files of the repository and are not representative of the rest.
+
+    Args:
+        vectors: Vector matrix
+        sample_size: Maximum number of rows to pick
+        seed: Random seed, fixed so rebuilds train the same index
+
+    Returns:
+        np.ndarray: The sampled rows, or all rows if there are no more than sample_size
+    """
+    if sample_size >= len(vectors):
+        return vectors
+    return vectors[np.random.default_rng(seed).choice(len(vectors), sample_size, replace=False)]
+
+
+def build_faiss_index(documents: List, metric: str = "prob", index_config: Optional[dict] = None) -> faiss.Index:
+    """
+    Build a FAISS index from document vectors.
+
+    Args:
+        documents: Documents with embeddings of consistent size
+        metric: "cosine" or "prob" (inner product over normalized vectors) or "euclidean"
+        index_config: The "index" section of the retriever configuration; flat if not given
+
+    Returns:
+        faiss.Index: The populated index
+    """
+    xb = get_vector_matrix(documents)
+    if xb.ndim != 2 or xb.shape[0] == 0:
+        raise ValueError("Cannot build a FAISS index without embeddings")
+
+    if metric in ("cosine", "prob"):
+        faiss.normalize_L2(xb)
+    index = create_empty_index(xb.shape[1], xb.shape[0], metric, index_config or {"type": "flat"})
+    if not index.is_trained:
+        index_config = get_index_config(index_config)
+        index.train(sample_training_vectors(xb, index_config["train_sample_size"]))
+    index.add(xb)
+    configure_search(index, index_config)
+    logger.info(f"Built {get_index_type(index)} FAISS index ({get_index_quantization(index)} quantization) "
+                f"with {index.ntotal} vectors of dimension {index.d}")
+    return index
+
+
+def save_faiss_index(index: faiss.Index, index_path: str) -> None:
+    """
+    Atomically write a FAISS index to disk.
+
+    Args:
+        index: The index to write
+        index_path: Destination file path
+    """
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = f"{index_path}.tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, index_path)
+    logger.info(f"Saved FAISS index to {index_path}")
+
+
+def get_mmap_flags(index_path: str) -> int:
+    """
+    Get the read_index flags that memory-map an index file without copying its data.
+
+    IO_FLAG_MMAP only maps the inverted lists of IVF indexes; flat and HNSW indexes
+    read with it are still copied onto the heap. Those are mapped with
+    IO_FLAG_MMAP_IFC, which uses their codes in place in the mapping.
+
+    Args:
+        index_path: Path of the index file
+
+    Returns:
+        int: The flags, always including IO_FLAG_READ_ONLY
+    """
+    with open(index_path, "rb") as f:
+        fourcc = f.read(4)
+    # IVF indexes are written with fourccs "Iw.." (and "Iv.." by older versions)
+    if fourcc[:2] in (b"Iw", b"Iv"):
+        return faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    return faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+
+
+def load_faiss_index(index_path: str, mmap: bool = True) -> Optional[faiss.Index]:
+    """
+    Load a FAISS index from disk.
+
+    Args:
+        index_path: Path of the index file
+        mmap: Memory-map the file read-only instead of reading it into memory
+
+    Returns:
+        Optional[faiss.Index]: The index, or None if it cannot be loaded
+    """
+    if not os.path.exists(index_path):
+        return None
+    try:
+        flags = get_mmap_flags(index_path) if mmap else 0
+        return faiss.read_index(index_path, flags)
+    except Exception as e:
+        logger.warning(f"Could not load FAISS index from {index_path}: {e}")
+        return None
+
+
+def write_faiss_sidecar(db_path: str, documents: List, metric: str = "prob",
+                        index_config: Optional[dict] = None) -> Optional[faiss.Index]:
+    """
+    Build the vector index for a database's documents and save it next to the database.
+
+    Args:
+        db_path: Path of the database file
+        documents: The transformed documents stored in the database
+        metric: Retriever metric
+        index_config: The "index" section of the retriever configuration, if any
+
+    Returns:
+        Optional[faiss.Index]: The index, or None if there were no valid embeddings
+    """
+    valid_documents = filter_valid_embeddings(documents)
+    if not valid_documents:
+        logger.warning(f"No valid embeddings to index for {db_path}")
+        return None
+    index = build_faiss_index(valid_documents, metric, index_config)
+    save_faiss_index(index, get_faiss_index_path(db_path))
+    return index
+
+
+def load_or_build_faiss_index(db_path: str, documents: List, metric: str = "prob",
+                              index_config: Optional[dict] = None) -> faiss.Index:
+    """
+    Load the FAISS sidecar for a database, rebuilding it if it is missing or stale.
+
+    Args:
+        db_path: Path of the database file
+        documents: The validated documents the index must cover, in index order
+        metric: Retriever metric
+        index_config: The "index" section of the retriever configuration, if any
+
+    Returns:
+        faiss.Index: An index whose ids match the positions in ``documents``
+    """
+    index_path = get_faiss_index_path(db_path)
+    if os.path.exists(index_path) and os.path.exists(db_path) \
+            and os.path.getmtime(index_path) >= os.path.getmtime(db_path):
+        index = load_faiss_index(index_path, mmap=True)
+        expected_size = get_embedding_size(documents[0].vector) if documents else None
+        expected_type = select_index_type(len(documents), index_config or {"type": "flat"})
+        expected_quantization = select_quantization(expected_type, index_config)
+        if index is not None and index.ntotal == len(documents) and index.d == expected_size \
+                and get_index_type(index) == expected_type and get_index_quantization(index) == expected_quantization:
+            logger.info(f"Loaded {expected_type} FAISS index ({expected_quantization} quantization) "
+                        f"with {index.ntotal} vectors from {index_path}")
+            return configure_search(index, index_config)
+        logger.info(f"FAISS index at {index_path} does not match the database or configuration, rebuilding")
+
+    index = build_faiss_index(documents, metric, index_config)
+    try:
+        save_faiss_index(index, index_path)
+    except Exception as e:
+        logger.warning(f"Could not save FAISS index to {index_path}: {e}")
+    return index
+
+
+def score_documents(documents: List, indices: Sequence[int], query_embedding: Sequence[float],
+                    metric: str = "prob") -> np.ndarray:
+    """
+    Score documents against a query embedding on the scale a FAISSRetriever reports.
+
+    Args:
+        documents: Documents with embeddings of consistent size, StoredDocuments or a vector matrix
+        indices: Positions in ``documents``
+        query_embedding: Embedding of the query
+        metric: Retriever metric
+
+    Returns:
+        np.ndarray: Cosine similarity for "cosine", (1 + cosine) / 2 for "prob" and the
+        squared L2 distance for "euclidean", one per index
+    """
+    if not len(indices):
+        return np.zeros(0, dtype=np.float32)
+    vectors = get_document_vectors(documents, np.asarray(indices, dtype=np.int64))
+    query = np.asarray(query_embedding, dtype=np.float32)
+    if metric == "euclidean":
+        return ((vectors - query) ** 2).sum(axis=1)
+    norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+    scores = vectors @ query / np.where(norms > 0, norms, 1.0)
+    if metric == "prob":
+        # As FAISSRetriever._convert_cosine_similarity_to_probability
+        return np.round((np.clip(scores, -1, 1) + 1) / 2, 3)
+    return scores
+
+
+def get_document_vectors(documents: List, indices: np.ndarray) -> np.ndarray:
+    """
+    Get the vectors of some documents as a float32 matrix.
+
+    Args:
+        documents: Documents with embeddings of consistent size, StoredDocuments or a vector matrix
+        indices: Positions in ``documents``
+
+    Returns:
+        np.ndarray: A matrix with one row per index
+    """
+    if isinstance(documents, np.ndarray):
+        return np.asarray(documents[indices], dtype=np.float32)
+    if hasattr(documents, "vectors_at"):
+        return documents.vectors_at(indices)
+    return np.asarray([documents[i].vector for i in indices], dtype=np.float32)
+
+
+class RescoringFAISSRetriever(FAISSRetriever):
+    """
+    FAISSRetriever over a lossy index that re-scores its candidates exactly.
+
+    The index is searched for rescore_factor * top_k candidates, which are then
+    ranked by their score against the full-precision vectors of the documents.
+    """
+
+    def __init__(self, *args, rescore_factor: int = 4, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rescore_factor = rescore_factor
+
+    def rescore(self, xq: np.ndarray, candidate_ids: np.ndarray, top_k: int):
+        """
+        Rank candidates by their exact score.
+
+        Args:
+            xq: Query matrix
+            candidate_ids: Candidate ids per query, -1 for missing results
+            top_k: Number of results per query
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Scores and ids, in faiss.Index.search layout
+        """
+        scores = np.full((len(xq), top_k), -np.inf if self.metric != "euclidean" else np.inf, dtype=np.float32)
+        ids = np.full((len(xq), top_k), -1, dtype=np.int64)
+        for row, (query, candidates) in enumerate(zip(xq, candidate_ids)):
+            candidates = candidates[candidates >= 0]
+            if len(candidates) == 0:
+                continue
+            vectors = get_document_vectors(self.documents, candidates)
+            if self.metric == "euclidean":
+                exact = ((vectors - query) ** 2).sum(axis=1)
+                order = np.argsort(exact, kind="stable")[:top_k]
+            else:
+                # The index holds normalized vectors for cosine and prob
+                norms = np.linalg.norm(vectors, axis=1)
+                exact = vectors @ query / np.where(norms > 0, norms, 1)
+                order = np.argsort(-exact, kind="stable")[:top_k]
+            scores[row, :len(order)] = exact[order]
+            ids[row, :len(order)] = candidates[order]
+        return scores, ids
+
+    def retrieve_embedding_queries(self, input, top_k: Optional[int] = None):
+        if not self.indexed or self.index.ntotal == 0:
+            raise ValueError("Index is empty. Please set the chunks to build the index from")
+        xq = np.asarray(input, dtype=np.float32)
+        if xq.ndim == 1:
+            xq = xq[None, :]
+        top_k = top_k or self.top_k
+        _, candidate_ids = self.index.search(xq, min(top_k * self.rescore_factor, self.index.ntotal))
+        D, Ind = self.rescore(xq, candidate_ids, top_k)
+        if self.metric == "prob":
+            D = self._convert_cosine_similarity_to_probability(D)
+        return self._to_retriever_output(Ind, D)
+
+
+def create_faiss_retriever(index: faiss.Index, documents: List, top_k: int = 20,
+                           metric: str = "prob", embedder: Any = None,
+                           rescore_factor: int = 0) -> FAISSRetriever:
+    """
+    Wrap a prebuilt FAISS index in a FAISSRetriever without copying its vectors.
+
+    Args:
+        index: The FAISS index, with ids matching positions in ``documents``
+        documents: The indexed documents
+        top_k: Number of documents to retrieve
+        metric: Retriever metric
+        embedder: Optional embedder for string queries
+        rescore_factor: Re-score this many times top_k candidates exactly if the index is lossy
+
+    Returns:
+        FAISSRetriever: A retriever ready for embedding queries
+    """
+    if rescore_factor > 1 and is_lossy_index(index):
+        retriever = RescoringFAISSRetriever(embedder=embedder, top_k=top_k, metric=metric,
+                                            rescore_factor=rescore_factor)
+    else:
+        retriever = FAISSRetriever(embedder=embedder, top_k=top_k, metric=metric)
+    retriever.index = index
+    retriever.documents = documents
+    retriever.dimensions = index.d
+    retriever.total_documents = index.ntotal
+    retriever.indexed = True
+    return retriever
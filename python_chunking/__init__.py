@@ -0,0 +1 @@
+# Tree-sitter based chunking, importable as python_chunking.core
@@ -14,7 +14,7 @@ SENTENCE_TRANSFORMERS_AVAILABLE = True
 #     SENTENCE_TRANSFORMERS_AVAILABLE = False
 #     SentenceTransformer = None
 
-from core.index import Chunk
+from ..index import Chunk
 
 
 class EmbeddingsProvider:
@@ -4,7 +4,7 @@ Simple embeddings provider without heavy dependencies
 from typing import List
 import hashlib
 import numpy as np
-from core.index import Chunk
+from ..index import Chunk
 
 
 class SimpleEmbeddingsProvider:
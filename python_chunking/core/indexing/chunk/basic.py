@@ -2,8 +2,8 @@
 Basic chunker for non-code files.
 """
 from typing import AsyncGenerator
-from core.index import ChunkWithoutID
-from core.llm.count_tokens import count_tokens_async
+from ...index import ChunkWithoutID
+from ...llm.count_tokens import count_tokens_async
 
 
 async def basic_chunker(
@@ -2,10 +2,10 @@
 Main chunking logic that coordinates between code and basic chunkers.
 """
 from typing import AsyncGenerator
-from core.index import Chunk, ChunkWithoutID
-from core.llm.count_tokens import count_tokens_async
-from core.util.tree_sitter import SUPPORTED_LANGUAGES
-from core.util.uri import get_uri_file_extension, get_uri_path_basename
+from ...index import Chunk, ChunkWithoutID
+from ...llm.count_tokens import count_tokens_async
+from ...util.tree_sitter import SUPPORTED_LANGUAGES
+from ...util.uri import get_uri_file_extension, get_uri_path_basename
 from .basic import basic_chunker
 from .code import code_chunker
 
@@ -109,7 +109,7 @@ async def chunk_document(
             )
         elif chunk_without_id.filepath and index == 0:
             # basic_chunker를 사용한 경우: 첫 번째 청크만 파일 레벨 메타데이터 생성
-            from core.index import ChunkMetadata
+            from ...index import ChunkMetadata
             import os
             metadata = ChunkMetadata(
                 symbol_type="file",
@@ -4,9 +4,9 @@ Code chunker using Tree-sitter for structured code parsing.
 from typing import AsyncGenerator, Dict, Callable, Optional
 from tree_sitter import Node
 from dataclasses import dataclass
-from core.index import ChunkWithoutID
-from core.llm.count_tokens import count_tokens_async
-from core.util.tree_sitter import get_parser_for_file
+from ...index import ChunkWithoutID
+from ...llm.count_tokens import count_tokens_async
+from ...util.tree_sitter import get_parser_for_file
 from .metadata import get_language_from_filepath
 
 
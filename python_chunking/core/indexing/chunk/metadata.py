@@ -4,7 +4,7 @@ Tree-sitter AST 노드에서 심볼, import/export, 상속, 참조 관계 등을
 """
 from typing import Optional, List, Dict, Set
 from tree_sitter import Node
-from core.index import ChunkMetadata
+from ...index import ChunkMetadata
 
 
 # 언어별 심볼 타입 매핑
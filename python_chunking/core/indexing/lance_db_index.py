@@ -7,14 +7,14 @@ import lancedb
 import numpy as np
 import json
 from pathlib import Path
-from core.index import (
+from ..index import (
     Chunk, ChunkWithoutID, ChunkMetadata, ILLM, IndexingProgressUpdate, 
     PathAndCacheKey, RefreshIndexResults, MarkCompleteCallback,
     IndexResultType, BranchAndDir
 )
-from core.indexing.chunk.chunk import chunk_document, should_chunk
+from .chunk.chunk import chunk_document, should_chunk
 
-from core.embeddings.embeddings_provider import EmbeddingsProvider
+from ..embeddings.embeddings_provider import EmbeddingsProvider
 
 # try:
 #     from core.embeddings.embeddings_provider import EmbeddingsProvider
@@ -9,13 +9,13 @@ from pathlib import Path
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import numpy as np
-from core.index import (
+from ..index import (
     Chunk, ChunkWithoutID, ChunkMetadata, ILLM, IndexingProgressUpdate, 
     PathAndCacheKey, RefreshIndexResults, MarkCompleteCallback,
     IndexResultType, BranchAndDir
 )
-from core.indexing.chunk.chunk import chunk_document, should_chunk
-from core.embeddings.embeddings_provider import EmbeddingsProvider
+from .chunk.chunk import chunk_document, should_chunk
+from ..embeddings.embeddings_provider import EmbeddingsProvider
 
 
 class PgVectorIndex:
@@ -150,6 +150,23 @@ class PgVectorIndex:
             print(f"Error inserting data: {e}")
             raise
     
+    async def delete_chunks(self, filepath: str):
+        """Delete all chunks stored for a file"""
+        await self.initialize()
+        
+        relative_path = self._get_relative_path(filepath)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("DELETE FROM chunks WHERE path = %s", (relative_path,))
+                deleted = cur.rowcount
+            self.conn.commit()
+            if deleted:
+                print(f"Deleted {deleted} chunks for {relative_path}")
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Error deleting chunks for {relative_path}: {e}")
+            raise
+    
     async def retrieve(
         self,
         query: str,
@@ -322,6 +339,9 @@ class PgVectorIndex:
                 with open(item.path, 'r', encoding='utf-8') as f:
                     content = f.read()
                 
+                # 수정된 파일의 이전 청크는 줄 범위가 달라질 수 있으므로 먼저 삭제
+                await self.delete_chunks(item.path)
+                
                 chunks = await self.get_chunks(item, content)
                 if chunks:
                     all_chunks.extend(chunks)
@@ -369,8 +389,17 @@ class PgVectorIndex:
         
         # Process delete items
         for item in results.delete:
+            try:
+                await self.delete_chunks(item.path)
+            except Exception as e:
+                print(f"Error deleting {item.path}: {e}")
             mark_complete([item], IndexResultType.DELETE)
             processed += 1
+            yield IndexingProgressUpdate(
+                desc=f"Deleted {item.path}",
+                status="success",
+                progress=processed / (total_items + 1)
+            )
     
     def close(self):
         """Close database connection"""
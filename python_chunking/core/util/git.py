@@ -0,0 +1,65 @@
+"""
+Git utilities for refreshing an index from the changes between two commits.
+"""
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+
+@dataclass
+class ChangedFiles:
+    """Files changed between two commits, as paths relative to the repository root"""
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+
+def get_head_commit(repo_dir: Path) -> Optional[str]:
+    """Return the HEAD commit of a repository, or None if it is not a Git checkout"""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo_dir), "rev-parse", "HEAD"],
+            check=True, capture_output=True, text=True
+        )
+        return result.stdout.strip()
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+
+def get_repo_root(repo_dir: Path) -> Optional[Path]:
+    """Return the top-level directory of the repository containing repo_dir"""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo_dir), "rev-parse", "--show-toplevel"],
+            check=True, capture_output=True, text=True
+        )
+        return Path(result.stdout.strip())
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+
+def get_changed_files(repo_dir: Path, since: str, until: str = "HEAD") -> ChangedFiles:
+    """
+    `git diff --name-status` between two commits.
+
+    Renames are reported as a deletion of the old path and an addition of the new one.
+    """
+    result = subprocess.run(
+        ["git", "-C", str(repo_dir), "diff", "--name-status", "--no-renames", since, until],
+        check=True, capture_output=True, text=True
+    )
+
+    changes = ChangedFiles()
+    for line in result.stdout.splitlines():
+        parts = line.split("\t")
+        if len(parts) < 2:
+            continue
+        status, path = parts[0], parts[-1]
+        if status.startswith("A"):
+            changes.added.append(path)
+        elif status.startswith("D"):
+            changes.deleted.append(path)
+        else:
+            changes.modified.append(path)
+    return changes
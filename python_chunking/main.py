@@ -2,6 +2,7 @@
 Main entry point for the Python chunking system.
 """
 import asyncio
+import os
 import sys
 import argparse
 import hashlib
@@ -10,6 +11,11 @@ from typing import List
 from core.index import PathAndCacheKey, RefreshIndexResults, IndexResultType
 from core.indexing.pgvector_index import PgVectorIndex  # 변경
 from core.embeddings.embeddings_provider import EmbeddingsProvider
+from core.util.git import get_changed_files, get_repo_root
+
+# 저장소 루트를 경로에 추가하여 api 패키지의 공용 파일 필터 사용
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from api.file_filters import FileFilter
 
 
 class MockMarkCompleteCallback:
@@ -19,6 +25,52 @@ class MockMarkCompleteCallback:
         pass
 
 
+# 지원되는 소스 코드 파일 확장자
+SUPPORTED_EXTENSIONS = {
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.cc', '.cxx',
+    '.h', '.hpp', '.cs', '.go', '.rs', '.rb', '.php', '.swift', '.kt', '.kts',
+    '.m', '.mm', '.scala', '.r', '.R', '.lua', '.pl', '.pm', '.sh', '.bash',
+    '.sql', '.html', '.css', '.scss', '.sass', '.less', '.vue', '.dart',
+    '.md', '.txt', '.json', '.yaml', '.yml', '.xml', '.toml', '.ini', '.cfg'
+}
+
+# 제외할 디렉토리 패턴
+EXCLUDED_DIRS = {
+    '__pycache__', '.git', '.svn', '.hg', 'node_modules', '.venv', 'venv',
+    'env', '.env', 'dist', 'build', 'target', '.idea', '.vscode', '.vs',
+    'bin', 'obj', 'out', '.pytest_cache', '.mypy_cache', '.tox'
+}
+
+# 제외할 파일 패턴
+EXCLUDED_EXTENSIONS = {
+    '.pyc', '.pyo', '.pyd', '.so', '.dll', '.dylib', '.exe', '.bin',
+    '.class', '.o', '.a', '.lib', '.jar', '.war', '.ear',
+    '.min.js', '.min.css', '.map'
+}
+
+# 제외 디렉토리/확장자 규칙을 한 번만 컴파일
+FILE_FILTER = FileFilter(
+    excluded_dirs=sorted(EXCLUDED_DIRS),
+    excluded_files=[f"*{extension}" for extension in sorted(EXCLUDED_EXTENSIONS)]
+)
+
+
+def is_indexable_file(file_path: Path) -> bool:
+    """제외 디렉토리/확장자 규칙을 적용하여 인덱싱 대상 파일인지 확인"""
+    # 제외할 디렉토리에 포함된 파일 및 제외할 확장자는 건너뛰기
+    if not FILE_FILTER.matches(file_path.as_posix()):
+        return False
+    
+    # 지원되는 확장자만 포함
+    return file_path.suffix.lower() in SUPPORTED_EXTENSIONS
+
+
+def make_path_and_cache_key(file_path: Path) -> PathAndCacheKey:
+    """파일 경로를 기반으로 고유한 cache_key를 가진 PathAndCacheKey 생성"""
+    cache_key = hashlib.md5(str(file_path).encode()).hexdigest()
+    return PathAndCacheKey(path=str(file_path), cache_key=cache_key)
+
+
 def get_files_from_directory(directory_path: Path) -> List[PathAndCacheKey]:
     """
     디렉토리를 순회하여 모든 파일에 대한 PathAndCacheKey 리스트 생성
@@ -29,29 +81,6 @@ def get_files_from_directory(directory_path: Path) -> List[PathAndCacheKey]:
     Returns:
         PathAndCacheKey 객체들의 리스트
     """
-    # 지원되는 소스 코드 파일 확장자
-    SUPPORTED_EXTENSIONS = {
-        '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.cc', '.cxx',
-        '.h', '.hpp', '.cs', '.go', '.rs', '.rb', '.php', '.swift', '.kt', '.kts',
-        '.m', '.mm', '.scala', '.r', '.R', '.lua', '.pl', '.pm', '.sh', '.bash',
-        '.sql', '.html', '.css', '.scss', '.sass', '.less', '.vue', '.dart',
-        '.md', '.txt', '.json', '.yaml', '.yml', '.xml', '.toml', '.ini', '.cfg'
-    }
-    
-    # 제외할 디렉토리 패턴
-    EXCLUDED_DIRS = {
-        '__pycache__', '.git', '.svn', '.hg', 'node_modules', '.venv', 'venv',
-        'env', '.env', 'dist', 'build', 'target', '.idea', '.vscode', '.vs',
-        'bin', 'obj', 'out', '.pytest_cache', '.mypy_cache', '.tox'
-    }
-    
-    # 제외할 파일 패턴
-    EXCLUDED_EXTENSIONS = {
-        '.pyc', '.pyo', '.pyd', '.so', '.dll', '.dylib', '.exe', '.bin',
-        '.class', '.o', '.a', '.lib', '.jar', '.war', '.ear',
-        '.min.js', '.min.css', '.map'
-    }
-    
     test_files = []
     
     if not directory_path.exists():
@@ -62,38 +91,56 @@ def get_files_from_directory(directory_path: Path) -> List[PathAndCacheKey]:
         print(f"Error: '{directory_path}' is not a directory")
         return test_files
     
-    # 디렉토리 내의 모든 파일 순회 (재귀적으로)
-    for file_path in directory_path.rglob('*'):
-        # 디렉토리는 건너뛰기
-        if not file_path.is_file():
-            continue
-        
-        # 제외할 디렉토리에 포함된 파일은 건너뛰기
-        if any(excluded_dir in file_path.parts for excluded_dir in EXCLUDED_DIRS):
-            continue
-        
-        # 파일 확장자 확인
-        file_extension = file_path.suffix.lower()
+    # 디렉토리 내의 모든 파일 순회 (재귀적으로, 제외할 디렉토리는 내려가지 않음)
+    for root, dirs, filenames in os.walk(directory_path):
+        root_path = Path(root)
+        relative_root = root_path.relative_to(directory_path)
+        dirs[:] = sorted(d for d in dirs if FILE_FILTER.should_descend((relative_root / d).as_posix()))
         
-        # 제외할 확장자는 건너뛰기
-        if file_extension in EXCLUDED_EXTENSIONS:
-            continue
-        
-        # 지원되는 확장자만 포함
-        if file_extension in SUPPORTED_EXTENSIONS:
-            # 파일 경로를 기반으로 고유한 cache_key 생성
-            cache_key = hashlib.md5(str(file_path).encode()).hexdigest()
-            
-            test_files.append(
-                PathAndCacheKey(
-                    path=str(file_path),
-                    cache_key=cache_key
-                )
-            )
+        for filename in sorted(filenames):
+            if is_indexable_file(relative_root / filename):
+                test_files.append(make_path_and_cache_key(root_path / filename))
     
     return test_files
 
 
+def get_refresh_results_since(directory_path: Path, since: str) -> RefreshIndexResults:
+    """
+    커밋 since 이후 git diff --name-status 결과로 RefreshIndexResults 생성
+    
+    추가/수정된 파일은 compute, 삭제된 파일은 delete 항목이 된다.
+    
+    Args:
+        directory_path: 인덱싱 대상 디렉토리 (git 저장소 내부)
+        since: 마지막으로 인덱싱한 커밋
+        
+    Returns:
+        변경된 파일만 포함하는 RefreshIndexResults
+    """
+    repo_root = get_repo_root(directory_path)
+    if repo_root is None:
+        raise ValueError(f"'{directory_path}' is not inside a git repository")
+    
+    changes = get_changed_files(repo_root, since)
+    directory_path = directory_path.resolve()
+    
+    def in_scope(relative_path: str) -> bool:
+        file_path = repo_root / relative_path
+        return file_path.is_relative_to(directory_path) and is_indexable_file(file_path.relative_to(directory_path))
+    
+    compute = [
+        make_path_and_cache_key(repo_root / path)
+        for path in changes.added + changes.modified
+        if in_scope(path)
+    ]
+    delete = [
+        make_path_and_cache_key(repo_root / path)
+        for path in changes.deleted
+        if in_scope(path)
+    ]
+    return RefreshIndexResults(compute=compute, add_tag=[], delete=delete)
+
+
 async def main():
     """Main function demonstrating the chunking system"""
     print("Python Code Chunking System - Real Implementation")
@@ -107,6 +154,11 @@ async def main():
         default='test_files',
         help='Directory path to process (default: test_files)'
     )
+    parser.add_argument(
+        '--since',
+        default=None,
+        help='Only re-index files changed since this git commit'
+    )
     args = parser.parse_args()
     
     # 디렉토리 경로 설정
@@ -124,24 +176,38 @@ async def main():
     # Initialize PgVector index with base_path for relative paths
     index = PgVectorIndex(embeddings_provider, base_path=str(target_dir))
     
-    # 디렉토리에서 파일 목록 가져오기
-    test_files = get_files_from_directory(target_dir)
-    
-    if not test_files:
-        print("No files found to process")
-        return
-    
-    print(f"Found {len(test_files)} files to process:")
-    for file_info in test_files:
-        print(f"  - {file_info.path}")
-    print()
-    
-    # Create refresh results
-    results = RefreshIndexResults(
-        compute=test_files,
-        add_tag=[],
-        delete=[]
-    )
+    if args.since:
+        # git diff로 변경된 파일만 가져오기
+        results = get_refresh_results_since(target_dir, args.since)
+        if not results.compute and not results.delete:
+            print(f"No changes since {args.since}")
+            return
+        
+        print(f"Found {len(results.compute)} changed and {len(results.delete)} deleted files since {args.since}:")
+        for file_info in results.compute:
+            print(f"  - {file_info.path}")
+        for file_info in results.delete:
+            print(f"  - (deleted) {file_info.path}")
+        print()
+    else:
+        # 디렉토리에서 파일 목록 가져오기
+        test_files = get_files_from_directory(target_dir)
+        
+        if not test_files:
+            print("No files found to process")
+            return
+        
+        print(f"Found {len(test_files)} files to process:")
+        for file_info in test_files:
+            print(f"  - {file_info.path}")
+        print()
+        
+        # Create refresh results
+        results = RefreshIndexResults(
+            compute=test_files,
+            add_tag=[],
+            delete=[]
+        )
     
     # Callback
     mark_complete = MockMarkCompleteCallback()
@@ -4,11 +4,11 @@
 """
 
 import os
+import sys
 import logging
 from pathlib import Path
 from typing import Dict, List, Set
 from dataclasses import dataclass
-import fnmatch
 
 from config import (
     CODE_EXTENSIONS, DOC_EXTENSIONS,
@@ -16,6 +16,13 @@ from config import (
     SUPPORTED_LANGUAGES
 )
 
+# 저장소 루트를 경로에 추가하여 api 패키지의 공용 파일 필터 사용
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from api.file_filters import FileFilter
+
+# 제외 규칙을 한 번만 컴파일
+FILE_FILTER = FileFilter(excluded_dirs=EXCLUDED_DIRS, excluded_files=EXCLUDED_FILES)
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,7 +64,7 @@ class FileTreeAnalyzer:
     
     def should_exclude_dir(self, dir_name: str) -> bool:
         """디렉토리를 제외할지 확인"""
-        return dir_name in EXCLUDED_DIRS or dir_name.startswith('.')
+        return dir_name.startswith('.') or not FILE_FILTER.should_descend(dir_name)
     
     def should_exclude_file(self, file_name: str) -> bool:
         """파일을 제외할지 확인"""
@@ -66,11 +73,7 @@ class FileTreeAnalyzer:
             return True
         
         # 패턴 매칭으로 제외 파일 확인
-        for pattern in EXCLUDED_FILES:
-            if fnmatch.fnmatch(file_name, pattern):
-                return True
-        
-        return False
+        return not FILE_FILTER.matches(file_name)
     
     def get_language_from_extension(self, extension: str) -> str:
         """파일 확장자로부터 프로그래밍 언어 판별"""
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for expanding retrieved chunks with their neighbors.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.components.data_process import TextSplitter
+from adalflow.core.types import Document
+
+from api.chunk_stitching import stitch_neighbors
+from api.index_store import write_index_store
+
+
+def make_chunks():
+    """Split two files into disjoint chunks of two words."""
+    splitter = TextSplitter(split_by="word", chunk_size=2, chunk_overlap=0)
+    sources = [
+        Document(text="a0 a1 a2 a3 a4 a5 a6 a7 a8 a9", meta_data={"file_path": "a.py"}),
+        Document(text="b0 b1 b2 b3", meta_data={"file_path": "b.py"}),
+    ]
+    chunks = splitter(sources)
+    for chunk in chunks:
+        chunk.vector = [1.0, 0.0]
+    return sources, chunks
+
+
+class TestStitchNeighbors:
+    """Tests for stitch_neighbors"""
+
+    def test_window_zero_returns_hits(self):
+        _, chunks = make_chunks()
+        assert stitch_neighbors(chunks, [3, 0], 0) == [chunks[3], chunks[0]]
+
+    def test_merges_contiguous_neighbors(self):
+        _, chunks = make_chunks()
+        texts = [chunk.text for chunk in chunks]
+        assert texts[:5] == ["a0 a1 ", "a2 a3 ", "a4 a5 ", "a6 a7 ", "a8 a9"]
+
+        # Hits on b.py's first chunk and a.py's chunks 1 and 3, whose windows touch
+        spans = stitch_neighbors(chunks, [5, 1, 3], 1)
+
+        assert [span.text for span in spans] == ["b0 b1 b2 b3", "a0 a1 a2 a3 a4 a5 a6 a7 a8 a9"]
+        assert spans[1].meta_data["file_path"] == "a.py"
+
+    def test_separate_spans_of_one_file(self):
+        _, chunks = make_chunks()
+        spans = stitch_neighbors(chunks, [0, 4], 1)
+        assert [span.text for span in spans] == ["a0 a1 a2 a3 ", "a6 a7 a8 a9"]
+
+    def test_code_chunks_are_joined_by_line(self):
+        chunks = [
+            Document(text=f"def f{i}():\n    pass", order=i, parent_doc_id="m",
+                     meta_data={"file_path": "m.py", "start_line": 3 * i, "end_line": 3 * i + 1})
+            for i in range(3)
+        ]
+        spans = stitch_neighbors(chunks, [1], 1)
+        assert len(spans) == 1
+        assert spans[0].text == "def f0():\n    pass\ndef f1():\n    pass\ndef f2():\n    pass"
+        assert (spans[0].meta_data["start_line"], spans[0].meta_data["end_line"]) == (0, 7)
+
+    def test_index_store_documents(self, tmp_path):
+        sources, chunks = make_chunks()
+        store = write_index_store(str(tmp_path / "repo.db"), sources, chunks)
+        documents = store.documents()
+
+        spans = stitch_neighbors(documents, [5, 1, 3], 1)
+
+        assert [span.text for span in spans] == ["b0 b1 b2 b3", "a0 a1 a2 a3 a4 a5 a6 a7 a8 a9"]
+        assert spans == stitch_neighbors(chunks, [5, 1, 3], 1)
+
+    def test_overlapping_chunks_are_merged_without_repeats(self):
+        splitter = TextSplitter(split_by="word", chunk_size=4, chunk_overlap=2)
+        source = Document(text="a0 a1 a2 a3 a4 a5 a6 a7 a8 a9", meta_data={"file_path": "a.py"})
+        chunks = splitter([source])
+        assert [chunk.text for chunk in chunks][:2] == ["a0 a1 a2 a3 ", "a2 a3 a4 a5 "]
+
+        for overlap_words in (2, 0):
+            spans = stitch_neighbors(chunks, [1], 1, overlap_words=overlap_words)
+            assert [span.text for span in spans] == ["a0 a1 a2 a3 a4 a5 a6 a7 "]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for syntax-aware splitting of code files.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.components.data_process import TextSplitter
+from adalflow.core.types import Document
+
+import api.code_splitter as code_splitter
+from api.code_splitter import CodeAwareSplitter, create_splitter
+
+
+async def fake_chunk_document(filepath, contents, max_chunk_size, digest):
+    """Yields one chunk per blank-line separated block, like chunking by top-level definition."""
+    line = 0
+    for block in contents.split("\n\n"):
+        metadata = SimpleNamespace(symbol_type="function", symbol_name=block.split("(")[0].replace("def ", ""))
+        yield SimpleNamespace(content=block, start_line=line, end_line=line + block.count("\n"), metadata=metadata)
+        line += block.count("\n") + 2
+
+
+def make_splitter():
+    return CodeAwareSplitter(TextSplitter(split_by="word", chunk_size=5, chunk_overlap=1), max_chunk_tokens=100)
+
+
+class TestCodeAwareSplitter:
+    """Tests for CodeAwareSplitter"""
+
+    def test_code_files_are_split_by_definition(self, monkeypatch):
+        monkeypatch.setattr(code_splitter, "load_chunk_document", lambda: fake_chunk_document)
+        code = Document(text="def a():\n    return 1\n\ndef b():\n    return 2",
+                        meta_data={"file_path": "m.py", "is_code": True})
+        readme = Document(text="one two three four five six seven eight",
+                          meta_data={"file_path": "README.md", "is_code": False})
+
+        chunks = make_splitter()([code, readme])
+
+        code_chunks = [chunk for chunk in chunks if chunk.meta_data["file_path"] == "m.py"]
+        assert [chunk.text for chunk in code_chunks] == ["def a():\n    return 1", "def b():\n    return 2"]
+        assert code_chunks[1].meta_data["symbol_name"] == "b"
+        assert code_chunks[1].meta_data["start_line"] == 3
+        assert code_chunks[1].parent_doc_id == code.id
+        assert code_chunks[1].order == 1
+        # Non-code files keep the overlapping word splitter
+        assert [chunk.meta_data["file_path"] for chunk in chunks[2:]] == ["README.md", "README.md"]
+
+    def test_falls_back_to_text_splitter_without_tree_sitter(self, monkeypatch):
+        monkeypatch.setattr(code_splitter, "load_chunk_document", lambda: None)
+        code = Document(text="def a():\n    return 1", meta_data={"file_path": "m.py", "is_code": True})
+
+        splitter = make_splitter()
+        chunks = splitter([code])
+        assert [chunk.text for chunk in chunks] == [chunk.text for chunk in splitter.text_splitter([code])]
+
+    def test_fallback_is_warned_once(self, monkeypatch, caplog):
+        async def failing_chunk_document(filepath, contents, max_chunk_size, digest):
+            raise RuntimeError("no grammar")
+            yield
+
+        monkeypatch.setattr(code_splitter, "load_chunk_document", lambda: failing_chunk_document)
+        monkeypatch.setattr(code_splitter, "_fallback_warned", False)
+        documents = [Document(text=f"def f{i}(): pass", meta_data={"file_path": f"m{i}.py", "is_code": True})
+                     for i in range(3)]
+
+        with caplog.at_level("DEBUG", logger="api.code_splitter"):
+            chunks = make_splitter()(documents)
+
+        assert [chunk.meta_data["file_path"] for chunk in chunks] == ["m0.py", "m1.py", "m2.py"]
+        levels = [record.levelname for record in caplog.records if record.name == "api.code_splitter"]
+        assert levels == ["WARNING", "DEBUG", "DEBUG"]
+
+    def test_create_splitter(self):
+        config = {"split_by": "word", "chunk_size": 350, "chunk_overlap": 100}
+        assert isinstance(create_splitter(config), TextSplitter)
+        assert isinstance(create_splitter(config, {"enabled": False}), TextSplitter)
+        assert create_splitter(config, {"enabled": True, "max_chunk_tokens": 256}).max_chunk_tokens == 256
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent, rate-limited batch embedding.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.core.types import Document, Embedding, EmbedderOutput
+
+from api.concurrent_embedder import ConcurrentEmbeddingProcessor, TokenBucket
+
+
+class FakeAsyncEmbedder:
+    """Embedder whose acall answers later batches first and tracks concurrency."""
+
+    def __init__(self, fail_first: int = 0):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.fail_first = fail_first
+
+    async def acall(self, input):
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            return EmbedderOutput(error="rate limited")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Batches starting with a larger number finish first
+        await asyncio.sleep(0.002 * (20 - int(input[0])))
+        self.in_flight -= 1
+        return EmbedderOutput(data=[Embedding(embedding=[float(text), 0.0], index=i) for i, text in enumerate(input)])
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket"""
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(requests_per_minute=600, capacity=2)
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+        # 10 requests per second: the third one waits about 0.1s
+        assert 0.05 < bucket.reserve() <= 0.1
+
+
+class TestConcurrentEmbeddingProcessor:
+    """Tests for ConcurrentEmbeddingProcessor"""
+
+    def test_results_in_input_order(self):
+        embedder = FakeAsyncEmbedder()
+        processor = ConcurrentEmbeddingProcessor(embedder, provider="test-order", batch_size=3,
+                                                 concurrency=3, requests_per_minute=60000)
+        documents = [Document(text=str(i)) for i in range(20)]
+
+        output = processor(documents)
+
+        assert [doc.vector[0] for doc in output] == [float(i) for i in range(20)]
+        assert all(not doc.vector for doc in documents)
+        assert 1 < embedder.max_in_flight <= 3
+
+    def test_retries_failed_batches(self, monkeypatch):
+        monkeypatch.setattr("api.concurrent_embedder.RETRY_BASE_DELAY", 0)
+        embedder = FakeAsyncEmbedder(fail_first=2)
+        processor = ConcurrentEmbeddingProcessor(embedder, provider="test-retry", batch_size=10,
+                                                 concurrency=1, requests_per_minute=60000)
+
+        output = processor([Document(text=str(i)) for i in range(5)])
+
+        assert embedder.calls == 3
+        assert [doc.vector[0] for doc in output] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    def test_runs_inside_a_running_event_loop(self):
+        processor = ConcurrentEmbeddingProcessor(FakeAsyncEmbedder(), provider="test-loop", batch_size=2,
+                                                 requests_per_minute=60000)
+
+        async def handler():
+            return processor([Document(text="1"), Document(text="2"), Document(text="3")])
+
+        output = asyncio.run(handler())
+        assert [doc.vector[0] for doc in output] == [1.0, 2.0, 3.0]
+
+    def test_rate_limit_spaces_requests(self):
+        processor = ConcurrentEmbeddingProcessor(FakeAsyncEmbedder(), provider="test-rate", batch_size=1,
+                                                 concurrency=4, requests_per_minute=1200)
+        start = time.perf_counter()
+        # 20 requests per second with a burst of 20: 24 requests need at least 0.2s
+        processor([Document(text="19") for _ in range(24)])
+        assert time.perf_counter() - start >= 0.15
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for assembling retrieved chunks into prompt context.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.components.data_process import TextSplitter
+from adalflow.core.types import Document
+
+from api.context_assembler import assemble_context, find_overlap, merge_file_chunks
+
+
+def split(text: str, file_path: str, chunk_size: int = 4, chunk_overlap: int = 2):
+    splitter = TextSplitter(split_by="word", chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return splitter([Document(text=text, meta_data={"file_path": file_path})])
+
+
+class TestContextAssembler:
+    """Tests for the context assembler"""
+
+    def test_find_overlap(self):
+        assert find_overlap("w0 w1 w2 w3 ", "w2 w3 w4 w5 ") == len("w2 w3 ")
+        assert find_overlap("w0 w1 ", "w2 w3 ") == 0
+        # A shared character inside a word or shared indentation is not an overlap
+        assert find_overlap("abcx", "x yz") == 0
+        assert find_overlap("a\n    ", "  b") == 0
+        assert find_overlap("abc x", "abc x y") == len("abc x")
+        # With the splitter's overlap known, whitespace-only units are trimmed exactly
+        assert find_overlap("def f(x):\n  ", "   ", overlap_words=1) == 1
+
+    def test_merges_overlapping_chunks_in_file_order(self):
+        text = "w0 w1 w2 w3 w4 w5 w6 w7 w8 w9"
+        chunks = split(text, "a.py")
+        assert len(chunks) == 4
+
+        # Retrieved out of order, with chunk 2 missing in between
+        spans = merge_file_chunks([chunks[3], chunks[0], chunks[1], chunks[0]], overlap_words=2)
+
+        assert spans == ["w0 w1 w2 w3 w4 w5 ", "w6 w7 w8 w9"]
+
+    def test_consecutive_chunks_reproduce_the_file(self):
+        text = "def f(x):\n    return x + 1\n\nclass A:\n    pass\n"
+        chunks = split(text, "a.py", chunk_size=3, chunk_overlap=1)
+        assert merge_file_chunks(list(reversed(chunks)), overlap_words=1) == [text]
+
+    def test_assemble_context_groups_files_by_best_hit(self):
+        a = split("a0 a1 a2 a3 a4 a5", "a.py")
+        b = Document(text="readme text", meta_data={"file_path": "README.md"})
+
+        context = assemble_context([b, a[1], a[0]])
+
+        assert context == (
+            "\n\n" + "-" * 10
+            + "## File Path: README.md\n\nreadme text"
+            + "\n\n## File Path: a.py\n\na0 a1 a2 a3 a4 a5"
+        )
+
+    def test_empty(self):
+        assert assemble_context([]) == ""
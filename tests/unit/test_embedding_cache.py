@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed embedding cache.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.core.types import Document
+
+import api.embedding_cache as embedding_cache
+from api.embedding_cache import CachedEmbeddingProcessor, EmbeddingCache, get_embedder_namespace, hash_text
+
+
+class CountingEmbedder:
+    """Embedding transformer that records which texts it was asked to embed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, documents):
+        self.calls.append([doc.text for doc in documents])
+        return [Document(text=doc.text, id=doc.id, vector=[float(len(doc.text)), 1.0]) for doc in documents]
+
+
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache and CachedEmbeddingProcessor"""
+
+    def test_put_and_get(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+        cache.put_many("client:model:256", {hash_text("a"): [0.5, 0.25]})
+
+        assert cache.get_many("client:model:256", [hash_text("a"), hash_text("b")]) == {hash_text("a"): [0.5, 0.25]}
+        assert cache.get_many("client:other:256", [hash_text("a")]) == {}
+
+    def test_lru_eviction_by_size(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(embedding_cache, "ACCESS_TIME_RESOLUTION", 0)
+        # Each 64-dimensional float32 vector is 256 bytes; the budget fits two
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_size_mb=600 / (1024 * 1024))
+        cache.put_many("ns", {"a": [0.0] * 64})
+        cache.put_many("ns", {"b": [0.0] * 64})
+        cache.get_many("ns", ["a"])
+        cache.put_many("ns", {"c": [0.0] * 64})
+
+        assert set(cache.get_many("ns", ["a", "b", "c"])) == {"a", "c"}
+
+    def test_size_is_tracked_without_rescanning(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        cache = EmbeddingCache(path)
+        cache.put_many("ns", {"a": [0.0] * 64, "b": [0.0] * 64})
+        # Replacing a vector only counts the difference
+        cache.put_many("ns", {"a": [0.0] * 32})
+        assert cache._total_bytes == 384
+        cache.close()
+        reopened = EmbeddingCache(path)
+        reopened._connect()
+        assert reopened._total_bytes == 384
+
+    def test_recent_access_is_not_rewritten(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+        cache.put_many("ns", {"a": [1.0]})
+        conn = cache._connect()
+        conn.execute("UPDATE embeddings SET last_access = 0")
+        conn.commit()
+
+        cache.get_many("ns", ["a"])
+        refreshed = conn.execute("SELECT last_access FROM embeddings").fetchone()[0]
+        assert refreshed > 0
+        cache.get_many("ns", ["a"])
+        assert conn.execute("SELECT last_access FROM embeddings").fetchone()[0] == refreshed
+        # The insert, the manual reset and the one refresh
+        assert conn.total_changes == 3
+
+    def test_hits_skip_the_embedder(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(embedding_cache, "_embedding_cache", EmbeddingCache(str(tmp_path / "cache.sqlite3")))
+        embedder = CountingEmbedder()
+        processor = CachedEmbeddingProcessor(embedder, namespace="test")
+
+        first = processor([Document(text="alpha"), Document(text="beta")])
+        second = processor([Document(text="beta"), Document(text="gamma"), Document(text="alpha")])
+
+        assert embedder.calls == [["alpha", "beta"], ["gamma"]]
+        assert [doc.text for doc in second] == ["beta", "gamma", "alpha"]
+        assert second[0].vector == first[1].vector
+        assert second[2].vector == [5.0, 1.0]
+
+    def test_namespace_covers_encoding_options(self):
+        def namespace(**model_kwargs):
+            return get_embedder_namespace(SimpleNamespace(model_client=CountingEmbedder(), model_kwargs=model_kwargs))
+
+        base = namespace(model="text-embedding-004", task_type="SEMANTIC_SIMILARITY")
+        assert base == namespace(task_type="SEMANTIC_SIMILARITY", model="text-embedding-004")
+        assert base != namespace(model="text-embedding-004", task_type="RETRIEVAL_QUERY")
+        assert namespace(model="m", dimensions=256) != namespace(model="m", dimensions=512)
+        assert namespace(model="m", encoding_format="float") != namespace(model="m")
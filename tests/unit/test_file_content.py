@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for serving file content from the local clone and revalidating remote responses.
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import api.data_pipeline as data_pipeline
+from api.file_content import ConditionalHTTPClient, FileContentCache, resolve_repo_file
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        data = b"file content"
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestFileContent:
+    """Tests for local-first file content"""
+
+    def test_path_traversal_is_rejected(self, tmp_path):
+        repo = tmp_path / "repo"
+        (repo / "src").mkdir(parents=True)
+        (tmp_path / "secret.txt").write_text("secret")
+        os.symlink(tmp_path / "secret.txt", repo / "link.txt")
+
+        assert resolve_repo_file(str(repo), "/src/./main.py") == str(repo / "src" / "main.py")
+        for file_path in ("../secret.txt", "src/../../secret.txt", ".git/config", "link.txt", ""):
+            with pytest.raises(ValueError):
+                resolve_repo_file(str(repo), file_path)
+
+    def test_cache_revalidates_on_change(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("v1")
+        cache = FileContentCache(max_size_mb=1)
+
+        assert cache.read(str(path)) == "v1"
+        assert cache.read(str(path)) == "v1" and len(cache) == 1
+        path.write_text("v2 longer")
+        assert cache.read(str(path)) == "v2 longer"
+
+    def test_reads_local_clone_before_remote_api(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(data_pipeline, "get_adalflow_default_root_path", lambda: str(tmp_path))
+        clone = tmp_path / "repos" / "owner_repo"
+        clone.mkdir(parents=True)
+        (clone / "main.py").write_text("print('hi')")
+
+        def remote(*args):
+            raise AssertionError("remote API called")
+
+        monkeypatch.setattr(data_pipeline, "get_github_file_content", remote)
+        assert data_pipeline.get_file_content("https://github.com/owner/repo", "/main.py") == "print('hi')"
+        with pytest.raises(ValueError):
+            data_pipeline.get_file_content("https://github.com/owner/repo", "../repos/owner_repo/main.py")
+
+        # Files missing from the clone fall back to the API
+        monkeypatch.setattr(data_pipeline, "get_github_file_content", lambda url, path, token: f"remote {path}")
+        assert data_pipeline.get_file_content("https://github.com/owner/repo", "new.py") == "remote new.py"
+
+    def test_conditional_requests(self, etag_server):
+        client = ConditionalHTTPClient()
+        url = f"http://127.0.0.1:{etag_server.server_address[1]}/file"
+
+        first = client.get(url, headers={"Authorization": "token a"})
+        second = client.get(url, headers={"Authorization": "token a"})
+        other_token = client.get(url, headers={"Authorization": "token b"})
+
+        assert first.text == second.text == other_token.text == "file content"
+        assert second is first
+        assert etag_server.requests == [None, '"v1"', None]
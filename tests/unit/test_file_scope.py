@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for retrieval scoped to a requested file.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.core.types import Document
+
+from api.file_scope import extract_imports, file_scope_indices, rank_by_similarity, resolve_imports
+from api.index_store import write_index_store
+
+KNOWN_PATHS = frozenset({
+    "api/rag.py", "api/config.py", "api/tools/embedder.py", "api/__init__.py",
+    "src/components/Ask.tsx", "src/utils/format.ts", "src/utils/index.ts",
+})
+
+
+def make_chunk(file_path, text, vector):
+    return Document(text=text, meta_data={"file_path": file_path}, vector=vector)
+
+
+class TestFileScope:
+    """Tests for file-scoped candidate selection"""
+
+    def test_extract_imports(self):
+        python = "import os, json\nfrom api.config import configs\nfrom .tools.embedder import get_embedder\n"
+        assert extract_imports(python, "api/rag.py") == ["os", "json", "api.config", ".tools.embedder"]
+        typescript = "import React from 'react';\nimport { fmt } from '../utils/format';\nconst u = require(\"@/utils\");"
+        assert extract_imports(typescript, "src/components/Ask.tsx") == ["react", "../utils/format", "@/utils"]
+        assert extract_imports("import x", "README.md") == []
+
+    def test_resolve_imports(self):
+        assert resolve_imports(["os", "api.config", ".tools.embedder", "."], "api/rag.py", KNOWN_PATHS) == [
+            "api/config.py", "api/tools/embedder.py", "api/__init__.py"]
+        assert resolve_imports(["react", "../utils/format", "@/utils"], "src/components/Ask.tsx", KNOWN_PATHS) == [
+            "src/utils/format.ts", "src/utils/index.ts"]
+        assert resolve_imports(["api.config", ".tools.embedder"], "api/rag.py", KNOWN_PATHS, max_files=1) == [
+            "api/config.py"]
+
+    def test_scope_over_index_store(self, tmp_path):
+        chunks = [
+            make_chunk("api/config.py", "configs = {}", [1.0, 0.0]),
+            make_chunk("api/rag.py", "from api.config import configs\n", [0.0, 1.0]),
+            make_chunk("api/rag.py", "class RAG: pass", [0.6, 0.8]),
+            make_chunk("api/other.py", "unrelated", [1.0, 0.1]),
+        ]
+        store = write_index_store(str(tmp_path / "repo.db"), [], chunks)
+        documents = store.documents().with_valid_vectors()
+
+        indices, imported = file_scope_indices(documents, "/api/rag.py")
+        assert indices == [1, 2, 0] and imported == ["api/config.py"]
+        assert file_scope_indices(documents, "api/rag.py", include_imports=False) == ([1, 2], [])
+        assert file_scope_indices(documents, "missing.py") == ([], [])
+        # In-memory documents give the same candidates
+        assert file_scope_indices(list(documents), "api/rag.py") == (indices, imported)
+
+        ranked, scores = rank_by_similarity(documents, indices, [1.0, 0.0], top_k=2)
+        assert ranked == [0, 2]
+        assert scores[0] == 1.0
+
+    def test_own_chunks_are_fetched_in_one_batch(self, tmp_path, monkeypatch):
+        chunks = [make_chunk("api/rag.py", f"part {i}", [1.0, float(i)]) for i in range(50)]
+        store = write_index_store(str(tmp_path / "repo.db"), [], chunks)
+        documents = store.documents()
+        calls = []
+        get_documents = store.get_documents
+        monkeypatch.setattr(store, "get_documents", lambda positions: calls.append(len(positions))
+                            or get_documents(positions))
+
+        indices, _ = file_scope_indices(documents, "api/rag.py")
+        assert len(indices) == 50
+        assert calls == [50]
+
+    def test_scores_use_the_retriever_metric(self):
+        documents = [make_chunk("a.py", "a", [1.0, 0.0]), make_chunk("b.py", "b", [0.0, 1.0]),
+                     make_chunk("c.py", "c", [-1.0, 0.0])]
+        query = [2.0, 0.0]
+        assert rank_by_similarity(documents, [0, 1, 2], query, 3, metric="cosine") == ([0, 1, 2], [1.0, 0.0, -1.0])
+        assert rank_by_similarity(documents, [0, 1, 2], query, 3, metric="prob") == ([0, 1, 2], [1.0, 0.5, 0.0])
+        assert rank_by_similarity(documents, [0, 1, 2], query, 3, metric="euclidean") == ([0, 1, 2], [1.0, 5.0, 9.0])
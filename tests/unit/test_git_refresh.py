@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for refreshing cached clones and listing the files changed between commits.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.core.types import Document
+
+from api.data_pipeline import (DatabaseManager, get_changed_files, get_file_filter_settings, get_repo_head_commit,
+                               load_index_manifest, refresh_repo, save_index_manifest)
+
+
+def git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        check=True, capture_output=True, text=True
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    repo = tmp_path / "upstream"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    (repo / "keep.py").write_text("keep\n")
+    (repo / "change.py").write_text("v1\n")
+    (repo / "remove.md").write_text("bye\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "initial")
+    return repo
+
+
+class TestGitRefresh:
+    """Tests for refresh_repo and get_changed_files"""
+
+    def test_changed_files_between_commits(self, upstream):
+        old_commit = get_repo_head_commit(str(upstream))
+        (upstream / "change.py").write_text("v2\n")
+        (upstream / "remove.md").unlink()
+        (upstream / "new.py").write_text("new\n")
+        git(upstream, "add", "-A")
+        git(upstream, "commit", "-q", "-m", "update")
+
+        changes = get_changed_files(str(upstream), old_commit, get_repo_head_commit(str(upstream)))
+        assert changes == {"added": {"new.py"}, "modified": {"change.py"}, "deleted": {"remove.md"}}
+
+    def test_same_commit_has_no_changes(self, upstream):
+        commit = get_repo_head_commit(str(upstream))
+        assert get_changed_files(str(upstream), commit, commit) == {"added": set(), "modified": set(), "deleted": set()}
+
+    def test_unknown_commit_returns_none(self, upstream):
+        assert get_changed_files(str(upstream), "0" * 40, "HEAD") is None
+
+    def test_refresh_fetches_new_commit(self, upstream, tmp_path):
+        clone = tmp_path / "clone"
+        subprocess.run(["git", "clone", "-q", "--depth=1", upstream.as_uri(), str(clone)], check=True)
+        old_commit = get_repo_head_commit(str(clone))
+
+        (upstream / "change.py").write_text("v2\n")
+        git(upstream, "commit", "-q", "-am", "update")
+
+        new_commit = refresh_repo(upstream.as_uri(), str(clone))
+        assert new_commit == get_repo_head_commit(str(upstream))
+        assert (clone / "change.py").read_text() == "v2\n"
+        assert get_changed_files(str(clone), old_commit, new_commit)["modified"] == {"change.py"}
+
+
+class StoredSources:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def source_documents(self):
+        return self.documents
+
+
+def make_manager(repo: Path, db_path: Path, stored_paths, changed_files):
+    manager = DatabaseManager()
+    manager.repo_paths = {"save_repo_dir": str(repo), "save_db_file": str(db_path)}
+    manager.db = StoredSources([Document(text="stored", meta_data={"file_path": path}) for path in stored_paths])
+    manager.changed_files = changed_files
+    return manager
+
+
+class TestRefreshedDocuments:
+    """Tests for DatabaseManager._read_refreshed_documents and the index manifest"""
+
+    def test_changed_files_keep_their_read_order(self, tmp_path):
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        for name in ("a.py", "b.py", "c.py", "d.md"):
+            (repo / name).write_text(f"{name}\n")
+        db_path = tmp_path / "repo.db"
+        save_index_manifest(str(db_path), {"commit": "abc", "file_filters": get_file_filter_settings()})
+        changes = {"added": {"a.py"}, "modified": {"c.py"}, "deleted": {"old.py"}}
+        manager = make_manager(repo, db_path, ["b.py", "c.py", "old.py", "d.md"], changes)
+
+        documents = manager._read_refreshed_documents()
+
+        assert [doc.meta_data["file_path"] for doc in documents] == ["a.py", "b.py", "c.py", "d.md"]
+        assert [doc.text for doc in documents] == ["a.py\n", "stored", "c.py\n", "stored"]
+
+    def test_other_filters_read_every_file(self, tmp_path):
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        (repo / "a.py").write_text("a\n")
+        (repo / "docs").mkdir()
+        (repo / "docs" / "b.md").write_text("b\n")
+        db_path = tmp_path / "repo.db"
+        save_index_manifest(str(db_path), {"commit": "abc", "file_filters": get_file_filter_settings()})
+        changes = {"added": set(), "modified": set(), "deleted": set()}
+        manager = make_manager(repo, db_path, ["a.py", "docs/b.md"], changes)
+
+        documents = manager._read_refreshed_documents(excluded_dirs=["docs"])
+
+        assert [(doc.meta_data["file_path"], doc.text) for doc in documents] == [("a.py", "a\n")]
+
+    def test_manifest_is_not_written_when_the_build_fails(self, upstream, tmp_path, monkeypatch):
+        import api.data_pipeline as data_pipeline
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("embedding failed")
+
+        monkeypatch.setattr(data_pipeline, "stream_documents_to_db", fail)
+        db_path = tmp_path / "repo.db"
+        manager = DatabaseManager()
+        manager.repo_paths = {"save_repo_dir": str(upstream), "save_db_file": str(db_path),
+                              "legacy_db_file": str(tmp_path / "repo.pkl")}
+
+        with pytest.raises(RuntimeError):
+            manager.prepare_db_index()
+        assert load_index_manifest(str(db_path)) == {}
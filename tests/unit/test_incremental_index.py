@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental re-indexing by per-file content hash.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.core.types import Document
+
+import api.data_pipeline as data_pipeline
+from api.data_pipeline import compute_content_hash, diff_documents, update_documents_in_db
+from api.index_store import write_index_store
+
+
+def make_source(file_path: str, content: str) -> Document:
+    return Document(text=content, meta_data={"file_path": file_path, "content_hash": compute_content_hash(content)})
+
+
+class FakeTransformer:
+    """Splits each document into one chunk with a fixed embedding and records what it saw."""
+
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, documents):
+        self.seen.extend(doc.meta_data["file_path"] for doc in documents)
+        return [Document(text=doc.text, meta_data=dict(doc.meta_data), vector=[1.0, 0.0, 0.0]) for doc in documents]
+
+
+class TestIncrementalIndex:
+    """Tests for diff_documents and update_documents_in_db"""
+
+    def test_diff_documents(self):
+        old = [make_source("a.py", "a"), make_source("b.py", "b"), make_source("c.py", "c")]
+        new = [make_source("a.py", "a"), make_source("b.py", "b2"), make_source("d.py", "d")]
+
+        changes = diff_documents(old, new)
+        assert changes["unchanged"] == {"a.py"}
+        assert changes["modified"] == {"b.py"}
+        assert changes["added"] == {"d.py"}
+        assert changes["deleted"] == {"c.py"}
+
+    def test_missing_hash_counts_as_modified(self):
+        old = [Document(text="a", meta_data={"file_path": "a.py"})]
+        assert diff_documents(old, [make_source("a.py", "a")])["modified"] == {"a.py"}
+
+    def test_only_changed_files_are_embedded(self, tmp_path, monkeypatch):
+        transformer = FakeTransformer()
+        monkeypatch.setattr(data_pipeline, "prepare_data_pipeline", lambda embedder_type=None: transformer)
+
+        old_sources = [make_source("a.py", "a"), make_source("b.py", "b"), make_source("c.py", "c")]
+        db_path = tmp_path / "repo.db"
+        store = write_index_store(str(db_path), old_sources, FakeTransformer()(old_sources))
+        old_mtime = db_path.stat().st_mtime_ns
+
+        new_sources = [make_source("a.py", "a"), make_source("b.py", "b2"), make_source("d.py", "d")]
+        store = update_documents_in_db(store, new_sources, str(db_path))
+
+        assert sorted(transformer.seen) == ["b.py", "d.py"]
+        chunks = list(store.documents())
+        assert [chunk.meta_data["file_path"] for chunk in chunks] == ["a.py", "b.py", "d.py"]
+        assert chunks[1].text == "b2"
+        assert [doc.meta_data["file_path"] for doc in store.source_documents()] == ["a.py", "b.py", "d.py"]
+        assert db_path.stat().st_mtime_ns != old_mtime
+        assert (tmp_path / "repo.faiss").exists()
+
+    def test_unchanged_repository_is_not_saved(self, tmp_path, monkeypatch):
+        transformer = FakeTransformer()
+        monkeypatch.setattr(data_pipeline, "prepare_data_pipeline", lambda embedder_type=None: transformer)
+
+        sources = [make_source("a.py", "a")]
+        db_path = tmp_path / "repo.db"
+        store = write_index_store(str(db_path), sources, FakeTransformer()(sources))
+        old_mtime = db_path.stat().st_mtime_ns
+
+        assert update_documents_in_db(store, [make_source("a.py", "a")], str(db_path)) is store
+        assert transformer.seen == []
+        assert db_path.stat().st_mtime_ns == old_mtime
+
+    def test_unchanged_chunks_are_copied_at_store_level(self, tmp_path, monkeypatch):
+        transformer = FakeTransformer()
+        monkeypatch.setattr(data_pipeline, "prepare_data_pipeline", lambda embedder_type=None: transformer)
+
+        old_sources = [make_source(f"f{i}.py", f"def f{i}(): pass") for i in range(4)]
+        old_chunks = [Document(text=doc.text, meta_data=dict(doc.meta_data), vector=[float(i), 1.0, 0.0])
+                      for i, doc in enumerate(old_sources)]
+        old_chunks.append(Document(text="no vector", meta_data={"file_path": "f3.py"}, vector=[]))
+        db_path = tmp_path / "repo.db"
+        store = write_index_store(str(db_path), old_sources, old_chunks)
+        monkeypatch.setattr(type(store), "iter_chunks", lambda self: 1 / 0)
+        monkeypatch.setattr(type(store), "get_documents", lambda self, positions: 1 / 0)
+
+        new_sources = [old_sources[0], make_source("new.py", "new"), old_sources[2], old_sources[3]]
+        store = update_documents_in_db(store, new_sources, str(db_path))
+        monkeypatch.undo()
+
+        assert transformer.seen == ["new.py"]
+        chunks = list(store.documents())
+        assert [chunk.meta_data["file_path"] for chunk in chunks] == ["f0.py", "new.py", "f2.py", "f3.py", "f3.py"]
+        assert [chunk.vector for chunk in chunks] == [[0.0, 1.0, 0.0], [1.0, 0.0, 0.0], [2.0, 1.0, 0.0],
+                                                      [3.0, 1.0, 0.0], []]
+        assert store.num_valid == 4
+        # Copied chunks stay searchable by keyword
+        assert store.search_terms('"f2"', 5) == [2]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite + memory-mapped vectors index store.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.core.db import LocalDB
+from adalflow.core.types import Document
+
+from api.index_store import IndexStore, StoredDocuments, migrate_pickle_database, write_index_store
+from api.vector_index import filter_valid_embeddings, get_vector_matrix
+
+
+def make_chunks(vectors):
+    return [
+        Document(text=f"chunk {i}", meta_data={"file_path": f"f{i}.py", "is_code": True}, vector=vector)
+        for i, vector in enumerate(vectors)
+    ]
+
+
+class TestIndexStore:
+    """Tests for writing, reading and migrating index stores"""
+
+    def test_round_trip(self, tmp_path):
+        sources = [Document(text="source", meta_data={"file_path": "f0.py", "content_hash": "abc"})]
+        chunks = make_chunks([[0.5, 1.0, 2.0], [3.0, 4.0, 5.0]])
+
+        write_index_store(str(tmp_path / "repo.db"), sources, chunks, vector_dtype="float32")
+        store = IndexStore(str(tmp_path / "repo.db"))
+
+        assert len(store) == 2 and store.dimension == 3
+        assert isinstance(store.vectors, np.memmap)
+        doc = store.documents()[1]
+        assert doc.text == "chunk 1"
+        assert doc.meta_data == {"file_path": "f1.py", "is_code": True}
+        assert doc.vector == [3.0, 4.0, 5.0]
+        assert doc.id == chunks[1].id
+        assert store.source_documents()[0].meta_data["content_hash"] == "abc"
+
+    def test_float16_vectors(self, tmp_path):
+        store = write_index_store(str(tmp_path / "repo.db"), [], make_chunks([[0.1, 0.2], [0.3, 0.4]]),
+                                  vector_dtype="float16")
+        assert (tmp_path / "repo.db").stat().st_size > 0
+        assert store.vectors.dtype == np.float16
+        np.testing.assert_allclose(store.get_vectors(), [[0.1, 0.2], [0.3, 0.4]], atol=1e-3)
+
+    def test_invalid_vectors_are_masked(self, tmp_path):
+        chunks = make_chunks([[], [1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0]])
+        store = write_index_store(str(tmp_path / "repo.db"), [], chunks)
+
+        documents = store.documents()
+        assert isinstance(documents, StoredDocuments)
+        valid = filter_valid_embeddings(documents)
+        assert [doc.text for doc in valid] == ["chunk 1", "chunk 3"]
+        np.testing.assert_array_equal(get_vector_matrix(valid), [[1.0, 0.0], [0.0, 1.0]])
+
+    def test_validation_is_persisted(self, tmp_path, monkeypatch):
+        chunks = make_chunks([[1.0, 0.0], [0.0, 0.0], [float("inf"), 1.0], [0.0, 1.0]])
+        store = write_index_store(str(tmp_path / "repo.db"), [], chunks)
+        assert store.num_valid == 2
+        np.testing.assert_array_equal(store.valid_positions(), [0, 3])
+
+        # A store whose chunks are all valid is returned as is, without querying
+        store = write_index_store(str(tmp_path / "repo.db"), [], make_chunks([[1.0, 0.0], [0.0, 1.0]]))
+        documents = store.documents()
+        monkeypatch.setattr(store, "_query", None)
+        assert filter_valid_embeddings(documents) is documents
+
+    def test_rewrite_keeps_open_readers_consistent(self, tmp_path):
+        path = str(tmp_path / "repo.db")
+        old_store = write_index_store(path, [], make_chunks([[1.0, 0.0]]))
+        new_store = write_index_store(path, [], make_chunks([[0.0, 1.0], [1.0, 1.0]]))
+
+        assert len(list(tmp_path.glob("repo.*.vectors"))) == 1
+        assert old_store.documents()[0].vector == [1.0, 0.0]
+        assert len(new_store) == 2
+        assert IndexStore(path).documents()[0].vector == [0.0, 1.0]
+
+    def test_rewrite_keeps_other_repositories_vectors(self, tmp_path):
+        # owner_next.db's stem is a dotted prefix of owner_next.js.db's
+        other_path = str(tmp_path / "owner_next.js.db")
+        write_index_store(other_path, [], make_chunks([[1.0, 0.0]]))
+        write_index_store(str(tmp_path / "owner_next.db"), [], make_chunks([[0.0, 1.0]]))
+        write_index_store(str(tmp_path / "owner_next.db"), [], make_chunks([[1.0, 1.0]]))
+
+        assert len(list(tmp_path.glob("owner_next.js.*.vectors"))) == 1
+        assert IndexStore(other_path).documents()[0].vector == [1.0, 0.0]
+
+    def test_truncated_vectors_file_is_rejected(self, tmp_path):
+        path = str(tmp_path / "repo.db")
+        store = write_index_store(path, [], make_chunks([[1.0, 0.0], [0.0, 1.0]]))
+        with open(store.vectors_path, "r+b") as f:
+            f.truncate(4)
+        with pytest.raises(ValueError):
+            IndexStore(path)
+
+    def test_migrate_pickle_database(self, tmp_path):
+        sources = [Document(text="source", meta_data={"file_path": "f0.py"})]
+        db = LocalDB()
+        db.load(sources)
+        db.transformed_items["split_and_embed"] = make_chunks([[1.0, 2.0], [3.0, 4.0]])
+        pickle_path = tmp_path / "repo.pkl"
+        db.save_state(filepath=str(pickle_path))
+
+        store = migrate_pickle_database(str(pickle_path), str(tmp_path / "repo.db"))
+
+        assert not pickle_path.exists()
+        assert (tmp_path / "repo.pkl.migrated").exists()
+        assert [doc.vector for doc in store.documents()] == [[1.0, 2.0], [3.0, 4.0]]
+        assert store.source_documents()[0].meta_data == {"file_path": "f0.py"}
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for batched Ollama embedding against a local fake Ollama server.
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import adalflow as adal
+from adalflow import OllamaClient
+from adalflow.core.types import Document
+
+from api.ollama_patch import OllamaDocumentProcessor, get_ollama_host
+
+
+def fake_embedding(text):
+    # Texts starting with "wide" get a different embedding size
+    return [float(len(text)), 1.0, 0.0] if text.startswith("wide") else [float(len(text)), 1.0]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, body))
+
+        if self.path == "/api/embed" and self.server.supports_embed:
+            if any(text == "fail" for text in body["input"]):
+                return self._respond(500, {"error": "input too long"})
+            return self._respond(200, {"embeddings": [fake_embedding(text) for text in body["input"]]})
+        if self.path == "/api/embeddings":
+            return self._respond(200, {"embedding": fake_embedding(body["prompt"])})
+        self._respond(404, {"error": "not found"})
+
+    def _respond(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    server.requests = []
+    server.supports_embed = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_processor(server, batch_size=3):
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    embedder = adal.Embedder(model_client=OllamaClient(host=host), model_kwargs={"model": "nomic-embed-text"})
+    return OllamaDocumentProcessor(embedder=embedder, batch_size=batch_size, concurrency=2, ollama_host=host)
+
+
+class TestOllamaDocumentProcessor:
+    """Tests for OllamaDocumentProcessor"""
+
+    def test_uses_batch_endpoint_and_keeps_order(self, ollama_server):
+        documents = [Document(text="x" * (i + 1)) for i in range(7)]
+
+        output = make_processor(ollama_server)(documents)
+
+        assert [doc.vector[0] for doc in output] == [float(i + 1) for i in range(7)]
+        assert {path for path, _ in ollama_server.requests} == {"/api/embed"}
+        assert len(ollama_server.requests) == 3
+        assert all(not doc.vector for doc in documents)
+
+    def test_falls_back_to_single_input_endpoint(self, ollama_server):
+        ollama_server.supports_embed = False
+
+        output = make_processor(ollama_server)([Document(text="a"), Document(text="bb")])
+
+        assert [doc.vector for doc in output] == [[1.0, 1.0], [2.0, 1.0]]
+        assert ("/api/embeddings", {"model": "nomic-embed-text", "prompt": "bb"}) in ollama_server.requests
+
+    def test_skips_failed_and_inconsistent_documents(self, ollama_server):
+        documents = [Document(text="ok"), Document(text="fail"), Document(text="wide"), Document(text="fine")]
+
+        output = make_processor(ollama_server, batch_size=4)(documents)
+
+        assert [doc.text for doc in output] == ["ok", "fine"]
+
+    def test_host_comes_from_configuration(self, ollama_server, monkeypatch):
+        monkeypatch.setenv("OLLAMA_HOST", f"http://127.0.0.1:{ollama_server.server_address[1]}")
+        embedder = adal.Embedder(model_client=OllamaClient(host="http://unused:1"),
+                                 model_kwargs={"model": "nomic-embed-text"})
+
+        output = OllamaDocumentProcessor(embedder=embedder, batch_size=2)([Document(text="a")])
+
+        assert [doc.vector for doc in output] == [[1.0, 1.0]]
+        assert get_ollama_host({"initialize_kwargs": {"host": "http://ollama:11434"}}) == "http://ollama:11434"
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for token-budgeted prompt construction.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.core.types import Document
+
+import api.prompt_builder as prompt_builder
+from api.prompt_builder import build_chat_prompt, count_prompt_tokens, get_context_window, get_prompt_budget
+
+
+@pytest.fixture
+def small_model(monkeypatch):
+    """A provider whose model has a 1000 token context window and a 400 token prompt budget."""
+    providers = {
+        "tiny": {
+            "default_model": "tiny-1",
+            "model_client": object,
+            "context_windows": {"tiny-1": 1000},
+            "models": {"tiny-1": {"temperature": 0.0}, "tiny-2": {"options": {"num_ctx": 2000}}},
+        }
+    }
+    monkeypatch.setitem(prompt_builder.configs, "providers", providers)
+    monkeypatch.setitem(prompt_builder.configs, "prompt_budget", {"output_reserve_tokens": 500, "safety_margin": 0.1})
+
+
+def words(n: int, word: str = "token") -> str:
+    return " ".join([word] * n)
+
+
+class TestPromptBuilder:
+    """Tests for build_chat_prompt"""
+
+    def test_context_window_lookup(self, small_model):
+        assert get_context_window("tiny") == 1000
+        assert get_context_window("tiny", "tiny-2") == 2000
+        assert get_context_window("unknown") == prompt_builder.DEFAULT_CONTEXT_WINDOW
+        # Output reserve is capped at a quarter of the window
+        assert get_prompt_budget("tiny") == 1000 - 250 - 100
+
+    def test_prompt_layout(self, small_model):
+        doc = Document(text="def f(): pass", meta_data={"file_path": "m.py"})
+        prompt = build_chat_prompt("SYSTEM", "what is f?", "tiny", conversation_turns=[("hi", "hello")],
+                                   file_path="m.py", file_content="FILE", documents=[doc])
+
+        assert prompt == (
+            "/no_think SYSTEM\n\n"
+            "<conversation_history>\n<turn>\n<user>hi</user>\n<assistant>hello</assistant>\n</turn>\n"
+            "</conversation_history>\n\n"
+            "<currentFileContent path=\"m.py\">\nFILE\n</currentFileContent>\n\n"
+            "<START_OF_CONTEXT>\n\n\n----------## File Path: m.py\n\ndef f(): pass\n<END_OF_CONTEXT>\n\n"
+            "<query>\nwhat is f?\n</query>\n\nAssistant: "
+        )
+
+    def test_packs_ranked_documents_within_budget(self, small_model):
+        documents = [
+            Document(text=words(200, "first"), meta_data={"file_path": "a.py"}),
+            Document(text=words(450, "second"), meta_data={"file_path": "b.py"}),
+            Document(text=words(100, "third"), meta_data={"file_path": "c.py"}),
+        ]
+        prompt = build_chat_prompt("SYSTEM", "query", "tiny", documents=documents)
+
+        assert "first" in prompt and "third" in prompt and "second" not in prompt
+        assert count_prompt_tokens(prompt) <= get_prompt_budget("tiny")
+
+    def test_drops_oldest_turns_and_truncates_file(self, small_model):
+        turns = [(words(100, f"old{i}"), "answer") for i in range(5)]
+        documents = [Document(text=words(20, "retrieved"), meta_data={"file_path": "a.py"})]
+        prompt = build_chat_prompt("SYSTEM", "query", "tiny", conversation_turns=turns,
+                                   file_path="big.py", file_content=words(2000, "code"), documents=documents)
+
+        # The file is cut to half the budget, leaving room for history and documents
+        assert prompt_builder.TRUNCATION_NOTE in prompt
+        assert prompt.count("code") <= get_prompt_budget("tiny") // 2
+        assert "old4" in prompt and "old0" not in prompt
+        assert "retrieved" in prompt
+        assert count_prompt_tokens(prompt) <= get_prompt_budget("tiny")
+
+        # Without the file, the newest turns are kept
+        prompt = build_chat_prompt("SYSTEM", "query", "tiny", conversation_turns=turns)
+        assert "old4" in prompt and "old3" in prompt and "old0" not in prompt
+        assert "<note>Answering without retrieval augmentation.</note>" in prompt
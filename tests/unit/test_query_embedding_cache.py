@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory query embedding cache.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.query_embedding_cache import QueryEmbeddingCache
+
+
+class TestQueryEmbeddingCache:
+    """Tests for QueryEmbeddingCache"""
+
+    def test_hits_normalized_queries_per_namespace(self):
+        cache = QueryEmbeddingCache(max_entries=10)
+        calls = []
+
+        def compute(query):
+            calls.append(query)
+            return [float(len(query)), 1.0]
+
+        first = cache.get_or_compute("openai:small", "Contexts related to  a.py\n", compute)
+        again = cache.get_or_compute("openai:small", "Contexts related to a.py", compute)
+        other = cache.get_or_compute("ollama:nomic", "Contexts related to a.py", compute)
+
+        # Only the key is normalized; the embedder gets the query as sent
+        assert calls == ["Contexts related to  a.py\n", "Contexts related to a.py"]
+        assert again is first and other is not first
+        assert first.tolist() == [26.0, 1.0] and not first.flags.writeable
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = QueryEmbeddingCache(max_entries=2)
+        for query in ("a", "b", "a", "c"):
+            cache.get_or_compute("ns", query, lambda q: [1.0])
+        assert len(cache) == 2
+        assert cache.get("ns", "a") is not None and cache.get("ns", "b") is None
+
+    def test_concurrent_requests_share_one_call(self):
+        cache = QueryEmbeddingCache()
+        calls = []
+        release = threading.Event()
+
+        def compute(query):
+            calls.append(query)
+            release.wait(5)
+            return [1.0, 2.0]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(cache.get_or_compute, "ns", "query", compute) for _ in range(8)]
+            time.sleep(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_failures_are_shared_but_not_cached(self):
+        cache = QueryEmbeddingCache()
+
+        def fail(query):
+            raise ValueError("provider down")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("ns", "query", fail)
+        assert cache.get_or_compute("ns", "query", lambda q: [3.0]).tolist() == [3.0]
+
+    def test_disabled(self):
+        cache = QueryEmbeddingCache(enabled=False)
+        cache.get_or_compute("ns", "query", lambda q: [1.0])
+        assert len(cache) == 0
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for scanning and reading repository files.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.data_pipeline import ordered_parallel_map, scan_repository_files
+from api.file_filters import FileFilter, normalize_path_entry
+
+
+def touch(path: Path, content: str = "x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+class TestScanRepositoryFiles:
+    """Tests for scan_repository_files"""
+
+    def test_groups_files_by_extension(self, tmp_path):
+        touch(tmp_path / "b.py")
+        touch(tmp_path / "pkg" / "a.py")
+        touch(tmp_path / "README.md")
+        touch(tmp_path / "image.png")
+
+        files = scan_repository_files(str(tmp_path), [".py", ".md"])
+        assert files[".py"] == sorted([str(tmp_path / "b.py"), str(tmp_path / "pkg" / "a.py")])
+        assert files[".md"] == [str(tmp_path / "README.md")]
+
+    def test_prunes_excluded_and_hidden_directories(self, tmp_path):
+        touch(tmp_path / "src" / "main.js")
+        touch(tmp_path / "node_modules" / "dep" / "index.js")
+        touch(tmp_path / ".cache" / "cached.js")
+        touch(tmp_path / ".hidden.js")
+
+        files = scan_repository_files(str(tmp_path), [".js"], FileFilter(excluded_dirs=["./node_modules/"]))
+        assert files[".js"] == [str(tmp_path / "src" / "main.js")]
+
+
+class TestFileFilter:
+    """Tests for FileFilter"""
+
+    def test_normalize_path_entry(self):
+        assert normalize_path_entry("./.venv/") == ".venv"
+        assert normalize_path_entry("./docs/") == "docs"
+        assert normalize_path_entry("src\\api\\") == "src/api"
+
+    def test_excluded_dirs(self):
+        file_filter = FileFilter(excluded_dirs=["./.venv/", "./node_modules/", "packages/legacy"])
+        assert not file_filter.matches(".venv/lib/site.py")
+        assert not file_filter.matches("web/node_modules/dep/index.js")
+        assert not file_filter.matches("packages/legacy/main.py")
+        assert file_filter.matches("packages/current/main.py")
+        assert not file_filter.should_descend("web/node_modules")
+        assert file_filter.should_descend("web/src")
+
+    def test_excluded_file_globs(self):
+        file_filter = FileFilter(excluded_files=["*.lnk", ".env.*", "*.min.js", "yarn.lock", "packages/*/dist"])
+        assert not file_filter.matches("shortcut.lnk")
+        assert not file_filter.matches("config/.env.local")
+        assert not file_filter.matches("static/app.min.js")
+        assert not file_filter.matches("yarn.lock")
+        assert not file_filter.matches("packages/app/dist/index.js")
+        assert file_filter.matches("static/app.js")
+        assert file_filter.matches("packages/app/src/index.js")
+
+    def test_inclusion_mode(self):
+        file_filter = FileFilter(included_dirs=["./api/"], included_files=["README.md", "*.toml"])
+        assert file_filter.use_inclusion
+        assert file_filter.matches("api/rag.py")
+        assert file_filter.matches("docs/README.md")
+        assert file_filter.matches("pyproject.toml")
+        assert not file_filter.matches("src/main.py")
+        assert file_filter.should_descend("node_modules")
+
+
+class TestOrderedParallelMap:
+    """Tests for ordered_parallel_map"""
+
+    def test_preserves_input_order(self):
+        def slow_square(value):
+            # Later items finish first
+            time.sleep(0.001 * (20 - value))
+            return value * value
+
+        assert list(ordered_parallel_map(slow_square, list(range(20)), max_workers=4)) == [v * v for v in range(20)]
+
+    def test_bounds_items_in_flight(self):
+        lock = threading.Lock()
+        started = []
+
+        def record(value):
+            with lock:
+                started.append(value)
+            return value
+
+        results = ordered_parallel_map(record, list(range(100)), max_workers=2, max_in_flight=4)
+        first = next(results)
+        time.sleep(0.05)
+        assert first == 0
+        # Only the first window (plus the refill after consuming one result) was submitted
+        assert len(started) <= 5
+        assert list(results) == list(range(1, 100))
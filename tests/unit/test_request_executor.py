@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for running blocking request stages off the event loop.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.request_executor import SingleFlight, run_blocking
+
+
+class TestRequestExecutor:
+    """Tests for run_blocking and SingleFlight"""
+
+    def test_run_blocking_keeps_loop_responsive(self):
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def handler():
+            started = time.monotonic()
+            result, _ = await asyncio.gather(run_blocking(lambda x: time.sleep(0.2) or x * 2, 21), ticker())
+            return started, result
+
+        started, result = asyncio.run(handler())
+        assert result == 42
+        # The ticker ran while the blocking call slept
+        assert ticks[-1] - started < 0.15
+
+    def test_concurrent_calls_share_one_run(self):
+        flight = SingleFlight(ThreadPoolExecutor(max_workers=4))
+        calls = []
+        release = threading.Event()
+
+        def build(name):
+            calls.append(name)
+            release.wait(5)
+            return f"built {name}"
+
+        async def handler():
+            runs = [asyncio.ensure_future(flight.run("repo", build, "repo")) for _ in range(5)]
+            other = asyncio.ensure_future(flight.run("other", build, "other"))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*runs), await other
+
+        results, other = asyncio.run(handler())
+        assert sorted(calls) == ["other", "repo"]
+        assert [result for result, _ in results] == ["built repo"] * 5
+        assert [owner for _, owner in results].count(True) == 1
+        assert other == ("built other", True)
+        assert len(flight) == 0
+
+    def test_failures_propagate_and_are_not_cached(self):
+        flight = SingleFlight(ThreadPoolExecutor(max_workers=2))
+        attempts = []
+
+        def build():
+            attempts.append(1)
+            time.sleep(0.05)
+            if len(attempts) == 1:
+                raise ValueError("clone failed")
+            return "ok"
+
+        async def handler():
+            outcomes = await asyncio.gather(flight.run("repo", build), flight.run("repo", build),
+                                            return_exceptions=True)
+            return outcomes, await flight.run("repo", build)
+
+        outcomes, retried = asyncio.run(handler())
+        assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+        assert retried == ("ok", True)
+        assert len(attempts) == 2
+
+    def test_cancelled_waiter_does_not_cancel_run(self):
+        flight = SingleFlight(ThreadPoolExecutor(max_workers=2))
+
+        async def handler():
+            owner = asyncio.ensure_future(flight.run("repo", time.sleep, 0.1))
+            waiter = asyncio.ensure_future(flight.run("repo", time.sleep, 0.1))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            return await owner
+
+        assert asyncio.run(handler()) == (None, True)
+
+
+class TestSharedPreparation:
+    """Tests for RAG.prepare_retriever_async"""
+
+    @staticmethod
+    def make_rag(builds):
+        from api.rag import RAG
+
+        rag = RAG.__new__(RAG)
+        rag.embedder_type = "openai"
+
+        def prepare_retriever(repo_url_or_path, type="github", access_token=None, excluded_dirs=None,
+                              excluded_files=None, included_dirs=None, included_files=None, refresh=False):
+            time.sleep(0.1)
+            builds.append((excluded_dirs, refresh))
+            rag.transformed_docs = [f"docs for {excluded_dirs}"]
+            rag.retriever = f"retriever for {excluded_dirs}"
+
+        rag.prepare_retriever = prepare_retriever
+        return rag
+
+    def test_concurrent_requests_share_one_build(self):
+        builds = []
+        rags = [self.make_rag(builds) for _ in range(5)]
+
+        async def handler():
+            await asyncio.gather(*(rag.prepare_retriever_async("https://github.com/o/r", refresh=True)
+                                   for rag in rags))
+
+        asyncio.run(handler())
+        assert builds == [(None, True)]
+        assert all(rag.retriever == "retriever for None" for rag in rags)
+
+    def test_other_filters_prepare_once_more(self):
+        builds = []
+        owner, other = self.make_rag(builds), self.make_rag(builds)
+
+        async def handler():
+            await asyncio.gather(owner.prepare_retriever_async("https://github.com/o/r"),
+                                 other.prepare_retriever_async("https://github.com/o/r", excluded_dirs=["docs"]))
+
+        asyncio.run(handler())
+        assert sorted(builds, key=str) == [(None, False), (["docs"], False)]
+        assert other.retriever == "retriever for ['docs']"
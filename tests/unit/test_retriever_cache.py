@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the process-wide retriever cache.
+"""
+
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.retriever_cache import RetrieverCache
+
+
+def make_documents(count: int, text_size: int = 100):
+    return [SimpleNamespace(text="x" * text_size, vector=[0.0] * 4) for _ in range(count)]
+
+
+class TestRetrieverCache:
+    """Tests for RetrieverCache"""
+
+    def test_hit_after_put(self, tmp_path):
+        db_file = tmp_path / "repo.pkl"
+        db_file.write_bytes(b"db")
+        cache = RetrieverCache(max_memory_mb=1)
+        key = cache.make_key("https://github.com/owner/repo", "github", "openai", "text-embedding-3-small")
+
+        assert cache.get(key) is None
+        documents = make_documents(3)
+        cache.put(key, documents, retriever="retriever", db_file=str(db_file))
+
+        entry = cache.get(key)
+        assert entry is not None
+        assert entry.documents is documents
+        assert entry.retriever == "retriever"
+
+    def test_filters_are_part_of_key(self):
+        key_a = RetrieverCache.make_key("repo", "github", "openai", None, excluded_dirs=["a", "b"])
+        key_b = RetrieverCache.make_key("repo", "github", "openai", None, excluded_dirs=["b", "a"])
+        key_c = RetrieverCache.make_key("repo", "github", "openai", None, excluded_dirs=["c"])
+        assert key_a == key_b
+        assert key_a != key_c
+
+    def test_invalidated_when_database_changes(self, tmp_path):
+        db_file = tmp_path / "repo.pkl"
+        db_file.write_bytes(b"db")
+        cache = RetrieverCache(max_memory_mb=1)
+        key = cache.make_key("repo", "github", "openai")
+        cache.put(key, make_documents(1), retriever="retriever", db_file=str(db_file))
+
+        stat = db_file.stat()
+        os.utime(db_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert cache.get(key) is None
+        assert len(cache) == 0
+
+    def test_lru_eviction_under_budget(self, tmp_path):
+        db_file = tmp_path / "repo.pkl"
+        db_file.write_bytes(b"db")
+        # Each entry is ~400 KB of text, so only two fit in 1 MB
+        cache = RetrieverCache(max_memory_mb=1)
+        keys = [cache.make_key(f"repo{i}", "github", "openai") for i in range(3)]
+
+        cache.put(keys[0], make_documents(4, 100_000), retriever=None, db_file=str(db_file))
+        cache.put(keys[1], make_documents(4, 100_000), retriever=None, db_file=str(db_file))
+        # Touch the first entry so the second becomes least recently used
+        assert cache.get(keys[0]) is not None
+        cache.put(keys[2], make_documents(4, 100_000), retriever=None, db_file=str(db_file))
+
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
+        assert cache.total_bytes <= cache.max_bytes
+
+    def test_oversized_entry_not_cached(self, tmp_path):
+        db_file = tmp_path / "repo.pkl"
+        db_file.write_bytes(b"db")
+        cache = RetrieverCache(max_memory_mb=0.001)
+        key = cache.make_key("repo", "github", "openai")
+
+        assert cache.put(key, make_documents(10, 1000), retriever=None, db_file=str(db_file)) is None
+        assert cache.get(key) is None
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for keyword search and reciprocal rank fusion.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.core.types import Document
+
+from api.index_store import write_index_store
+from api.sparse_index import build_match_query, reciprocal_rank_fusion, sparse_search, tokenize_code
+
+
+def make_chunks(texts):
+    return [
+        Document(text=text, meta_data={"file_path": f"mod{i}.py"}, vector=[float(i + 1), 1.0])
+        for i, text in enumerate(texts)
+    ]
+
+
+class TestSparseIndex:
+    """Tests for the code-aware inverted index"""
+
+    def test_tokenize_code(self):
+        assert tokenize_code("prepare_db_index(repo)") == ["prepare_db_index", "prepare", "db", "index", "repo"]
+        assert tokenize_code("HTTPServer.getRepoURL") == ["httpserver", "http", "server", "getrepourl", "get",
+                                                        "repo", "url"]
+        # Stop words and single characters are dropped
+        assert tokenize_code("where is x called") == ["called"]
+        assert build_match_query("where is prepare_db_index called?") == (
+            '"prepare_db_index" OR "prepare" OR "db" OR "index" OR "called"')
+        assert build_match_query("what is it?") == ""
+
+    def test_reciprocal_rank_fusion(self):
+        fused = reciprocal_rank_fusion([[1, 2, 3], [3, 4]], rrf_k=60)
+        assert [item for item, _ in fused] == [3, 1, 2, 4]
+        assert fused[0][1] == 1 / 63 + 1 / 61
+
+    def test_exact_symbol_ranks_first(self, tmp_path):
+        chunks = make_chunks([
+            "def prepare_retriever(self):\n    index the database",
+            "manager.prepare_db_index(embedder_type)",
+            "def prepare(self): pass\n# db index notes",
+            "unrelated text",
+        ])
+        chunks[3].vector = []
+        store = write_index_store(str(tmp_path / "repo.db"), [], chunks)
+        assert store.has_terms
+
+        documents = store.documents().with_valid_vectors()
+        assert sparse_search(documents, "where is prepare_db_index called", top_k=2) == [1, 2]
+        # Searching by file path
+        assert sparse_search(documents, "mod2.py", top_k=5)[0] == 2
+        assert sparse_search(documents, "unrelated", top_k=5) == []
+        assert sparse_search(list(documents), "prepare_db_index", top_k=5) == []
+
+    def test_indices_of_unsorted_positions(self, tmp_path):
+        store = write_index_store(str(tmp_path / "repo.db"), [], make_chunks(["a1", "b2", "c3", "d4"]))
+        documents = store.documents(positions=store.valid_positions()[[3, 0, 2]])
+        assert documents.indices_of([0, 1, 2, 3]).tolist() == [1, -1, 2, 0]
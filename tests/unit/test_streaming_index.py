@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming, checkpointed index build.
+"""
+
+import sys
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from adalflow.core.types import Document
+
+import api.data_pipeline as data_pipeline
+from api.data_pipeline import compute_content_hash, prefetch, stream_documents_to_db
+
+
+def make_source(file_path: str, content: str) -> Document:
+    return Document(text=content, meta_data={"file_path": file_path, "content_hash": compute_content_hash(content)})
+
+
+class FakeEmbedder:
+    """Embeds chunks with a fixed vector, failing once `fail_after` batches were embedded."""
+
+    def __init__(self, fail_after: int = None):
+        self.batches = []
+        self.fail_after = fail_after
+
+    def __call__(self, chunks):
+        if self.fail_after is not None and len(self.batches) >= self.fail_after:
+            raise RuntimeError("embedding provider unavailable")
+        self.batches.append(sorted({chunk.meta_data["file_path"] for chunk in chunks}))
+        return [replace(chunk, vector=[1.0, 0.0]) for chunk in chunks]
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setitem(data_pipeline.configs, "indexing", {"stream_batch_chunks": 1, "stream_queue_size": 2})
+    monkeypatch.setattr(data_pipeline, "STREAM_SPLIT_BATCH_SIZE", 1)
+
+
+class TestPrefetch:
+    """Tests for prefetch"""
+
+    def test_preserves_order_and_bounds_read_ahead(self):
+        produced = []
+
+        def numbers():
+            for i in range(20):
+                produced.append(i)
+                yield i
+
+        iterator = prefetch(numbers(), max_items=2)
+        assert next(iterator) == 0
+        time.sleep(0.05)
+        # One item consumed, two queued and one blocked in put()
+        assert len(produced) <= 4
+        assert list(iterator) == list(range(1, 20))
+
+    def test_reraises_producer_errors(self):
+        def failing():
+            yield 1
+            raise ValueError("unreadable file")
+
+        iterator = prefetch(failing(), max_items=2)
+        assert next(iterator) == 1
+        with pytest.raises(ValueError):
+            next(iterator)
+
+    def test_stops_producer_when_consumer_stops(self):
+        def endless():
+            while True:
+                yield threading.current_thread().name
+
+        iterator = prefetch(endless(), max_items=1)
+        next(iterator)
+        iterator.close()
+        time.sleep(0.3)
+        assert not any(thread.name == "prefetch" for thread in threading.enumerate())
+
+
+class TestStreamDocumentsToDb:
+    """Tests for stream_documents_to_db"""
+
+    def test_builds_store_in_file_order(self, tmp_path, monkeypatch, small_batches):
+        embedder = FakeEmbedder()
+        monkeypatch.setattr(data_pipeline, "prepare_embedder_transformer", lambda embedder_type=None: embedder)
+        sources = [make_source(f"f{i}.py", f"content of file {i}") for i in range(4)]
+
+        store = stream_documents_to_db(lambda: iter(sources), str(tmp_path / "repo.db"), embedder_type="openai")
+
+        assert [doc.meta_data["file_path"] for doc in store.documents()] == ["f0.py", "f1.py", "f2.py", "f3.py"]
+        assert store.num_sources == 4
+        assert len(embedder.batches) == 4
+        assert (tmp_path / "repo.faiss").exists()
+
+    def test_resumes_from_checkpoint(self, tmp_path, monkeypatch, small_batches):
+        db_path = str(tmp_path / "repo.db")
+        sources = [make_source(f"f{i}.py", f"content of file {i}") for i in range(4)]
+
+        monkeypatch.setattr(data_pipeline, "prepare_embedder_transformer",
+                            lambda embedder_type=None: FakeEmbedder(fail_after=2))
+        with pytest.raises(RuntimeError):
+            stream_documents_to_db(lambda: iter(sources), db_path, embedder_type="openai")
+        assert not Path(db_path).exists()
+
+        embedder = FakeEmbedder()
+        monkeypatch.setattr(data_pipeline, "prepare_embedder_transformer", lambda embedder_type=None: embedder)
+        store = stream_documents_to_db(lambda: iter(sources), db_path, embedder_type="openai")
+
+        assert embedder.batches == [["f2.py"], ["f3.py"]]
+        assert [doc.meta_data["file_path"] for doc in store.documents()] == ["f0.py", "f1.py", "f2.py", "f3.py"]
+        assert len(list(tmp_path.glob("repo.*.vectors"))) == 1
+
+    def test_changed_checkpoint_files_restart_the_build(self, tmp_path, monkeypatch, small_batches):
+        db_path = str(tmp_path / "repo.db")
+        sources = [make_source(f"f{i}.py", f"content of file {i}") for i in range(3)]
+
+        monkeypatch.setattr(data_pipeline, "prepare_embedder_transformer",
+                            lambda embedder_type=None: FakeEmbedder(fail_after=1))
+        with pytest.raises(RuntimeError):
+            stream_documents_to_db(lambda: iter(sources), db_path, embedder_type="openai")
+
+        sources[0] = make_source("f0.py", "new content")
+        embedder = FakeEmbedder()
+        monkeypatch.setattr(data_pipeline, "prepare_embedder_transformer", lambda embedder_type=None: embedder)
+        store = stream_documents_to_db(lambda: iter(sources), db_path, embedder_type="openai")
+
+        assert embedder.batches == [["f0.py"], ["f1.py"], ["f2.py"]]
+        assert store.documents()[0].text == "new content"
+        assert len(list(tmp_path.glob("repo.*.vectors"))) == 1
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for token counting with cached encoders.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from api import token_counter
+
+
+class TestTokenCounter:
+    """Tests for api.token_counter"""
+
+    def test_encoding_is_cached(self):
+        assert token_counter.get_encoding("openai") is token_counter.get_encoding("openai")
+
+    def test_batch_matches_single_counts(self):
+        texts = ["def add(a, b):\n    return a + b\n", "Hello world", ""]
+        expected = [token_counter.count_tokens(text, "openai") for text in texts]
+        assert token_counter.count_tokens_batch(texts, "openai") == expected
+
+    def test_short_text_skips_tokenization(self, monkeypatch):
+        monkeypatch.setattr(token_counter, "count_tokens", lambda *args, **kwargs: 1 / 0)
+        assert token_counter.check_token_limit("x" * 100, 100, "openai") == (True, None)
+
+    def test_huge_text_skips_tokenization(self, monkeypatch):
+        monkeypatch.setattr(token_counter, "count_tokens", lambda *args, **kwargs: 1 / 0)
+        limit = 10
+        text = "x" * (limit * token_counter.MAX_BYTES_PER_TOKEN + 1)
+        assert token_counter.check_token_limit(text, limit, "openai") == (False, None)
+
+    def test_borderline_text_is_counted_exactly(self):
+        text = "word " * 50
+        exact = token_counter.count_tokens(text, "openai")
+        assert token_counter.check_token_limit(text, exact, "openai") == (True, exact)
+        assert token_counter.check_token_limit(text, exact - 1, "openai") == (False, exact)
+
+    def test_limits_checked_in_one_batch(self, monkeypatch):
+        batches = []
+        count_tokens_batch = token_counter.count_tokens_batch
+
+        def record(texts, *args, **kwargs):
+            batches.append(list(texts))
+            return count_tokens_batch(texts, *args, **kwargs)
+
+        monkeypatch.setattr(token_counter, "count_tokens_batch", record)
+        borderline = "word " * 50
+        exact = token_counter.count_tokens(borderline, "openai")
+        texts = ["short", borderline, "x" * 10000, borderline]
+        results = token_counter.check_token_limits(texts, [100, exact, 10, exact - 1], "openai")
+
+        assert results == [(True, None), (True, exact), (False, None), (False, exact)]
+        assert batches == [[borderline, borderline]]
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for the persisted FAISS vector index.
+"""
+
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+import pytest
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.vector_index import (
+    RescoringFAISSRetriever,
+    build_faiss_index,
+    create_faiss_retriever,
+    estimate_index_bytes,
+    filter_valid_embeddings,
+    get_faiss_index_path,
+    get_index_quantization,
+    get_index_type,
+    load_faiss_index,
+    load_or_build_faiss_index,
+    sample_training_vectors,
+    select_index_type,
+    valid_vector_mask,
+    write_faiss_sidecar,
+)
+
+
+def make_documents(count: int, dim: int = 8, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [SimpleNamespace(text=f"doc {i}", vector=rng.normal(size=dim).tolist(), meta_data={})
+            for i in range(count)]
+
+
+class TestVectorIndex:
+    """Tests for the FAISS sidecar helpers"""
+
+    def test_sidecar_path(self):
+        assert get_faiss_index_path("/tmp/db/owner_repo.pkl") == "/tmp/db/owner_repo.faiss"
+
+    def test_filter_drops_mismatched_sizes(self):
+        documents = make_documents(3, dim=8) + make_documents(1, dim=4) + [SimpleNamespace(vector=None)]
+        assert len(filter_valid_embeddings(documents)) == 3
+
+    def test_valid_vector_mask(self):
+        matrix = np.array([[1.0, 0.0], [0.0, 0.0], [np.nan, 1.0], [0.0, -np.inf], [0.5, 0.5]], dtype=np.float32)
+        np.testing.assert_array_equal(valid_vector_mask(matrix), [True, False, False, False, True])
+
+    def test_sidecar_is_loaded_instead_of_rebuilt(self, tmp_path):
+        db_path = tmp_path / "repo.pkl"
+        db_path.write_bytes(b"db")
+        documents = make_documents(5)
+
+        write_faiss_sidecar(str(db_path), documents)
+        index_path = get_faiss_index_path(str(db_path))
+        mtime = os.stat(index_path).st_mtime_ns
+
+        index = load_or_build_faiss_index(str(db_path), documents)
+        assert index.ntotal == 5
+        assert os.stat(index_path).st_mtime_ns == mtime
+
+    @pytest.mark.parametrize("index_config", [
+        {"type": "flat"},
+        {"type": "flat", "quantization": "float16"},
+        {"type": "hnsw"},
+        {"type": "ivf"},
+    ])
+    def test_sidecar_is_memory_mapped(self, tmp_path, index_config):
+        db_path = tmp_path / "repo.db"
+        db_path.write_bytes(b"db")
+        write_faiss_sidecar(str(db_path), make_documents(2000, dim=16), index_config=index_config)
+
+        index = load_faiss_index(get_faiss_index_path(str(db_path)))
+        if index_config["type"] == "ivf":
+            assert isinstance(faiss.downcast_InvertedLists(index.invlists), faiss.OnDiskInvertedLists)
+        else:
+            storage = faiss.downcast_index(index.storage) if index_config["type"] == "hnsw" else index
+            # The codes are a view of the mapped file, not a heap copy
+            assert not storage.codes.is_owned
+        query = np.ones((1, 16), dtype=np.float32)
+        assert index.search(query, 3)[1].shape == (1, 3)
+
+    def test_stale_sidecar_is_rebuilt(self, tmp_path):
+        db_path = tmp_path / "repo.pkl"
+        db_path.write_bytes(b"db")
+        write_faiss_sidecar(str(db_path), make_documents(3))
+
+        index = load_or_build_faiss_index(str(db_path), make_documents(6, seed=1))
+        assert index.ntotal == 6
+
+    def test_retriever_finds_nearest_document(self, tmp_path):
+        db_path = tmp_path / "repo.pkl"
+        db_path.write_bytes(b"db")
+        documents = make_documents(10)
+        index = load_or_build_faiss_index(str(db_path), documents)
+
+        retriever = create_faiss_retriever(index, documents, top_k=3)
+        output = retriever([documents[4].vector])
+        assert output[0].doc_indices[0] == 4
+        assert len(output[0].doc_indices) == 3
+
+
+class TestIndexTypes:
+    """Tests for the configurable ANN index types"""
+
+    def test_auto_selection_by_corpus_size(self):
+        config = {"type": "auto", "auto_hnsw_threshold": 100, "auto_ivfpq_threshold": 1000}
+        assert select_index_type(99, config) == "flat"
+        assert select_index_type(100, config) == "hnsw"
+        assert select_index_type(5000, config) == "ivfpq"
+        assert select_index_type(5000, None) == "flat"
+        with pytest.raises(ValueError):
+            select_index_type(10, {"type": "annoy"})
+
+    @pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf", "ivfpq"])
+    def test_index_finds_stored_vectors(self, index_type):
+        documents = make_documents(2000, dim=16)
+        index = build_faiss_index(documents, index_config={"type": index_type, "ivf_nprobe": 8})
+
+        assert get_index_type(index) == index_type
+        query = np.asarray([documents[7].vector], dtype=np.float32)
+        _, ids = index.search(query / np.linalg.norm(query), 5)
+        assert 7 in ids[0]
+
+    def test_training_sample_is_random_and_reproducible(self):
+        vectors = np.arange(1000, dtype=np.float32).reshape(-1, 1)
+        sample = sample_training_vectors(vectors, 100)
+
+        assert len(sample) == 100 and len(np.unique(sample)) == 100
+        # Drawn from the whole matrix, not its leading rows
+        assert sample.max() >= 100
+        np.testing.assert_array_equal(sample, sample_training_vectors(vectors, 100))
+        assert sample_training_vectors(vectors, 5000) is vectors
+
+    def test_sidecar_is_rebuilt_when_index_type_changes(self, tmp_path):
+        db_path = tmp_path / "repo.db"
+        db_path.write_bytes(b"db")
+        documents = make_documents(50)
+        write_faiss_sidecar(str(db_path), documents)
+
+        index = load_or_build_faiss_index(str(db_path), documents, index_config={"type": "hnsw"})
+        assert get_index_type(index) == "hnsw"
+        assert get_index_type(load_or_build_faiss_index(str(db_path), documents,
+                                                        index_config={"type": "hnsw"})) == "hnsw"
+
+
+class TestQuantization:
+    """Tests for scalar-quantized indexes and exact re-scoring"""
+
+    @pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf"])
+    def test_quantized_index_is_smaller(self, index_type):
+        documents = make_documents(2000, dim=16)
+        full = build_faiss_index(documents, index_config={"type": index_type})
+        for quantization, ratio in (("float16", 2), ("int8", 4)):
+            index = build_faiss_index(documents, index_config={"type": index_type, "quantization": quantization})
+            assert get_index_type(index) == index_type
+            assert get_index_quantization(index) == quantization
+            assert estimate_index_bytes(index) < estimate_index_bytes(full)
+            if index_type == "flat":
+                assert estimate_index_bytes(index) * ratio == estimate_index_bytes(full)
+
+    def test_rescoring_matches_exact_search(self):
+        documents = make_documents(500, dim=16)
+        index = build_faiss_index(documents, index_config={"quantization": "int8"})
+        exact = create_faiss_retriever(build_faiss_index(documents), documents, top_k=10)
+        retriever = create_faiss_retriever(index, documents, top_k=10, rescore_factor=4)
+        assert isinstance(retriever, RescoringFAISSRetriever)
+        assert not isinstance(create_faiss_retriever(build_faiss_index(documents), documents, rescore_factor=4),
+                              RescoringFAISSRetriever)
+
+        query = np.asarray(documents[3].vector, dtype=np.float32)
+        query /= np.linalg.norm(query)
+        expected = exact([query.tolist()])[0]
+        result = retriever([query.tolist()])[0]
+        assert result.doc_indices == expected.doc_indices
+        assert np.allclose(result.doc_scores, expected.doc_scores, atol=1e-3)
+
+    def test_sidecar_is_rebuilt_when_quantization_changes(self, tmp_path):
+        db_path = tmp_path / "repo.db"
+        db_path.write_bytes(b"db")
+        documents = make_documents(50)
+        write_faiss_sidecar(str(db_path), documents)
+
+        index = load_or_build_faiss_index(str(db_path), documents, index_config={"quantization": "float16"})
+        assert get_index_quantization(index) == "float16"
+        # Product quantization ignores the scalar quantization
+        assert get_index_quantization(build_faiss_index(make_documents(2000, dim=16), index_config={
+            "type": "ivfpq", "quantization": "int8"})) == "none"